@@ -0,0 +1,456 @@
+"""videoxt 抽帧流水线的基准测试。
+
+用 ffmpeg 内置的 lavfi 测试源（testsrc2 画面 + sine 音频）在本地生成不同分辨率、
+GOP 长度和时长的合成视频，测量 ``FFmpegWrapper.get_metadata``、
+``extract_keyframes``、``extract_audio`` 以及 ``TaskScheduler.process_video``
+在不同并发数和片段时长下的耗时，结果写为 JSON，便于在版本之间比较。
+
+用法::
+
+    python benchmarks/bench_extraction.py --output results.json
+    python benchmarks/bench_extraction.py --quick --baseline results.json
+
+合成视频缓存在工作目录中，参数不变时多次运行直接复用。
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ffmpeg
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import videoxt  # noqa: E402
+from videoxt.ffmpeg import FFmpegWrapper, MetadataCache, metadata_cache  # noqa: E402
+from videoxt.scheduler import TaskScheduler  # noqa: E402
+
+# 结果文件的格式版本，字段含义变化时递增
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class VideoSpec:
+    """一个合成测试视频的参数。"""
+
+    name: str
+    width: int
+    height: int
+    duration: float  # 时长（秒）
+    gop: int  # 关键帧间隔（帧）
+    fps: int = 25
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.mp4"
+
+
+# 默认测试矩阵：短 GOP 的小画面、长 GOP 的录屏类画面、高分辨率
+VIDEOS = [
+    VideoSpec("360p_gop25_60s", 640, 360, 60, 25),
+    VideoSpec("720p_gop250_60s", 1280, 720, 60, 250),
+    VideoSpec("1080p_gop50_30s", 1920, 1080, 30, 50),
+]
+
+# --quick 使用的小矩阵，几十秒内跑完，适合提交前自检
+QUICK_VIDEOS = [
+    VideoSpec("240p_gop25_20s", 426, 240, 20, 25),
+    VideoSpec("480p_gop125_20s", 854, 480, 20, 125),
+]
+
+WORKER_COUNTS = [1, 2, 4]
+SEGMENT_DURATIONS = [5.0, 15.0]
+QUICK_WORKER_COUNTS = [1, 2]
+QUICK_SEGMENT_DURATIONS = [5.0]
+
+# 单独测量抽帧和音频时使用的时间段长度（秒）
+SLICE_SECONDS = 10.0
+
+
+def generate_video(spec: VideoSpec, video_dir: Path) -> Path:
+    """生成合成测试视频，已存在时直接返回。
+
+    Args:
+        spec: 视频参数
+        video_dir: 视频保存目录
+
+    Returns:
+        Path: 视频文件路径
+
+    Raises:
+        RuntimeError: 当 ffmpeg 生成失败时抛出
+    """
+    path = video_dir / spec.filename
+    if path.exists():
+        return path
+    video_dir.mkdir(parents=True, exist_ok=True)
+    video = ffmpeg.input(
+        f"testsrc2=size={spec.width}x{spec.height}:rate={spec.fps}"
+        f":duration={spec.duration}",
+        f="lavfi",
+    )
+    audio = ffmpeg.input(
+        f"sine=frequency=440:sample_rate=44100:duration={spec.duration}", f="lavfi"
+    )
+    tmp_path = path.with_name(path.stem + ".tmp.mp4")
+    try:
+        (
+            ffmpeg.output(
+                video,
+                audio,
+                str(tmp_path),
+                vcodec="libx264",
+                preset="veryfast",
+                pix_fmt="yuv420p",
+                g=spec.gop,
+                keyint_min=spec.gop,
+                sc_threshold=0,
+                acodec="aac",
+                shortest=None,
+            )
+            .overwrite_output()
+            .global_args("-loglevel", "error")
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        raise RuntimeError(
+            f"生成测试视频失败: {spec.name}: {e.stderr.decode(errors='replace')}"
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def _reset_caches() -> None:
+    """清空进程内的元数据缓存（包括关键帧索引），每次测量都从冷启动开始。"""
+    metadata_cache.clear()
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def measure(
+    run: Callable[[Path], Dict[str, float]], scratch: Path, repeat: int, warmup: int
+) -> Tuple[List[float], Dict[str, float]]:
+    """重复执行一个测量，返回每次的耗时和最后一次的指标。
+
+    每次执行前清空临时输出目录，清理时间不计入耗时。
+
+    Args:
+        run: 被测函数，接收输出目录，返回帧数、字节数等指标
+        scratch: 临时输出目录
+        repeat: 计时的次数
+        warmup: 不计时的预热次数
+
+    Returns:
+        Tuple[List[float], Dict[str, float]]: 每次的耗时（秒）和指标
+    """
+    times: List[float] = []
+    metrics: Dict[str, float] = {}
+    for i in range(warmup + repeat):
+        shutil.rmtree(scratch, ignore_errors=True)
+        scratch.mkdir(parents=True)
+        start = time.perf_counter()
+        metrics = run(scratch)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+    shutil.rmtree(scratch, ignore_errors=True)
+    return times, metrics
+
+
+def _summary(times: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def benchmark_cases(
+    video_path: Path,
+    spec: VideoSpec,
+    worker_counts: List[int],
+    segment_durations: List[float],
+) -> List[Tuple[str, Dict, Callable[[Path], Dict[str, float]]]]:
+    """列出一个视频上的所有测量：(名称, 参数, 被测函数)。"""
+    end = min(SLICE_SECONDS, spec.duration)
+    cases = []
+
+    def get_metadata(_: Path) -> Dict[str, float]:
+        # 每次使用新的缓存，测量的是一次真实的 probe
+        metadata = FFmpegWrapper(video_path, cache=MetadataCache()).get_metadata()
+        return {"duration": metadata.duration}
+
+    cases.append(("get_metadata", {}, get_metadata))
+
+    for frame_mode in ("interval", "keyframe"):
+
+        def extract_keyframes(out: Path, frame_mode=frame_mode) -> Dict[str, float]:
+            wrapper = FFmpegWrapper(video_path, cache=MetadataCache())
+            frames = wrapper.extract_keyframes(
+                out, 0.0, end, interval_seconds=0.5, frame_mode=frame_mode
+            )
+            return {"frames": len(frames), "bytes": _dir_bytes(out)}
+
+        cases.append(
+            (
+                "extract_keyframes",
+                {
+                    "start": 0.0,
+                    "end": end,
+                    "interval_seconds": 0.5,
+                    "frame_mode": frame_mode,
+                },
+                extract_keyframes,
+            )
+        )
+
+    for audio_format in ("mp3", "wav", "copy"):
+
+        def extract_audio(out: Path, audio_format=audio_format) -> Dict[str, float]:
+            wrapper = FFmpegWrapper(video_path, cache=MetadataCache())
+            wrapper.extract_audio(out, 0.0, end, audio_format=audio_format)
+            return {"bytes": _dir_bytes(out)}
+
+        cases.append(
+            (
+                "extract_audio",
+                {"start": 0.0, "end": end, "audio_format": audio_format},
+                extract_audio,
+            )
+        )
+
+    for workers in worker_counts:
+        for segment_duration in segment_durations:
+
+            def process_video(
+                out: Path, workers=workers, segment_duration=segment_duration
+            ) -> Dict[str, float]:
+                _reset_caches()
+                # 关闭自适应并发，保证每次测量的并发数相同
+                scheduler = TaskScheduler(n_workers=workers, adaptive=False)
+                result = scheduler.process_video(
+                    video_path, out, segment_duration=segment_duration, resume=False
+                )
+                if result.error_log:
+                    raise RuntimeError(f"处理失败: {result.error_log}")
+                return {
+                    "frames": len(result.keyframes),
+                    "audio_segments": len(result.audio_segments),
+                    "bytes": _dir_bytes(out),
+                }
+
+            cases.append(
+                (
+                    "process_video",
+                    {"workers": workers, "segment_duration": segment_duration},
+                    process_video,
+                )
+            )
+    return cases
+
+
+def _ffmpeg_version() -> str:
+    try:
+        output = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True
+        ).stdout
+        return output.splitlines()[0] if output else "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        return output.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def environment() -> Dict[str, object]:
+    """记录运行环境，比较结果时用于确认两次运行可比。"""
+    return {
+        "videoxt": videoxt.__version__,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": _ffmpeg_version(),
+    }
+
+
+def run_benchmarks(
+    videos: List[VideoSpec],
+    worker_counts: List[int],
+    segment_durations: List[float],
+    work_dir: Path,
+    repeat: int = 3,
+    warmup: int = 1,
+    only: Optional[List[str]] = None,
+) -> Dict:
+    """生成测试视频并执行所有测量。
+
+    Args:
+        videos: 测试视频列表
+        worker_counts: process_video 的并发数列表
+        segment_durations: process_video 的片段时长列表
+        work_dir: 测试视频和临时输出所在的目录
+        repeat: 每个测量计时的次数
+        warmup: 每个测量不计时的预热次数
+        only: 只执行这些名称的测量，默认全部执行
+
+    Returns:
+        Dict: 可直接写为 JSON 的结果
+    """
+    results = []
+    for spec in videos:
+        print(f"生成测试视频: {spec.name}", file=sys.stderr)
+        video_path = generate_video(spec, work_dir / "videos")
+        for name, params, run in benchmark_cases(
+            video_path, spec, worker_counts, segment_durations
+        ):
+            if only and name not in only:
+                continue
+            times, metrics = measure(run, work_dir / "scratch", repeat, warmup)
+            results.append(
+                {
+                    "name": name,
+                    "video": spec.name,
+                    "params": params,
+                    "repeat": repeat,
+                    "times": times,
+                    **_summary(times),
+                    "metrics": metrics,
+                }
+            )
+            print(
+                f"{name:<18} {spec.name:<18} {json.dumps(params):<70} "
+                f"中位数 {results[-1]['median']:.3f}s",
+                file=sys.stderr,
+            )
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "videos": [asdict(spec) for spec in videos],
+        "results": results,
+    }
+
+
+def _case_key(result: Dict) -> str:
+    params = json.dumps(result["params"], sort_keys=True)
+    return f"{result['name']} {result['video']} {params}"
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """按中位数比较两次结果，返回变慢超过 tolerance（比例）的测量。"""
+    previous = {_case_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = _case_key(result)
+        if key not in previous:
+            continue
+        ratio = result["median"] / previous[key]["median"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- 变慢"
+            regressions.append(key)
+        print(
+            f"{key:<100} {previous[key]['median']:.3f}s -> {result['median']:.3f}s  "
+            f"x{ratio:.2f}{flag}",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="videoxt 抽帧流水线基准测试")
+    parser.add_argument(
+        "--output", type=str, help="结果 JSON 文件路径，默认输出到标准输出"
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        help="测试视频和临时输出目录，默认为系统临时目录下的 videoxt-bench",
+    )
+    parser.add_argument("--quick", action="store_true", help="使用较小的测试矩阵")
+    parser.add_argument("--repeat", type=int, default=3, help="每个测量计时的次数")
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="每个测量不计时的预热次数"
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="process_video 的并发数列表"
+    )
+    parser.add_argument(
+        "--segment-durations",
+        type=float,
+        nargs="+",
+        help="process_video 的片段时长列表（秒）",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=["get_metadata", "extract_keyframes", "extract_audio", "process_video"],
+        help="只执行指定的测量",
+    )
+    parser.add_argument("--baseline", type=str, help="与之前的结果文件比较")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="比较时允许变慢的比例，超过时以状态码 1 退出，默认0.1",
+    )
+    args = parser.parse_args()
+
+    work_dir = (
+        Path(args.work_dir)
+        if args.work_dir
+        else Path(tempfile.gettempdir()) / "videoxt-bench"
+    )
+    results = run_benchmarks(
+        QUICK_VIDEOS if args.quick else VIDEOS,
+        args.workers or (QUICK_WORKER_COUNTS if args.quick else WORKER_COUNTS),
+        args.segment_durations
+        or (QUICK_SEGMENT_DURATIONS if args.quick else SEGMENT_DURATIONS),
+        work_dir,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        only=args.only,
+    )
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .hash_index import hamming_distance
+
+
+class _Node:
+    __slots__ = ("value", "item", "children")
+
+    def __init__(self, value: int, item: Any):
+        self.value = value
+        self.item = item
+        self.children: Dict[int, "_Node"] = {}
+
+
+class BKTree:
+    """64 位哈希的汉明距离 BK 树
+
+    每个子节点按与父节点的距离挂载，查询时利用三角不等式只进入距离在
+    [d - r, d + r] 之间的子树，半径较小时每次查询只访问很少的节点。
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: Any) -> None:
+        """插入一个哈希及其关联对象"""
+        self._size += 1
+        if self._root is None:
+            self._root = _Node(value, item)
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node.value)
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(value, item)
+                return
+            node = child
+
+    def iter_within(self, value: int, radius: int) -> Iterator[Tuple[int, Any]]:
+        """逐个产出距离不超过 radius 的 (距离, 对象)"""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node.value)
+            if distance <= radius:
+                yield distance, node.item
+            for child_distance, child in node.children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+
+    def find_within(self, value: int, radius: int) -> List[Tuple[int, Any]]:
+        """返回距离不超过 radius 的所有 (距离, 对象)，按距离升序排列"""
+        return sorted(self.iter_within(value, radius), key=lambda x: x[0])
@@ -1,12 +1,173 @@
 import os
-import shutil
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from .image_utils import ImageComparator
-from .file_utils import get_sorted_frames, get_segment_dirs
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+
+import numpy as np
+
+from .bktree import BKTree
+from .file_utils import (
+    OUTPUT_STRATEGIES,
+    get_segment_dirs,
+    get_sorted_frames,
+    is_frame_file,
+)
+from .image_utils import SSIM_MAX_SIDE, ImageComparator
+from .perceptual_hash import popcount, sequential_keep
+from .plan import (
+    DROP,
+    DROP_CROSS,
+    KEEP,
+    OUTPUT_PLAN_FILENAME,
+    PLAN_FILENAME,
+    PlanJournal,
+    apply_plan,
+    load_plan,
+    new_plan,
+    plan_operations,
+    save_plan,
+    summarize_plan,
+)
+
+# 并行处理时子进程每比较这么多帧汇报一次进度，减少进程间通信
+PROGRESS_INTERVAL = 16
+
+# 并行处理时主线程汇总进度的间隔（秒）
+PROGRESS_POLL_SECONDS = 0.2
+
+
+def find_decisions(
+    frame_paths, comparator, should_stop=lambda: False, on_progress=lambda done: None
+):
+    """每帧与上一保留帧比较，返回 (保留帧下标列表, 参考帧下标列表, 相似度列表)
+
+    后两个列表只包含已比较的帧，参考帧是比较时的上一保留帧；第一帧没有参考帧，
+    参考帧和相似度记为 None。on_progress 以已处理的帧数调用。
+    """
+    if comparator.algorithm != "pixel":
+        # 整段的哈希先批量取得，索引中没有的一次解码、整批计算
+        hashes = comparator.get_hashes(frame_paths)
+        if comparator.algorithm == "hash":
+            decisions = _hash_decisions(
+                np.asarray(hashes, dtype=np.uint64), comparator.hash_radius()
+            )
+            on_progress(len(frame_paths))
+            return decisions
+
+    keep, references, scores = [], [], []
+    for i, frame_path in enumerate(frame_paths):
+        if should_stop():
+            break
+        if not keep:
+            keep.append(i)
+            references.append(None)
+            scores.append(None)
+            continue
+        score = comparator.similarity(frame_path, frame_paths[keep[-1]])
+        references.append(keep[-1])
+        scores.append(score)
+        if score <= 100 - comparator.threshold:
+            keep.append(i)
+        on_progress(i + 1)
+    return keep, references, scores
+
+
+def _hash_decisions(hashes, radius):
+    """哈希模式下整段向量化地求出保留帧、参考帧和相似度"""
+    if not len(hashes):
+        return [], [], []
+    keep = sequential_keep(hashes, radius)
+    # 每帧的参考帧是它之前最近的保留帧，保留帧自身则是再上一个保留帧
+    indices = np.arange(len(hashes))
+    position = np.searchsorted(keep, indices, side="right") - 1
+    position[keep[position] == indices] -= 1
+    references = keep[np.maximum(position, 0)]
+    scores = (64 - popcount(hashes ^ hashes[references]).astype(np.int64)) / 64 * 100
+    has_reference = position >= 0
+    return (
+        keep.tolist(),
+        [int(r) if ok else None for r, ok in zip(references, has_reference)],
+        [float(v) if ok else None for v, ok in zip(scores, has_reference)],
+    )
+
+
+def plan_segment(
+    segment_dir,
+    segment_index,
+    mode,
+    comparator,
+    should_stop=lambda: False,
+    on_progress=lambda done: None,
+):
+    """对单个分段做出去重决定，返回计划中的分段条目；中途停止时返回 None"""
+    frames = get_sorted_frames(segment_dir)
+    keep, references, scores = find_decisions(
+        [os.path.join(segment_dir, frame) for frame in frames],
+        comparator,
+        should_stop,
+        on_progress,
+    )
+    if len(references) < len(frames):
+        return None
+
+    name = os.path.basename(segment_dir)
+    kept = set(keep)
+    outputs = [None] * len(frames)
+    if mode in [2, 3]:
+        # 输出文件名只由分段索引和保留顺序决定，与处理顺序无关，
+        # 使用更长的文件名格式，包含原始片段信息
+        for n, i in enumerate(keep, 1):
+            extension = os.path.splitext(frames[i])[1]
+            outputs[i] = f"frame_{segment_index:03d}_{n:06d}{extension}"
+    return {
+        "dir": name,
+        "frames": frames,
+        "actions": [KEEP if i in kept else DROP for i in range(len(frames))],
+        "references": [
+            None if r is None else f"{name}/{frames[r]}" for r in references
+        ],
+        "scores": [None if v is None else round(v, 2) for v in scores],
+        "outputs": outputs,
+    }
+
+
+def _segment_worker(
+    segment_dir, segment_index, mode, algorithm, threshold, ssim_size, progress_queue
+):
+    """进程池中为一个分段做出去重决定，已比较的帧数经 progress_queue 汇报给主进程"""
+
+    def report(done):
+        if done % PROGRESS_INTERVAL == 0:
+            progress_queue.put((segment_index, done))
+
+    comparator = ImageComparator(algorithm, threshold, ssim_size)
+    segment = plan_segment(
+        segment_dir, segment_index, mode, comparator, on_progress=report
+    )
+    # 分段目录的哈希索引在子进程中保存，之后执行计划时直接沿用
+    comparator.save_indexes()
+    return segment_index, segment
+
 
 class Deduplicator:
-    def __init__(self, input_dir, output_dir, mode, threshold, algorithm, progress_callback, log_callback):
+    def __init__(
+        self,
+        input_dir,
+        output_dir,
+        mode,
+        threshold,
+        algorithm,
+        progress_callback,
+        log_callback,
+        workers=None,
+        global_search=False,
+        ssim_size=SSIM_MAX_SIDE,
+        output_strategy="copy",
+    ):
+        if output_strategy not in OUTPUT_STRATEGIES:
+            raise ValueError(
+                f"不支持的输出方式: {output_strategy}，可选值: {', '.join(OUTPUT_STRATEGIES)}"
+            )
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.mode = mode
@@ -15,78 +176,124 @@ class Deduplicator:
         self.progress_callback = progress_callback
         self.log_callback = log_callback
         self.stop_flag = False
-        self.comparator = ImageComparator(algorithm, threshold)
-        
+        self.ssim_size = ssim_size
+        self.comparator = ImageComparator(algorithm, threshold, ssim_size)
+        # 并行处理分段的进程数，默认为 1，在当前线程中顺序处理；
+        # 大于 1 时启用进程池，进程启动和结果传回的开销只在分段多且大时值得
+        self.workers = workers or 1
+        # 跨片段去重时与所有已保留帧比较（而不只是上一保留帧），去掉重复出现的画面
+        self.global_search = global_search
+        # 保留帧输出到目标目录的方式，默认复制为独立文件；链接或克隆不支持时回退为复制
+        self.output_strategy = output_strategy
+
+    @property
+    def plan_path(self):
+        """默认的计划文件：模式1保存在输入目录，模式2/3保存在输出目录"""
+        return os.path.join(
+            self.output_dir if self.mode in [2, 3] else self.input_dir, PLAN_FILENAME
+        )
+
+    @property
+    def output_plan_path(self):
+        """输出目录跨片段去重的计划文件，与模式2/3的计划分开保存"""
+        return os.path.join(self.output_dir, OUTPUT_PLAN_FILENAME)
+
+    def _plan_parameters(self):
+        return {
+            "input_dir": os.path.abspath(self.input_dir),
+            "output_dir": (
+                os.path.abspath(self.output_dir) if self.mode in [2, 3] else ""
+            ),
+            "mode": self.mode,
+            "algorithm": self.algorithm,
+            "threshold": self.threshold,
+            "hash_type": self.comparator.hash_type,
+            "global_search": self.global_search,
+            "output_strategy": self.output_strategy,
+        }
+
+    def _output_plan_parameters(self):
+        # 输出目录中的冗余帧直接删除，相当于以输出目录为输入的模式1
+        return dict(
+            self._plan_parameters(),
+            input_dir=os.path.abspath(self.output_dir),
+            output_dir="",
+            mode=1,
+        )
+
     def process(self):
+        """先生成去重计划再执行；参数相同的未完成计划直接继续执行"""
+        self._process(self.plan_path, self._plan_parameters(), self.plan)
+
+    def process_output_dir(self):
+        """对输出目录中已有的帧做跨片段去重，同样先生成计划再执行，未完成的计划直接继续执行"""
+        self._process(
+            self.output_plan_path, self._output_plan_parameters(), self.plan_output_dir
+        )
+
+    def _process(self, plan_path, parameters, make_plan):
         try:
-            # 获取所有分段目录
-            segment_dirs = get_segment_dirs(self.input_dir)
-            total_segments = len(segment_dirs)
-            
-            # 创建输出目录（如果需要）
-            if self.mode in [2, 3]:
-                os.makedirs(self.output_dir, exist_ok=True)
-                
-            # 处理每个分段
-            for i, segment_dir in enumerate(segment_dirs):
-                if self.stop_flag:
-                    break
-                    
-                self.log_callback(f"处理分段: {os.path.basename(segment_dir)}")
-                self._process_segment(segment_dir, i, total_segments)
-                
-            # 处理跨片段去重
-            if not self.stop_flag and self.mode in [2, 3]:
-                self._process_cross_segments(segment_dirs)
-                
+            if self._has_unfinished_plan(plan_path, parameters):
+                self.log_callback("发现未执行完的去重计划，继续执行")
+            elif make_plan(plan_path) is None:
+                return
+            if not self.stop_flag:
+                self.apply(plan_path)
         except Exception as e:
             self.log_callback(f"处理过程中发生错误: {str(e)}")
             raise
-            
-    def _process_segment(self, segment_dir, segment_index, total_segments):
-        # 获取排序后的帧列表
-        frames = get_sorted_frames(segment_dir)
-        if not frames:
-            return
-            
-        # 计算进度
-        progress = (segment_index / total_segments) * 100
-        self.progress_callback(progress, f"处理分段 {segment_index + 1}/{total_segments}")
-        
-        # 处理帧序列
-        keep_frames = []
-        last_kept_frame = None
-        
-        for frame in frames:
+
+    def _has_unfinished_plan(self, plan_path, parameters):
+        try:
+            plan = load_plan(plan_path)
+        except (OSError, ValueError):
+            return False
+        if any(plan.get(key) != value for key, value in parameters.items()):
+            return False
+        return PlanJournal(plan_path, plan["id"]).applied < len(plan_operations(plan))
+
+    def plan(self, plan_path=None):
+        """比较所有帧并把决定写入计划文件，不修改任何帧
+
+        返回计划文件路径，中途停止时不写入计划并返回 None。
+        """
+        plan_path = plan_path or self.plan_path
+        segment_dirs = get_segment_dirs(self.input_dir)
+        plan = new_plan(**self._plan_parameters())
+
+        # 处理每个分段
+        if self.workers > 1 and len(segment_dirs) > 1:
+            segments = self._plan_segments_parallel(segment_dirs)
+        else:
+            segments = self._plan_segments(segment_dirs)
+        self.comparator.save_indexes()
+        if segments is None:
+            self.log_callback("处理已停止，未生成去重计划")
+            return None
+        plan["segments"] = segments
+
+        # 处理跨片段去重
+        if self.mode in [2, 3]:
+            self._plan_cross_segments(plan)
+            self.comparator.save_indexes()
             if self.stop_flag:
-                break
-                
-            frame_path = os.path.join(segment_dir, frame)
-            
-            if last_kept_frame is None:
-                # 保留第一帧
-                keep_frames.append(frame)
-                last_kept_frame = frame_path
-            else:
-                # 比较当前帧与上一保留帧
-                if not self.comparator.is_similar(frame_path, last_kept_frame):
-                    keep_frames.append(frame)
-                    last_kept_frame = frame_path
-                    
-        # 根据模式处理结果
-        if self.mode == 1:
-            self._delete_redundant_frames(segment_dir, frames, keep_frames)
-        elif self.mode in [2, 3]:
-            self._copy_kept_frames(segment_dir, keep_frames, segment_index)
-            
-    def _process_cross_segments(self, segment_dirs):
-        """全量扫描去重"""
+                self.log_callback("处理已停止，未生成去重计划")
+                return None
+
+        return self._save_plan(plan, plan_path)
+
+    def plan_output_dir(self, plan_path=None):
+        """对输出目录中已有的帧（frame_<分段>_<序号>）做跨片段去重决定并写入计划文件
+
+        冗余帧在计划中记为删除，不修改任何帧。返回计划文件路径，中途停止时返回 None。
+        """
+        plan_path = plan_path or self.output_plan_path
         self.log_callback("开始全量跨片段去重...")
-        
+
         # 从目标文件夹中获取所有文件
         all_frames = []
         for filename in os.listdir(self.output_dir):
-            if filename.startswith("frame_") and filename.endswith(".png"):
+            if is_frame_file(filename):
                 try:
                     # 解析文件名中的片段索引和帧号
                     parts = filename.split("_")
@@ -95,69 +302,222 @@ class Deduplicator:
                     all_frames.append((filename, segment_idx, frame_num))
                 except (ValueError, IndexError):
                     continue
-                    
+
         # 按片段索引和帧号排序
         all_frames.sort(key=lambda x: (x[1], x[2]))
-        
-        if not all_frames:
+        frames = [filename for filename, _, _ in all_frames]
+        if not frames:
             self.log_callback("没有找到需要处理的文件")
-            return
-            
-        # 初始化基准帧
-        keep_frames = []
-        last_kept_frame = None
-        
-        # 遍历所有帧进行去重
-        for frame_info in all_frames:
+            return None
+
+        frame_paths = [os.path.join(self.output_dir, filename) for filename in frames]
+        if self.global_search:
+            redundant = self._find_global_redundant(frame_paths)
+        else:
+            redundant = self._find_sequential_redundant(frame_paths)
+        self.comparator.save_indexes()
+        if self.stop_flag:
+            self.log_callback("处理已停止，未生成去重计划")
+            return None
+
+        # 整个输出目录作为一个分段写入计划
+        segment = {
+            "dir": "",
+            "frames": frames,
+            "actions": [KEEP] * len(frames),
+            "references": [None] * len(frames),
+            "scores": [None] * len(frames),
+            "outputs": [None] * len(frames),
+        }
+        for i, (reference, score) in redundant.items():
+            segment["actions"][i] = DROP_CROSS
+            segment["references"][i] = frames[reference]
+            segment["scores"][i] = round(score, 2)
+        plan = new_plan(**self._output_plan_parameters())
+        plan["segments"] = [segment]
+        self.log_callback(
+            f"跨片段去重完成，保留 {len(frames) - len(redundant)} 帧，删除 {len(redundant)} 帧"
+        )
+        return self._save_plan(plan, plan_path)
+
+    def _save_plan(self, plan, plan_path):
+        os.makedirs(os.path.dirname(os.path.abspath(plan_path)), exist_ok=True)
+        save_plan(plan, plan_path)
+        summary = summarize_plan(plan)
+        self.log_callback(
+            f"已生成去重计划: {plan_path}，共 {summary['frames']} 帧，"
+            f"保留 {summary[KEEP]} 帧，删除 {summary[DROP] + summary[DROP_CROSS]} 帧，"
+            f"待执行 {summary['operations']} 个文件操作"
+        )
+        return plan_path
+
+    def apply(self, plan_path=None):
+        """按计划执行删除或输出，返回本次执行的文件操作数"""
+        self.log_callback("开始执行去重计划...")
+        return apply_plan(
+            plan_path or self.plan_path,
+            self.log_callback,
+            self.progress_callback,
+            lambda: self.stop_flag,
+        )
+
+    def _plan_segments(self, segment_dirs):
+        """在当前线程中依次处理各分段，中途停止时返回 None"""
+        total_segments = len(segment_dirs)
+        segments = []
+        for i, segment_dir in enumerate(segment_dirs):
             if self.stop_flag:
-                break
-                
-            filename, segment_idx, frame_num = frame_info
-            current_frame = os.path.join(self.output_dir, filename)
-            
-            if last_kept_frame is None:
-                # 保留第一帧
-                keep_frames.append(filename)
-                last_kept_frame = current_frame
-            else:
-                # 比较当前帧与上一保留帧
-                if not self.comparator.is_similar(current_frame, last_kept_frame):
-                    keep_frames.append(filename)
-                    last_kept_frame = current_frame
-                    
-        # 删除冗余帧
-        for frame_info in all_frames:
-            filename, _, _ = frame_info
-            if filename not in keep_frames:
-                frame_path = os.path.join(self.output_dir, filename)
-                os.remove(frame_path)
-                self.log_callback(f"删除冗余帧: {filename}")
-                
-        self.log_callback(f"跨片段去重完成，保留 {len(keep_frames)} 帧，删除 {len(all_frames) - len(keep_frames)} 帧")
-        
-    def _delete_redundant_frames(self, segment_dir, all_frames, keep_frames):
-        for frame in all_frames:
-            if frame not in keep_frames:
-                frame_path = os.path.join(segment_dir, frame)
-                os.remove(frame_path)
-                self.log_callback(f"删除冗余帧: {frame}")
-                
-    def _copy_kept_frames(self, segment_dir, keep_frames, segment_index):
-        # 使用全局帧计数器
-        global_frame_index = 1
-        for frame in keep_frames:
+                return None
+            self.log_callback(f"处理分段: {os.path.basename(segment_dir)}")
+            self.progress_callback(
+                i / total_segments * 100, f"处理分段 {i + 1}/{total_segments}"
+            )
+            segment = plan_segment(
+                segment_dir, i, self.mode, self.comparator, lambda: self.stop_flag
+            )
+            if segment is None:
+                return None
+            segments.append(segment)
+            # 每个分段处理完就保存哈希索引，中途停止也不丢失
+            self.comparator.save_indexes()
+        return segments
+
+    def _plan_segments_parallel(self, segment_dirs):
+        """用进程池并行处理各分段，中途停止时返回 None"""
+        total_segments = len(segment_dirs)
+        workers = min(self.workers, total_segments)
+        self.log_callback(f"使用 {workers} 个进程并行处理 {total_segments} 个分段")
+        segments = [None] * total_segments
+
+        # 进度按已比较的帧数汇总，各分段的帧数事先统计
+        frame_counts = [len(get_sorted_frames(d)) for d in segment_dirs]
+        total_frames = sum(frame_counts)
+        frames_done = [0] * total_segments
+
+        with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+            progress_queue = manager.Queue()
+            futures = {
+                executor.submit(
+                    _segment_worker,
+                    segment_dir,
+                    i,
+                    self.mode,
+                    self.algorithm,
+                    self.threshold,
+                    self.ssim_size,
+                    progress_queue,
+                ): segment_dir
+                for i, segment_dir in enumerate(segment_dirs)
+            }
+
+            done = 0
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(
+                    pending, timeout=PROGRESS_POLL_SECONDS, return_when=FIRST_COMPLETED
+                )
+                if self.stop_flag:
+                    # 取消尚未开始的分段，已在处理的分段会完成
+                    for future in pending:
+                        future.cancel()
+                    return None
+
+                while True:
+                    try:
+                        segment_index, count = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    frames_done[segment_index] = max(frames_done[segment_index], count)
+                for future in finished:
+                    segment_index, segments[segment_index] = future.result()
+                    frames_done[segment_index] = frame_counts[segment_index]
+                    done += 1
+                    self.log_callback(f"处理分段: {os.path.basename(futures[future])}")
+
+                compared = sum(frames_done)
+                self.progress_callback(
+                    compared / total_frames * 100 if total_frames else 100,
+                    f"处理分段 {done}/{total_segments}，"
+                    f"已比较 {compared}/{total_frames} 帧",
+                )
+        return segments
+
+    def _plan_cross_segments(self, plan):
+        """在计划中标记与其他分段保留帧重复的帧，这些帧不再输出"""
+        self.log_callback("开始全量跨片段去重...")
+        kept = [
+            (segment, i)
+            for segment in plan["segments"]
+            for i, output in enumerate(segment["outputs"])
+            if output
+        ]
+        frame_paths = [
+            os.path.join(self.input_dir, segment["dir"], segment["frames"][i])
+            for segment, i in kept
+        ]
+        if self.global_search:
+            redundant = self._find_global_redundant(frame_paths)
+        else:
+            redundant = self._find_sequential_redundant(frame_paths)
+
+        for index, (reference, score) in redundant.items():
+            segment, i = kept[index]
+            reference_segment, reference_index = kept[reference]
+            segment["actions"][i] = DROP_CROSS
+            reference_frame = reference_segment["frames"][reference_index]
+            segment["references"][i] = f"{reference_segment['dir']}/{reference_frame}"
+            segment["scores"][i] = round(score, 2)
+            segment["outputs"][i] = None
+
+        self.log_callback(
+            f"跨片段去重完成，保留 {len(kept) - len(redundant)} 帧，删除 {len(redundant)} 帧"
+        )
+
+    def _find_sequential_redundant(self, frame_paths):
+        """每帧与上一保留帧比较，返回 {冗余帧下标: (参考帧下标, 相似度)}"""
+        keep, references, scores = find_decisions(
+            frame_paths, self.comparator, lambda: self.stop_flag
+        )
+        kept = set(keep)
+        return {
+            i: (references[i], scores[i])
+            for i in range(len(references))
+            if i not in kept
+        }
+
+    def _find_global_redundant(self, frame_paths):
+        """每帧与所有已保留帧比较，返回 {冗余帧下标: (参考帧下标, 相似度)}
+
+        已保留帧的哈希放入 BK 树，每帧只需查询哈希距离在阈值内的候选帧；
+        像素比对和混合模式再用 SSIM 批量确认候选帧。
+        """
+        self.log_callback("全局查找模式：与所有已保留帧比较")
+        tree = BKTree()
+        radius = self.comparator.hash_radius()
+        redundant = {}
+        hashes = self.comparator.get_hashes(frame_paths)
+
+        for i, (current_frame, frame_hash) in enumerate(zip(frame_paths, hashes)):
             if self.stop_flag:
                 break
-                
-            src_path = os.path.join(segment_dir, frame)
-            # 使用更长的文件名格式，包含原始片段信息
-            dst_name = f"frame_{segment_index:03d}_{global_frame_index:06d}.png"
-            dst_path = os.path.join(self.output_dir, dst_name)
-            
-            shutil.copy2(src_path, dst_path)
-            self.log_callback(f"复制帧: {frame} -> {dst_name}")
-            global_frame_index += 1
-            
+
+            candidates = tree.find_within(frame_hash, radius)
+            if candidates and self.algorithm == "hash":
+                distance, reference = candidates[0]
+                redundant[i] = (reference, (64 - distance) / 64 * 100)
+            elif candidates:
+                # 当前帧作为参考图，所有候选帧一次批量计算 SSIM
+                scores = self.comparator.pixel_scores(
+                    current_frame, [frame_paths[j] for _, j in candidates]
+                )
+                best = int(scores.argmax())
+                if scores[best] > 100 - self.threshold:
+                    redundant[i] = (candidates[best][1], float(scores[best]))
+
+            if i not in redundant:
+                tree.add(frame_hash, i)
+        return redundant
+
     def stop(self):
         self.stop_flag = True
-        self.log_callback("正在停止处理...") 
\ No newline at end of file
+        self.log_callback("正在停止处理...")
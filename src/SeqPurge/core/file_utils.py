@@ -1,7 +1,34 @@
+import errno
 import os
 import re
-from typing import List
 import shutil
+from typing import List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，克隆时直接回退为复制
+    fcntl = None
+
+# 参与去重的帧文件格式，与 videoxt 可以输出的图像格式对应
+FRAME_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+# 保留帧输出到目标目录的方式：硬链接、写时复制克隆、移动、复制
+OUTPUT_STRATEGIES = ("hardlink", "reflink", "move", "copy")
+
+# Linux 的 FICLONE ioctl，在 btrfs/xfs 等文件系统上共享数据块
+_FICLONE = 0x40049409
+
+# 这些错误表示文件系统不支持该方式，之后的文件直接回退为复制
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EMLINK,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
 
 def get_segment_dirs(root_dir: str) -> List[str]:
     """获取所有分段目录，按时间顺序排序"""
@@ -15,36 +42,50 @@ def get_segment_dirs(root_dir: str) -> List[str]:
                 segment_dirs.append((path, start_time))
             except (ValueError, IndexError):
                 continue
-                
+
     # 按开始时间排序
     segment_dirs.sort(key=lambda x: x[1])
     return [dir_path for dir_path, _ in segment_dirs]
 
+
+def is_frame_file(filename: str) -> bool:
+    """是否为参与去重的帧文件（frame_ 开头的图像）"""
+    return (
+        filename.startswith("frame_")
+        and os.path.splitext(filename)[1].lower() in FRAME_EXTENSIONS
+    )
+
+
 def get_sorted_frames(segment_dir: str) -> List[str]:
     """获取排序后的帧文件列表"""
     frames = []
     for filename in os.listdir(segment_dir):
-        if filename.startswith("frame_") and filename.endswith(".png"):
+        if is_frame_file(filename):
             try:
                 # 提取帧号
                 frame_num = int(filename.split("_")[1].split(".")[0])
                 frames.append((filename, frame_num))
             except (ValueError, IndexError):
                 continue
-                
+
     # 按帧号排序
     frames.sort(key=lambda x: x[1])
     return [filename for filename, _ in frames]
 
+
 def natural_sort_key(s: str) -> List[int]:
     """自然排序键函数"""
-    return [int(text) if text.isdigit() else text.lower()
-            for text in re.split('([0-9]+)', s)]
+    return [
+        int(text) if text.isdigit() else text.lower()
+        for text in re.split("([0-9]+)", s)
+    ]
+
 
 def ensure_dir_exists(dir_path: str) -> None:
     """确保目录存在"""
     os.makedirs(dir_path, exist_ok=True)
 
+
 def safe_remove(path: str) -> None:
     """安全删除文件"""
     try:
@@ -53,9 +94,76 @@ def safe_remove(path: str) -> None:
     except Exception as e:
         print(f"删除文件失败: {path}, 错误: {str(e)}")
 
+
 def safe_copy(src: str, dst: str) -> None:
     """安全复制文件"""
     try:
         shutil.copy2(src, dst)
     except Exception as e:
-        print(f"复制文件失败: {src} -> {dst}, 错误: {str(e)}") 
\ No newline at end of file
+        print(f"复制文件失败: {src} -> {dst}, 错误: {str(e)}")
+
+
+def _reflink(src: str, dst: str) -> None:
+    """写时复制克隆文件，文件系统不支持时抛出 OSError"""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "当前系统不支持克隆文件")
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+    shutil.copystat(src, dst)
+
+
+_OPERATIONS = {
+    "hardlink": os.link,
+    "reflink": _reflink,
+    "move": os.replace,
+    "copy": shutil.copy2,
+}
+
+
+def materialize_files(
+    pairs: List[Tuple[str, str]], strategy: str = "copy"
+) -> List[str]:
+    """把 (源文件, 目标文件) 列表批量输出到目标位置，返回每个文件实际使用的方式
+
+    目标文件已存在时会被替换。硬链接、克隆或移动因跨设备或文件系统不支持
+    失败后，本批剩余文件都直接复制（移动则复制后删除源文件）。
+    """
+    if strategy not in _OPERATIONS:
+        raise ValueError(
+            f"不支持的输出方式: {strategy}，可选值: {', '.join(OUTPUT_STRATEGIES)}"
+        )
+    remove_source = strategy == "move"
+    method = strategy
+    methods = []
+    for src, dst in pairs:
+        while True:
+            try:
+                _OPERATIONS[method](src, dst)
+                break
+            except FileExistsError:
+                os.remove(dst)
+            except OSError as e:
+                if method == "copy" or e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                method = "copy"
+        if method == "copy" and remove_source:
+            os.remove(src)
+        methods.append(method)
+    return methods
+
+
+def remove_files(paths: List[str]) -> int:
+    """批量删除文件，已不存在的文件跳过，返回删除的数量"""
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
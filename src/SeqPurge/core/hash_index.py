@@ -0,0 +1,84 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# 每个目录下的哈希索引文件名
+INDEX_FILENAME = ".seqpurge_hash_index.npz"
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """两个打包哈希之间不同的位数"""
+    return bin(hash1 ^ hash2).count("1")
+
+
+class HashIndex:
+    """单个目录的帧哈希索引
+
+    以 (文件名, 修改时间, 文件大小) 为键缓存每个帧的感知哈希，保存在目录下的
+    紧凑数组文件中。文件被修改或替换后对应条目失效，未变化的帧在多次运行之间
+    只解码一次。索引文件记录哈希类型，类型不同时整体重建。
+    """
+
+    def __init__(self, directory: str, hash_type: str = "ahash"):
+        self.directory = directory
+        self.hash_type = hash_type
+        self.path = os.path.join(directory, INDEX_FILENAME)
+        self._entries: Dict[str, Tuple[int, int, int]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["hash_type"]) != self.hash_type:
+                    return
+                for name, mtime, size, value in zip(
+                    data["names"], data["mtimes"], data["sizes"], data["hashes"]
+                ):
+                    self._entries[str(name)] = (int(mtime), int(size), int(value))
+        except (OSError, KeyError, ValueError):
+            # 索引不存在或已损坏时从空索引开始
+            self._entries = {}
+
+    def lookup(self, filename: str) -> Optional[int]:
+        """读取索引中的哈希，索引中没有或文件已变化时返回 None"""
+        stat = os.stat(os.path.join(self.directory, filename))
+        with self._lock:
+            entry = self._entries.get(filename)
+        if (
+            entry is not None
+            and entry[0] == stat.st_mtime_ns
+            and entry[1] == stat.st_size
+        ):
+            return entry[2]
+        return None
+
+    def put(self, filename: str, value: int, stat: os.stat_result = None) -> None:
+        """写入已知的哈希（如复制帧时沿用源文件的哈希）"""
+        if stat is None:
+            stat = os.stat(os.path.join(self.directory, filename))
+        with self._lock:
+            self._entries[filename] = (stat.st_mtime_ns, stat.st_size, value)
+            self._dirty = True
+
+    def save(self) -> None:
+        """把索引写回磁盘，同时清理已删除文件的条目"""
+        with self._lock:
+            if not self._dirty:
+                return
+            existing = set(os.listdir(self.directory))
+            names = [name for name in self._entries if name in existing]
+            tmp_path = self.path + ".tmp.npz"
+            np.savez(
+                tmp_path,
+                hash_type=np.array(self.hash_type),
+                names=np.array(names, dtype=str),
+                mtimes=np.array([self._entries[n][0] for n in names], dtype=np.int64),
+                sizes=np.array([self._entries[n][1] for n in names], dtype=np.int64),
+                hashes=np.array([self._entries[n][2] for n in names], dtype=np.uint64),
+            )
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .perceptual_hash import THUMB_SIZE, thumbnail
+from .ssim import SSIMReference, downscale
+
+# 解码缓存默认占用的内存上限
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# 只需要哈希时解码结果长边至少保留的像素数，16:9 的画面短边仍大于缩略图边长
+HASH_DECODE_SIDE = THUMB_SIZE * 4
+
+# 可以在解码器中缩小的格式（按扩展名判断）
+_JPEG_EXTENSIONS = (".jpg", ".jpeg")
+
+# JPEG 在解码器中缩小的倍数对应的 OpenCV 读取模式
+_JPEG_READ_MODES = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def decode_gray(img_path, target_side=0):
+    """以尽量低的分辨率把图像解码为 uint8 灰度图
+
+    JPEG 直接解码亮度通道，并在解码器中按 1/2、1/4、1/8 缩小（DCT 域缩放），
+    缩小后长边不小于 target_side；target_side 为 0 时按原始分辨率解码。
+    PNG 等其他格式无法在解码器中缩小，直接解码后转为灰度。格式按扩展名判断。
+    """
+    if os.path.splitext(img_path)[1].lower() in _JPEG_EXTENSIONS:
+        factor = 1
+        if target_side:
+            # 只读取文件头获取尺寸，决定缩小倍数
+            with Image.open(img_path) as img:
+                size = img.size
+            while factor < 8 and max(size) // (factor * 2) >= target_side:
+                factor *= 2
+        image = cv2.imread(img_path, _JPEG_READ_MODES[factor])
+    else:
+        # OpenCV 解码 PNG 比 PIL 快，彩色解码后再转换也比直接读灰度快
+        image = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise OSError(f"无法读取图像: {img_path}")
+    if image.dtype != np.uint8:
+        image = cv2.convertScaleAbs(image, alpha=255 / 65535)
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+class DecodedImage:
+    """一幅图像解码后的预处理结果
+
+    只保留比较时用到的表示：计算哈希用的缩略图和缩小后的 float32 灰度图，
+    SSIM 统计量在第一次作为参考图时计算。解码得到的灰度图本身不保留。
+    """
+
+    __slots__ = ("stat_key", "thumb", "gray", "reference")
+
+    def __init__(self, stat_key, gray, ssim_size):
+        self.stat_key = stat_key
+        self.thumb = thumbnail(gray)
+        self.gray = downscale(gray, ssim_size)
+        self.reference = None
+
+    @property
+    def nbytes(self):
+        size = self.thumb.nbytes + self.gray.nbytes
+        if self.reference is not None:
+            size += (
+                self.reference.mu.nbytes
+                + self.reference.mu_sq.nbytes
+                + self.reference.sigma_sq.nbytes
+            )
+        return size
+
+
+class ImageCache:
+    """按路径缓存解码结果的 LRU 缓存，按占用内存淘汰最久未使用的图像
+
+    哈希、像素和混合比对共用同一份缓存，每个文件只解码一次；
+    文件的修改时间或大小变化后自动重新解码。
+    """
+
+    def __init__(self, ssim_size, max_bytes=DEFAULT_CACHE_BYTES, decode_side=0):
+        self.ssim_size = ssim_size
+        self.max_bytes = max_bytes
+        # 解码时长边至少保留的像素数，0 表示按原始分辨率解码
+        self.decode_side = decode_side
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, img_path):
+        """获取图像的解码结果，无法读取时返回 None"""
+        try:
+            stat = os.stat(img_path)
+        except OSError:
+            return None
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(img_path)
+            if entry is not None and entry.stat_key == stat_key:
+                self._entries.move_to_end(img_path)
+                return entry
+
+        try:
+            gray = decode_gray(img_path, self.decode_side)
+        except OSError:
+            return None
+        entry = DecodedImage(stat_key, gray, self.ssim_size)
+
+        with self._lock:
+            old = self._entries.pop(img_path, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[img_path] = entry
+            self._bytes += entry.nbytes
+            self._evict()
+        return entry
+
+    def alias(self, src_path, dst_path):
+        """dst_path 是 src_path 的副本时直接沿用其解码结果"""
+        with self._lock:
+            entry = self._entries.get(src_path)
+        if entry is None:
+            return
+        try:
+            stat = os.stat(dst_path)
+        except OSError:
+            return
+        # 与源条目共用数组，占用按两份计入，只会让淘汰偏早
+        copy = DecodedImage.__new__(DecodedImage)
+        copy.stat_key = (stat.st_mtime_ns, stat.st_size)
+        copy.thumb, copy.gray, copy.reference = entry.thumb, entry.gray, entry.reference
+        with self._lock:
+            old = self._entries.pop(dst_path, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[dst_path] = copy
+            self._bytes += copy.nbytes
+            self._evict()
+
+    def reference(self, img_path):
+        """获取图像作为 SSIM 参考图的统计量，无法读取时返回 None"""
+        entry = self.get(img_path)
+        if entry is None:
+            return None
+        if entry.reference is None:
+            reference = SSIMReference(entry.gray)
+            with self._lock:
+                if entry.reference is None:
+                    before = entry.nbytes
+                    entry.reference = reference
+                    if self._entries.get(img_path) is entry:
+                        self._bytes += entry.nbytes - before
+                        self._evict()
+        return entry.reference
+
+    def _evict(self):
+        # 至少保留最近使用的一项，单幅图像超过上限时也能正常比较
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
@@ -1,78 +1,139 @@
-import cv2
+import os
+
 import numpy as np
-from PIL import Image
-import imagehash
+
+from .hash_index import HashIndex, hamming_distance
+from .image_cache import DEFAULT_CACHE_BYTES, HASH_DECODE_SIDE, ImageCache
+from .perceptual_hash import hash_batch
+
+# 像素比对时图像长边缩小到的尺寸，0 表示使用原始分辨率
+SSIM_MAX_SIDE = 256
+
+# 批量计算哈希时每批解码的图像数
+HASH_BATCH_SIZE = 256
+
 
 class ImageComparator:
-    def __init__(self, algorithm, threshold):
+    def __init__(
+        self,
+        algorithm,
+        threshold,
+        ssim_size=SSIM_MAX_SIDE,
+        cache_bytes=DEFAULT_CACHE_BYTES,
+        hash_type="ahash",
+    ):
         self.algorithm = algorithm
         self.threshold = threshold
-        
+        self.hash_type = hash_type
+        self.ssim_size = ssim_size
+        # 解码结果的 LRU 缓存，哈希和像素比对共用，参考帧在多次比较间只解码一次；
+        # 解码分辨率按算法选择，哈希比对只需很小的图像，像素比对需要 SSIM 的尺寸
+        decode_side = HASH_DECODE_SIDE if algorithm == "hash" else ssim_size
+        self.cache = ImageCache(ssim_size, cache_bytes, decode_side)
+        # 每个目录一个哈希索引，所有哈希比较都从索引读取
+        self._indexes = {}
+
+    def _get_index(self, directory):
+        directory = os.path.abspath(directory)
+        if directory not in self._indexes:
+            self._indexes[directory] = HashIndex(directory, self.hash_type)
+        return self._indexes[directory]
+
+    def get_hash(self, img_path):
+        """获取图像的感知哈希（经由所在目录的哈希索引）"""
+        return self.get_hashes([img_path])[0]
+
+    def get_hashes(self, img_paths):
+        """批量获取图像的感知哈希，索引中没有的图像解码后整批计算"""
+        hashes = [None] * len(img_paths)
+        missing = []
+        for i, img_path in enumerate(img_paths):
+            directory, filename = os.path.split(img_path)
+            hashes[i] = self._get_index(directory).lookup(filename)
+            if hashes[i] is None:
+                missing.append(i)
+
+        for start in range(0, len(missing), HASH_BATCH_SIZE):
+            batch = missing[start : start + HASH_BATCH_SIZE]
+            thumbs = []
+            for i in batch:
+                entry = self.cache.get(img_paths[i])
+                if entry is None:
+                    raise OSError(f"无法读取图像: {img_paths[i]}")
+                thumbs.append(entry.thumb)
+            for i, value in zip(batch, hash_batch(np.stack(thumbs), self.hash_type)):
+                directory, filename = os.path.split(img_paths[i])
+                hashes[i] = int(value)
+                self._get_index(directory).put(filename, hashes[i])
+        return hashes
+
+    def copy_hash(self, src_path, dst_path, value=None):
+        """复制帧文件后沿用源文件的哈希和解码结果，目标目录无需再解码
+
+        源文件已被移走时需通过 value 传入事先取得的哈希。
+        """
+        self.cache.alias(src_path, dst_path)
+        if self.algorithm == "pixel":
+            return
+        if value is None:
+            value = self.get_hash(src_path)
+        directory, filename = os.path.split(dst_path)
+        self._get_index(directory).put(filename, value)
+
+    def save_indexes(self):
+        """把所有哈希索引写回磁盘"""
+        for index in self._indexes.values():
+            index.save()
+
+    def hash_radius(self):
+        """哈希被判定为相似的最大汉明距离，与 _hash_similarity 的判定一致"""
+        # similarity > 100 - threshold  等价于  diff < 64 * threshold / 100
+        limit = 64 * self.threshold / 100
+        radius = int(limit)
+        return radius - 1 if radius == limit else radius
+
     def is_similar(self, img1_path, img2_path):
+        return self.similarity(img1_path, img2_path) > (100 - self.threshold)
+
+    def similarity(self, img1_path, img2_path):
+        """两幅图像的相似度（百分比），与 is_similar 使用同一判定"""
         if self.algorithm == "hash":
-            return self._compare_hash(img1_path, img2_path)
+            return self._hash_similarity(img1_path, img2_path)
         elif self.algorithm == "pixel":
-            return self._compare_pixel(img1_path, img2_path)
+            return self._pixel_similarity(img1_path, img2_path)
         else:  # hybrid
-            return self._compare_hybrid(img1_path, img2_path)
-            
-    def _compare_hash(self, img1_path, img2_path):
-        # 使用感知哈希算法
-        hash1 = imagehash.average_hash(Image.open(img1_path))
-        hash2 = imagehash.average_hash(Image.open(img2_path))
-        diff = hash1 - hash2
-        
+            return self._hybrid_similarity(img1_path, img2_path)
+
+    def _hash_similarity(self, img1_path, img2_path):
+        # 使用感知哈希算法，哈希从索引读取，每个文件只计算一次
+        diff = hamming_distance(self.get_hash(img1_path), self.get_hash(img2_path))
+
         # 将哈希差异转换为百分比
-        similarity = (64 - diff) / 64 * 100
-        return similarity > (100 - self.threshold)
-        
-    def _compare_pixel(self, img1_path, img2_path):
-        # 读取图像
-        img1 = cv2.imread(img1_path)
-        img2 = cv2.imread(img2_path)
-        
-        if img1 is None or img2 is None:
-            return False
-            
-        # 确保图像大小相同
-        if img1.shape != img2.shape:
-            img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
-            
-        # 转换为灰度图
-        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
-        
-        # 计算结构相似性指数 (SSIM)
-        C1 = (0.01 * 255) ** 2
-        C2 = (0.03 * 255) ** 2
-        
-        # 计算均值
-        mu1 = cv2.GaussianBlur(gray1, (11, 11), 1.5)
-        mu2 = cv2.GaussianBlur(gray2, (11, 11), 1.5)
-        
-        # 计算方差和协方差
-        mu1_sq = mu1 * mu1
-        mu2_sq = mu2 * mu2
-        mu1_mu2 = mu1 * mu2
-        
-        sigma1_sq = cv2.GaussianBlur(gray1 * gray1, (11, 11), 1.5) - mu1_sq
-        sigma2_sq = cv2.GaussianBlur(gray2 * gray2, (11, 11), 1.5) - mu2_sq
-        sigma12 = cv2.GaussianBlur(gray1 * gray2, (11, 11), 1.5) - mu1_mu2
-        
-        # 计算SSIM
-        ssim_map = ((2 * mu1_mu2 + C1) * (2 * sigma12 + C2)) / ((mu1_sq + mu2_sq + C1) * (sigma1_sq + sigma2_sq + C2))
-        ssim = np.mean(ssim_map)
-        
-        # 将SSIM转换为百分比
-        similarity = ssim * 100
-        return similarity > (100 - self.threshold)
-        
-    def _compare_hybrid(self, img1_path, img2_path):
-        # 先使用哈希快速比较
-        hash_similar = self._compare_hash(img1_path, img2_path)
-        
-        if not hash_similar:
-            return False
-            
+        return (64 - diff) / 64 * 100
+
+    def pixel_scores(self, reference_path, candidate_paths):
+        """批量计算候选图与参考图的 SSIM 相似度（百分比），无法读取的图像记为 0"""
+        scores = np.zeros(len(candidate_paths), dtype=np.float32)
+        reference = self.cache.reference(reference_path)
+        if reference is None:
+            return scores
+        entries = [self.cache.get(path) for path in candidate_paths]
+        valid = [i for i, entry in enumerate(entries) if entry is not None]
+        if valid:
+            scores[valid] = (
+                reference.score_batch([entries[i].gray for i in valid]) * 100
+            )
+        return scores
+
+    def _pixel_similarity(self, img1_path, img2_path):
+        # 以 img2（通常是上一保留帧）为参考图，其统计量在多次比较间复用
+        return float(self.pixel_scores(img2_path, [img1_path])[0])
+
+    def _hybrid_similarity(self, img1_path, img2_path):
+        # 先使用哈希快速比较，哈希不相似时直接返回哈希相似度
+        similarity = self._hash_similarity(img1_path, img2_path)
+        if similarity <= (100 - self.threshold):
+            return similarity
+
         # 如果哈希相似，再使用像素比较确认
-        return self._compare_pixel(img1_path, img2_path) 
\ No newline at end of file
+        return self._pixel_similarity(img1_path, img2_path)
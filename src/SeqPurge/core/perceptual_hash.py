@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+
+# 支持的感知哈希：平均哈希、差异哈希、DCT 感知哈希，均为 64 位
+HASH_TYPES = ("ahash", "dhash", "phash")
+
+# 解码后先缩成的缩略图边长，三种哈希都由缩略图批量计算
+THUMB_SIZE = 32
+
+# 32 点 DCT-II 变换矩阵（正交归一化）
+_DCT = np.cos(
+    np.pi
+    * (2 * np.arange(THUMB_SIZE)[None, :] + 1)
+    * np.arange(THUMB_SIZE)[:, None]
+    / (2 * THUMB_SIZE)
+)
+_DCT[0] *= np.sqrt(1 / THUMB_SIZE)
+_DCT[1:] *= np.sqrt(2 / THUMB_SIZE)
+_DCT = _DCT.astype(np.float32)
+
+# 字节的置位数查找表，NumPy 没有 bitwise_count 时使用
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def thumbnail(gray: np.ndarray) -> np.ndarray:
+    """把灰度图按区域平均缩成 THUMB_SIZE x THUMB_SIZE 的 float32 缩略图"""
+    return cv2.resize(
+        gray, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+
+
+def _area_resize(stack: np.ndarray, height: int, width: int) -> np.ndarray:
+    """对 (N, 高, 宽) 的图像栈整体做区域平均缩放"""
+    _, h, w = stack.shape
+    rows = np.linspace(0, h, height + 1).astype(int)
+    cols = np.linspace(0, w, width + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(stack, rows[:-1], axis=1), cols[:-1], axis=2)
+    return sums / np.outer(np.diff(rows), np.diff(cols))
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """把 (N, 8, 8) 的布尔数组按行优先打包为 N 个 uint64"""
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def average_hash(stack: np.ndarray) -> np.ndarray:
+    """批量计算平均哈希：缩到 8x8，高于均值的位置为 1"""
+    pixels = _area_resize(stack, 8, 8)
+    return pack_bits(pixels > pixels.mean(axis=(1, 2), keepdims=True))
+
+
+def difference_hash(stack: np.ndarray) -> np.ndarray:
+    """批量计算差异哈希：缩到 8x9，每行右侧像素比左侧亮的位置为 1"""
+    pixels = _area_resize(stack, 8, 9)
+    return pack_bits(pixels[:, :, 1:] > pixels[:, :, :-1])
+
+
+def perceptual_hash(stack: np.ndarray) -> np.ndarray:
+    """批量计算 DCT 感知哈希：取 32x32 的二维 DCT 低频 8x8，高于中位数的位置为 1"""
+    if stack.shape[1:] != (THUMB_SIZE, THUMB_SIZE):
+        stack = _area_resize(stack, THUMB_SIZE, THUMB_SIZE).astype(np.float32)
+    low = (_DCT @ stack @ _DCT.T)[:, :8, :8]
+    return pack_bits(low > np.median(low.reshape(len(low), -1), axis=1)[:, None, None])
+
+
+_HASH_FUNCTIONS = {
+    "ahash": average_hash,
+    "dhash": difference_hash,
+    "phash": perceptual_hash,
+}
+
+
+def hash_batch(stack: np.ndarray, hash_type: str = "ahash") -> np.ndarray:
+    """对 (N, 高, 宽) 的灰度图像栈计算指定类型的哈希，返回 N 个 uint64"""
+    try:
+        function = _HASH_FUNCTIONS[hash_type]
+    except KeyError:
+        raise ValueError(
+            f"不支持的哈希类型: {hash_type}，可选值: {', '.join(HASH_TYPES)}"
+        )
+    return function(np.asarray(stack, dtype=np.float32))
+
+
+def image_hash(gray: np.ndarray, hash_type: str = "ahash") -> int:
+    """计算单幅灰度图的哈希并打包为 64 位整数，与批量计算的结果相同
+
+    videoxt 抽帧时的内存去重也使用此函数，两边对同一帧得到相同的哈希。
+    """
+    return int(hash_batch(thumbnail(gray)[None], hash_type)[0])
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """uint64 数组逐元素的置位数"""
+    values = np.asarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return (
+        _POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+    )
+
+
+def hamming_distances(value: int, values: np.ndarray) -> np.ndarray:
+    """一个哈希与一组哈希之间的汉明距离"""
+    return popcount(
+        np.bitwise_xor(np.asarray(values, dtype=np.uint64), np.uint64(value))
+    )
+
+
+def sequential_keep(hashes: np.ndarray, radius: int, window: int = 64) -> np.ndarray:
+    """按顺序去重：每帧与上一保留帧比较，距离超过 radius 的帧保留
+
+    每次用向量化的汉明距离扫描上一保留帧之后的一段窗口，直接跳到第一个
+    不相似的帧，长时间静止的画面只需很少几次运算。返回保留帧的下标。
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    keep = []
+    i, n = 0, len(hashes)
+    while i < n:
+        keep.append(i)
+        j = i + 1
+        while j < n:
+            far = np.flatnonzero(
+                hamming_distances(hashes[i], hashes[j : j + window]) > radius
+            )
+            if far.size:
+                j += int(far[0])
+                break
+            j += window
+        i = j
+    return np.array(keep, dtype=np.intp)
@@ -0,0 +1,246 @@
+import json
+import os
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .file_utils import materialize_files, remove_files
+from .hash_index import HashIndex
+
+# 去重计划的默认文件名，模式1保存在输入目录，模式2/3保存在输出目录
+PLAN_FILENAME = "seqpurge_plan.json"
+# 输出目录跨片段去重的计划文件名，保存在输出目录
+OUTPUT_PLAN_FILENAME = "seqpurge_output_plan.json"
+PLAN_VERSION = 1
+
+# 每帧的处理决定：保留、与本分段的上一保留帧重复、与其他分段的保留帧重复
+KEEP = "keep"
+DROP = "drop"
+DROP_CROSS = "cross"
+
+# 执行计划时每批的文件操作数，每批完成后写入一次日志
+APPLY_BATCH_SIZE = 256
+
+# 输出方式在日志中的名称
+_METHOD_LABELS = {"hardlink": "链接", "reflink": "克隆", "move": "移动", "copy": "复制"}
+
+# 计划中与运行参数对应的字段，参数相同的未完成计划可以继续执行
+PLAN_PARAMETERS = (
+    "input_dir",
+    "output_dir",
+    "mode",
+    "algorithm",
+    "threshold",
+    "hash_type",
+    "global_search",
+    "output_strategy",
+)
+
+
+def new_plan(**parameters) -> dict:
+    """创建空的去重计划，参数见 PLAN_PARAMETERS"""
+    plan = {"version": PLAN_VERSION, "id": uuid.uuid4().hex}
+    plan.update(parameters)
+    plan["segments"] = []
+    return plan
+
+
+def save_plan(plan: dict, path: str) -> None:
+    """原子地写入计划文件，并删除旧计划的执行日志"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # 每个分段一行，各字段按帧排成数组，上万帧的计划也很紧凑
+        f.write("{\n")
+        header = {key: value for key, value in plan.items() if key != "segments"}
+        for key, value in header.items():
+            f.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n")
+        f.write('  "segments": [\n')
+        f.write(
+            ",\n".join(
+                "    " + json.dumps(segment, ensure_ascii=False)
+                for segment in plan["segments"]
+            )
+        )
+        f.write("\n  ]\n}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    try:
+        os.remove(PlanJournal.journal_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def load_plan(path: str) -> dict:
+    """读取计划文件，版本不支持时抛出 ValueError"""
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"不支持的计划版本: {plan.get('version')}")
+    return plan
+
+
+def plan_operations(plan: dict) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """按计划顺序展开文件操作：(源文件, 目标文件, 日志中的帧名)
+
+    模式1删除冗余帧，目标文件为 None；模式2/3把保留帧输出到输出目录。
+    展开结果只由计划决定，执行日志按操作序号记录进度。
+    """
+    operations = []
+    for segment in plan["segments"]:
+        segment_dir = os.path.join(plan["input_dir"], segment["dir"])
+        for frame, action, output in zip(
+            segment["frames"], segment["actions"], segment["outputs"]
+        ):
+            src = os.path.join(segment_dir, frame)
+            if plan["mode"] == 1 and action != KEEP:
+                operations.append((src, None, frame))
+            elif plan["mode"] in [2, 3] and output:
+                operations.append(
+                    (src, os.path.join(plan["output_dir"], output), frame)
+                )
+    return operations
+
+
+def summarize_plan(plan: dict) -> Dict[str, int]:
+    """统计计划中各类决定的帧数和待执行的文件操作数，不读取任何图像"""
+    counts = Counter(
+        action for segment in plan["segments"] for action in segment["actions"]
+    )
+    return {
+        "segments": len(plan["segments"]),
+        "frames": sum(counts.values()),
+        KEEP: counts[KEEP],
+        DROP: counts[DROP],
+        DROP_CROSS: counts[DROP_CROSS],
+        "operations": len(plan_operations(plan)),
+    }
+
+
+class PlanJournal:
+    """计划的执行日志
+
+    日志第一行是计划编号，之后每完成一批文件操作追加一行已完成的操作数并落盘。
+    中途崩溃后从最后一个完整的行继续执行；未记录的那一批会重新执行，
+    删除和输出操作都可以安全地重复。
+    """
+
+    def __init__(self, plan_path: str, plan_id: str):
+        self.path = self.journal_path(plan_path)
+        self.plan_id = plan_id
+        self.applied = 0
+        self._valid = False
+        self._load()
+
+    @staticmethod
+    def journal_path(plan_path: str) -> str:
+        return plan_path + ".journal"
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        # 属于其他计划的日志视为不存在，第一次记录时覆盖
+        if not lines or lines[0] != self.plan_id:
+            return
+        self._valid = True
+        for line in lines[1:]:
+            try:
+                self.applied = max(self.applied, int(line))
+            except ValueError:
+                # 崩溃时写了一半的行
+                continue
+
+    def record(self, applied: int) -> None:
+        """记录已完成的操作数"""
+        with open(self.path, "a" if self._valid else "w", encoding="utf-8") as f:
+            if not self._valid:
+                f.write(self.plan_id + "\n")
+                self._valid = True
+            f.write(f"{applied}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.applied = applied
+
+
+def apply_plan(
+    plan_path: str,
+    log_callback: Callable[[str], None],
+    progress_callback: Callable[[float, str], None] = lambda progress, status: None,
+    should_stop: Callable[[], bool] = lambda: False,
+    batch_size: int = APPLY_BATCH_SIZE,
+) -> int:
+    """按计划批量执行文件操作，返回本次执行的操作数
+
+    已记录在执行日志中的操作直接跳过。执行时只检查文件是否存在，不解码图像；
+    帧的哈希从源目录的哈希索引复制到输出目录的索引。
+    """
+    plan = load_plan(plan_path)
+    operations = plan_operations(plan)
+    journal = PlanJournal(plan_path, plan["id"])
+    total = len(operations)
+    if total == 0:
+        log_callback("计划中没有需要执行的文件操作")
+        return 0
+    if journal.applied >= total:
+        log_callback("计划已执行完毕，无需重复执行")
+        return 0
+    if journal.applied:
+        log_callback(f"从第 {journal.applied + 1}/{total} 个操作继续执行计划")
+    if plan["mode"] in [2, 3]:
+        os.makedirs(plan["output_dir"], exist_ok=True)
+
+    indexes = {}
+
+    def get_index(directory):
+        if directory not in indexes:
+            indexes[directory] = HashIndex(directory, plan["hash_type"])
+        return indexes[directory]
+
+    start = journal.applied
+    try:
+        for batch_start in range(journal.applied, total, batch_size):
+            if should_stop():
+                break
+            batch = operations[batch_start : batch_start + batch_size]
+            if plan["mode"] == 1:
+                remove_files([src for src, _, _ in batch])
+                for _, _, frame in batch:
+                    log_callback(f"删除冗余帧: {frame}")
+            else:
+                _apply_outputs(batch, plan["output_strategy"], get_index, log_callback)
+            journal.record(batch_start + len(batch))
+            progress_callback(
+                journal.applied / total * 100, f"执行计划 {journal.applied}/{total}"
+            )
+    finally:
+        for index in indexes.values():
+            index.save()
+    return journal.applied - start
+
+
+def _apply_outputs(batch, strategy, get_index, log_callback):
+    """把一批保留帧输出到输出目录，并沿用源文件的哈希"""
+    pairs = []
+    hashes = []
+    for src, dst, frame in batch:
+        if not os.path.exists(src):
+            # 重新执行崩溃前的一批时，移动过的帧源文件已不存在
+            if not os.path.exists(dst):
+                log_callback(f"源文件不存在，跳过: {frame}")
+            continue
+        directory, filename = os.path.split(src)
+        # 移动会让源文件消失，哈希需在输出前从索引取得
+        hashes.append(get_index(directory).lookup(filename))
+        pairs.append((src, dst))
+
+    methods = materialize_files(pairs, strategy)
+    for (src, dst), value, method in zip(pairs, hashes, methods):
+        directory, filename = os.path.split(dst)
+        log_callback(
+            f"{_METHOD_LABELS[method]}帧: {os.path.basename(src)} -> {filename}"
+        )
+        if value is not None:
+            get_index(directory).put(filename, value)
@@ -0,0 +1,79 @@
+from typing import List
+
+import cv2
+import numpy as np
+
+# SSIM 常数和高斯窗口（11x11，sigma=1.5）
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+_KSIZE = (11, 11)
+_SIGMA = 1.5
+
+# OpenCV 滤波一次最多处理的通道数，批量计算时按此分块
+_MAX_CHANNELS = 512
+
+
+def _blur(image: np.ndarray) -> np.ndarray:
+    """高斯模糊，(高, 宽, N) 的数组按通道独立处理"""
+    return cv2.GaussianBlur(image, _KSIZE, _SIGMA)
+
+
+def downscale(gray: np.ndarray, max_side: int = 0) -> np.ndarray:
+    """把灰度图转换为 float32，max_side 大于 0 时把长边缩小到不超过该值"""
+    h, w = gray.shape
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32)
+
+
+class SSIMReference:
+    """一幅参考图像的 SSIM 统计量
+
+    参考图的均值和方差只计算一次，之后与任意多个候选图比较时只需计算
+    候选图自身的统计量和协方差。全部运算使用 float32。
+    """
+
+    def __init__(self, gray: np.ndarray):
+        self.image = gray
+        self.shape = gray.shape
+        self.mu = _blur(gray)
+        self.mu_sq = self.mu * self.mu
+        self.sigma_sq = _blur(gray * gray) - self.mu_sq
+
+    def _fit(self, gray: np.ndarray) -> np.ndarray:
+        """把候选图缩放到参考图的尺寸"""
+        if gray.shape != self.shape:
+            gray = cv2.resize(
+                gray, (self.shape[1], self.shape[0]), interpolation=cv2.INTER_AREA
+            )
+        return gray
+
+    def score(self, gray: np.ndarray) -> float:
+        """计算一幅候选图与参考图的平均 SSIM"""
+        return float(self.score_batch([gray])[0])
+
+    def score_batch(self, grays: List[np.ndarray]) -> np.ndarray:
+        """计算多幅候选图与参考图的平均 SSIM
+
+        候选图沿通道维堆叠后一次完成模糊和逐像素运算，返回每幅候选图的分数。
+        """
+        scores = []
+        for start in range(0, len(grays), _MAX_CHANNELS):
+            batch = np.dstack(
+                [self._fit(g) for g in grays[start : start + _MAX_CHANNELS]]
+            )
+            ref = self.image[..., None]
+            mu_ref = self.mu[..., None]
+            mu = _blur(batch).reshape(batch.shape)
+            mu_sq = mu * mu
+            mu_cross = mu * mu_ref
+            sigma_sq = _blur(batch * batch).reshape(batch.shape) - mu_sq
+            sigma_cross = _blur(batch * ref).reshape(batch.shape) - mu_cross
+            ssim_map = ((2 * mu_cross + C1) * (2 * sigma_cross + C2)) / (
+                (mu_sq + self.mu_sq[..., None] + C1)
+                * (sigma_sq + self.sigma_sq[..., None] + C2)
+            )
+            scores.append(ssim_map.mean(axis=(0, 1)))
+        return np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
@@ -1,8 +1,11 @@
+import threading
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-from gui.widgets import DirectorySelector, ParameterFrame, ProgressFrame, LogFrame
+from tkinter import filedialog, messagebox, ttk
+
 from core.deduplicator import Deduplicator
-import threading
+from gui.widgets import DirectorySelector, LogFrame, ParameterFrame, ProgressFrame
+from utils.events import EventBus, LogEvent, ProgressEvent, pump_tk
+
 
 class MainWindow:
     def __init__(self, root, config, logger):
@@ -11,29 +14,56 @@ class MainWindow:
         self.logger = logger
         self.deduplicator = None
         self.processing = False
-        
+
         self._create_widgets()
         self._setup_layout()
-        
+
+        # 去重线程只向事件总线发布进度和日志，界面在主线程中限速成批刷新
+        self.events = EventBus()
+        self.events.subscribe(self._on_events)
+        pump_tk(self.root, self.events)
+
+    def _on_events(self, events):
+        messages = [event.message for event in events if isinstance(event, LogEvent)]
+        if messages:
+            self.log_frame.add_logs(messages)
+        progress = [event for event in events if isinstance(event, ProgressEvent)]
+        if progress:
+            self.progress_frame.update_progress(
+                progress[-1].percent, progress[-1].message
+            )
+
+    def _progress(self, progress, status):
+        self.events.progress("seqpurge", progress, 100, status)
+
     def _create_widgets(self):
         # 创建主框架
         self.main_frame = ttk.Frame(self.root, padding="10")
-        
+
         # 创建各个功能区域
         self.dir_selector = DirectorySelector(self.main_frame)
         self.param_frame = ParameterFrame(self.main_frame, self.config)
         self.progress_frame = ProgressFrame(self.main_frame)
         self.log_frame = LogFrame(self.main_frame)
-        
+
         # 创建控制按钮
         self.control_frame = ttk.Frame(self.main_frame)
-        self.start_button = ttk.Button(self.control_frame, text="开始处理", command=self.start_processing)
-        self.stop_button = ttk.Button(self.control_frame, text="停止处理", command=self.stop_processing, state=tk.DISABLED)
-        self.cross_dedup_button = ttk.Button(self.control_frame, text="输出目录跨片去重", command=self.start_cross_dedup)
-        
+        self.start_button = ttk.Button(
+            self.control_frame, text="开始处理", command=self.start_processing
+        )
+        self.stop_button = ttk.Button(
+            self.control_frame,
+            text="停止处理",
+            command=self.stop_processing,
+            state=tk.DISABLED,
+        )
+        self.cross_dedup_button = ttk.Button(
+            self.control_frame, text="输出目录跨片去重", command=self.start_cross_dedup
+        )
+
     def _setup_layout(self):
         self.main_frame.pack(fill=tk.BOTH, expand=True)
-        
+
         # 布局各个组件
         self.dir_selector.pack(fill=tk.X, pady=5)
         self.param_frame.pack(fill=tk.X, pady=5)
@@ -43,31 +73,33 @@ class MainWindow:
         self.cross_dedup_button.pack(side=tk.LEFT, padx=5)
         self.progress_frame.pack(fill=tk.X, pady=5)
         self.log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        
+
     def start_processing(self):
         if self.processing:
             return
-            
+
         # 获取参数
         input_dir = self.dir_selector.get_input_dir()
         output_dir = self.dir_selector.get_output_dir()
         mode = self.param_frame.get_mode()
         threshold = self.param_frame.get_threshold()
         algorithm = self.param_frame.get_algorithm()
-        
+        global_search = self.param_frame.get_global_search()
+        output_strategy = self.param_frame.get_output_strategy()
+
         if not input_dir:
             messagebox.showerror("错误", "请选择输入目录")
             return
-            
+
         if mode in [2, 3] and not output_dir:
             messagebox.showerror("错误", "请选择输出目录")
             return
-            
+
         # 更新UI状态
         self.processing = True
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
-        
+
         # 创建去重器实例
         self.deduplicator = Deduplicator(
             input_dir=input_dir,
@@ -75,14 +107,16 @@ class MainWindow:
             mode=mode,
             threshold=threshold,
             algorithm=algorithm,
-            progress_callback=self.progress_frame.update_progress,
-            log_callback=self.log_frame.add_log
+            global_search=global_search,
+            output_strategy=output_strategy,
+            progress_callback=self._progress,
+            log_callback=self.events.log,
         )
-        
+
         # 在新线程中启动处理
         self.processing_thread = threading.Thread(target=self._process)
         self.processing_thread.start()
-        
+
     def _process(self):
         try:
             self.deduplicator.process()
@@ -91,33 +125,34 @@ class MainWindow:
             messagebox.showerror("错误", f"处理过程中发生错误: {str(e)}")
         finally:
             self._processing_complete()
-            
+
     def stop_processing(self):
         if self.deduplicator:
             self.deduplicator.stop()
             self.processing = False
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
-            
+
     def start_cross_dedup(self):
         if self.processing:
             return
-            
+
         # 获取输出目录
         output_dir = self.dir_selector.get_output_dir()
         if not output_dir:
             messagebox.showerror("错误", "请选择输出目录")
             return
-            
+
         # 获取参数
         threshold = self.param_frame.get_threshold()
         algorithm = self.param_frame.get_algorithm()
-        
+        global_search = self.param_frame.get_global_search()
+
         # 更新UI状态
         self.processing = True
         self.cross_dedup_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
-        
+
         # 创建去重器实例
         self.deduplicator = Deduplicator(
             input_dir="",  # 不需要输入目录
@@ -125,27 +160,28 @@ class MainWindow:
             mode=2,  # 使用模式2
             threshold=threshold,
             algorithm=algorithm,
-            progress_callback=self.progress_frame.update_progress,
-            log_callback=self.log_frame.add_log
+            global_search=global_search,
+            progress_callback=self._progress,
+            log_callback=self.events.log,
         )
-        
+
         # 在新线程中启动处理
         self.processing_thread = threading.Thread(target=self._process_cross_dedup)
         self.processing_thread.start()
-        
+
     def _process_cross_dedup(self):
         try:
-            # 直接调用跨片段去重
-            self.deduplicator._process_cross_segments([])
+            # 对输出目录中已有的帧生成去重计划并执行
+            self.deduplicator.process_output_dir()
         except Exception as e:
             self.logger.error(f"跨片段去重过程中发生错误: {str(e)}")
             messagebox.showerror("错误", f"跨片段去重过程中发生错误: {str(e)}")
         finally:
             self._processing_complete()
-            
+
     def _processing_complete(self):
         self.processing = False
         self.root.after(0, lambda: self.start_button.config(state=tk.NORMAL))
         self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
         self.root.after(0, lambda: self.cross_dedup_button.config(state=tk.NORMAL))
-        messagebox.showinfo("完成", "处理完成") 
\ No newline at end of file
+        messagebox.showinfo("完成", "处理完成")
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+# 事件总线只依赖标准库，SeqPurge 单独运行时可用；videoxt.events 直接沿用此实现
+
+
+@dataclass
+class ProgressEvent:
+    """进度事件，同一来源只保留最新的一条"""
+
+    source: str  # 进度来源，如视频文件名
+    done: float  # 已完成的数量
+    total: float  # 总数量
+    message: str = ""  # 状态说明
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def percent(self) -> float:
+        """完成百分比（0-100）"""
+        return min(self.done / self.total * 100, 100.0) if self.total else 0.0
+
+
+@dataclass
+class LogEvent:
+    """日志事件"""
+
+    message: str
+    level: str = "info"  # 日志级别（info/warning/error）
+    source: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+
+Event = Union[ProgressEvent, LogEvent]
+Sink = Callable[[List[Event]], None]
+
+
+class EventBus:
+    """限速的事件总线
+
+    发布事件只是一次加锁的入队；日志进入有界队列，队列满时丢弃最早的日志并在
+    下一批中说明丢弃的条数，进度按来源合并。接收端由 flush 成批调用，每次收到
+    一个事件列表，调用频率不超过 max_rate。
+    """
+
+    def __init__(self, max_rate: float = 10.0, max_logs: int = 1000):
+        # max_rate：每秒最多投递的批次数；max_logs：两次投递之间最多缓存的日志条数
+        self.interval = 1.0 / max_rate
+        self._logs: deque = deque(maxlen=max_logs)
+        self._dropped = 0
+        self._progress: Dict[str, ProgressEvent] = {}
+        self._sinks: List[Sink] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, sink: Sink) -> None:
+        """注册接收端，接收端在投递线程中被调用"""
+        self._sinks.append(sink)
+
+    def publish(self, event: Event) -> None:
+        """发布事件，可在任意线程中调用"""
+        with self._lock:
+            if isinstance(event, ProgressEvent):
+                self._progress[event.source] = event
+            else:
+                if len(self._logs) == self._logs.maxlen:
+                    self._dropped += 1
+                self._logs.append(event)
+
+    def progress(
+        self, source: str, done: float, total: float, message: str = ""
+    ) -> None:
+        """发布进度事件"""
+        self.publish(ProgressEvent(source, done, total, message))
+
+    def log(self, message: str, level: str = "info", source: str = "") -> None:
+        """发布日志事件"""
+        self.publish(LogEvent(message, level, source))
+
+    def drain(self) -> List[Event]:
+        """取出待投递的事件：先是按顺序的日志，然后是各来源的最新进度"""
+        with self._lock:
+            events: List[Event] = list(self._logs)
+            dropped, self._dropped = self._dropped, 0
+            events.extend(self._progress.values())
+            self._logs.clear()
+            self._progress.clear()
+        if dropped:
+            events.insert(0, LogEvent(f"…… 省略 {dropped} 条日志", level="warning"))
+        return events
+
+    def flush(self) -> None:
+        """立即把待投递的事件交给所有接收端"""
+        events = self.drain()
+        if events:
+            for sink in self._sinks:
+                sink(events)
+
+    def start(self) -> "EventBus":
+        """启动后台投递线程，适用于可以在任意线程中调用的接收端"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self) -> None:
+        """停止后台投递线程并投递剩余的事件"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __enter__(self) -> "EventBus":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FileSink:
+    """把事件逐行写为 JSON 的接收端"""
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, events: List[Event]) -> None:
+        for event in events:
+            record = {
+                "type": "progress" if isinstance(event, ProgressEvent) else "log",
+                **asdict(event),
+            }
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def pump_tk(root, bus: EventBus) -> Callable[[], None]:
+    """在 Tk 主循环中按总线的投递间隔调用 flush，返回停止投递的函数
+
+    接收端因此总在 Tk 主线程中执行，可以直接操作控件；停止时先投递剩余的事件。
+    """
+    interval_ms = max(int(bus.interval * 1000), 1)
+    pending = [None]
+
+    def tick():
+        bus.flush()
+        pending[0] = root.after(interval_ms, tick)
+
+    def stop():
+        if pending[0] is not None:
+            root.after_cancel(pending[0])
+            pending[0] = None
+        bus.flush()
+
+    pending[0] = root.after(interval_ms, tick)
+    return stop
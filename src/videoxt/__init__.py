@@ -5,23 +5,39 @@
 
 __version__ = "0.1.0"
 
+from .batch import collect_videos
 from .controllers import ExtractionConfig, VideoExtractor
+from .dedup import FrameDeduplicator
+from .encoders import FrameEncoder, available_formats, register_encoder
 from .models import (
     AudioSegment,
+    BatchResult,
+    DroppedFrame,
+    EncodeStats,
     ExtractionResult,
     ExtractionTask,
     KeyframeInfo,
     VideoMetadata,
 )
 
+# isort: split
 # 导出GUI相关接口
-from .gui import VideoExtractorGUI, main as gui_main
+from .gui import VideoExtractorGUI
+from .gui import main as gui_main
 from .gui_launcher import launch
 
 __all__ = [
     "ExtractionConfig",
     "VideoExtractor",
+    "FrameEncoder",
+    "available_formats",
+    "register_encoder",
+    "collect_videos",
+    "FrameDeduplicator",
     "AudioSegment",
+    "BatchResult",
+    "DroppedFrame",
+    "EncodeStats",
     "ExtractionResult",
     "ExtractionTask",
     "KeyframeInfo",
@@ -29,4 +45,4 @@ __all__ = [
     "VideoExtractorGUI",
     "gui_main",
     "launch",
-] 
\ No newline at end of file
+]
@@ -0,0 +1,223 @@
+"""音频输出模块。
+
+此模块定义了音频的输出格式和输出模式：每个片段单独输出音频，或整个视频
+只输出一个音频文件，再用采样偏移索引把各片段映射到其中的区间。
+"""
+
+import json
+import struct
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import AudioSegment, ExtractionTask
+
+# 音频模式：segment 每个片段单独输出音频；whole 整个视频只输出一个音频文件，
+# 各片段以偏移索引引用其中的区间；none 不提取音频
+AUDIO_MODES = ("segment", "whole", "none")
+
+# 音频输出格式对应的 (编码器, 扩展名)
+_AUDIO_FORMATS = {
+    "mp3": ("libmp3lame", "mp3"),
+    "aac": ("aac", "m4a"),
+    "wav": ("pcm_s16le", "wav"),
+    "flac": ("flac", "flac"),
+    "opus": ("libopus", "opus"),
+    "ogg": ("libvorbis", "ogg"),
+}
+
+# 复制音频流时源编码对应的容器扩展名，未列出的编码放入 Matroska 音频容器
+_COPY_CONTAINERS = {
+    "aac": "m4a",
+    "alac": "m4a",
+    "mp3": "mp3",
+    "flac": "flac",
+    "opus": "opus",
+    "vorbis": "ogg",
+    "ac3": "ac3",
+    "eac3": "eac3",
+    "pcm_s16le": "wav",
+    "pcm_s24le": "wav",
+    "pcm_f32le": "wav",
+}
+
+# 可选的音频格式，copy 表示不重新编码、直接复制源音频流
+AUDIO_FORMATS = tuple(_AUDIO_FORMATS) + ("copy",)
+
+# 整体音频模式下的偏移索引文件名，位于视频的输出目录下
+AUDIO_INDEX_FILE = "audio_index.json"
+
+
+def audio_output(audio_format: str, source_codec: str) -> Tuple[str, Dict[str, str]]:
+    """返回音频输出的扩展名和传给 ffmpeg 的编码参数。
+
+    Args:
+        audio_format: 音频格式，不区分大小写
+        source_codec: 源音频流的编码名称，copy 格式据此选择容器
+
+    Returns:
+        Tuple[str, Dict[str, str]]: (扩展名, 编码参数)
+
+    Raises:
+        ValueError: 当格式不受支持时抛出
+    """
+    audio_format = audio_format.lower()
+    if audio_format == "copy":
+        return _COPY_CONTAINERS.get(source_codec, "mka"), {"acodec": "copy"}
+    try:
+        codec, extension = _AUDIO_FORMATS[audio_format]
+    except KeyError:
+        raise ValueError(
+            f"不支持的音频格式: {audio_format}，可选值: {', '.join(AUDIO_FORMATS)}"
+        )
+    return extension, {"acodec": codec}
+
+
+def validate_audio_options(audio_format: str, audio_mode: str) -> None:
+    """校验音频格式和模式。
+
+    Raises:
+        ValueError: 当格式或模式不受支持时抛出
+    """
+    if audio_mode not in AUDIO_MODES:
+        raise ValueError(
+            f"不支持的音频模式: {audio_mode}，可选值: {', '.join(AUDIO_MODES)}"
+        )
+    audio_output(audio_format, "")
+
+
+def wav_layout(path: Path) -> Optional[Tuple[int, int]]:
+    """读取 WAV 文件中采样数据的起始字节和每个采样帧的字节数。
+
+    Returns:
+        Optional[Tuple[int, int]]: (data 块起始偏移, block_align)，不是 PCM WAV 时返回 None
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return None
+            block_align = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size + (size & 1))
+                    block_align = struct.unpack("<H", fmt[12:14])[0]
+                elif chunk_id == b"data":
+                    return (f.tell(), block_align) if block_align else None
+                else:
+                    f.seek(size + (size & 1), 1)
+    except (OSError, struct.error):
+        return None
+
+
+def slice_audio(
+    full_audio: AudioSegment, start_time: float, end_time: float
+) -> AudioSegment:
+    """把整体音频中的一个时间段表示为音频片段。
+
+    Args:
+        full_audio: 整个视频的音频
+        start_time: 开始时间（秒）
+        end_time: 结束时间（秒）
+
+    Returns:
+        AudioSegment: 指向整体音频文件的片段，带采样偏移；PCM WAV 还带字节偏移
+    """
+    first = round(start_time * full_audio.sample_rate)
+    count = max(round(end_time * full_audio.sample_rate) - first, 0)
+    if full_audio.sample_count is not None:
+        first = min(first, full_audio.sample_count)
+        count = min(count, full_audio.sample_count - first)
+
+    byte_offset = byte_length = None
+    layout = (
+        wav_layout(full_audio.file_path)
+        if full_audio.file_path.suffix == ".wav"
+        else None
+    )
+    if layout:
+        data_offset, block_align = layout
+        byte_offset = data_offset + first * block_align
+        byte_length = count * block_align
+
+    return AudioSegment(
+        start_time=start_time,
+        end_time=end_time,
+        file_path=full_audio.file_path,
+        sample_rate=full_audio.sample_rate,
+        channels=full_audio.channels,
+        sample_offset=first,
+        sample_count=count,
+        byte_offset=byte_offset,
+        byte_length=byte_length,
+    )
+
+
+def _source_key(video_path: Path, audio_format: str) -> Dict:
+    """整体音频对应的源文件和格式，任何一项变化都需要重新提取。"""
+    stat = video_path.stat()
+    return {
+        "video_path": str(video_path.resolve()),
+        "video_size": stat.st_size,
+        "video_mtime_ns": stat.st_mtime_ns,
+        "audio_format": audio_format,
+    }
+
+
+def read_audio_index(
+    output_dir: Path, video_path: Path, audio_format: str
+) -> Optional[AudioSegment]:
+    """读取已有的整体音频索引。
+
+    Returns:
+        Optional[AudioSegment]: 索引与源文件、格式一致且音频文件存在时返回整体音频，否则返回 None
+    """
+    try:
+        with open(output_dir / AUDIO_INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index["source"] != _source_key(video_path, audio_format):
+            return None
+        full_audio = dict(index["audio"])
+        full_audio["file_path"] = output_dir / full_audio["file_path"]
+        full_audio = AudioSegment(**full_audio)
+        return full_audio if full_audio.file_path.is_file() else None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_audio_index(
+    output_dir: Path,
+    video_path: Path,
+    audio_format: str,
+    full_audio: AudioSegment,
+    tasks: List[ExtractionTask],
+) -> None:
+    """写出整体音频及各片段偏移的索引文件。
+
+    Args:
+        output_dir: 输出目录
+        video_path: 视频文件路径
+        audio_format: 音频格式
+        full_audio: 整个视频的音频
+        tasks: 任务列表，每个片段记录一条偏移
+    """
+
+    def entry(segment: AudioSegment) -> Dict:
+        data = asdict(segment)
+        data["file_path"] = segment.file_path.name
+        return data
+
+    index = {
+        "source": _source_key(video_path, audio_format),
+        "audio": entry(full_audio),
+        "segments": {
+            task.task_id: entry(slice_audio(full_audio, task.start_time, task.end_time))
+            for task in tasks
+        },
+    }
+    with open(output_dir / AUDIO_INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
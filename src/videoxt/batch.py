@@ -0,0 +1,123 @@
+"""批量输入处理模块。
+
+此模块负责把目录、通配符和清单文件展开为视频文件列表，并为每个视频
+分配互不冲突的输出目录。
+"""
+
+import glob
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+# 识别为视频文件的扩展名
+VIDEO_EXTENSIONS = (
+    ".mp4",
+    ".avi",
+    ".mov",
+    ".mkv",
+    ".flv",
+    ".wmv",
+    ".webm",
+    ".m4v",
+    ".ts",
+)
+
+PathLike = Union[str, Path]
+
+
+def _read_manifest(manifest: Path) -> List[str]:
+    """读取清单文件。
+
+    支持 JSON 数组，或每行一个路径的文本文件（忽略空行和 ``#`` 开头的注释）。
+    相对路径相对于清单文件所在目录解析。
+    """
+    text = manifest.read_text(encoding="utf-8")
+    if manifest.suffix.lower() == ".json":
+        entries = [str(item) for item in json.loads(text)]
+    else:
+        entries = [
+            line.strip()
+            for line in text.splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+    return [
+        str(manifest.parent / entry) if not Path(entry).is_absolute() else entry
+        for entry in entries
+    ]
+
+
+def collect_videos(
+    inputs: Iterable[PathLike],
+    manifest: Optional[PathLike] = None,
+    recursive: bool = False,
+) -> List[Path]:
+    """把输入展开为去重后的视频文件列表。
+
+    Args:
+        inputs: 视频文件、目录或通配符（如 ``clips/*.mp4``）
+        manifest: 可选的清单文件，其中的条目按同样规则展开
+        recursive: 目录输入是否递归查找子目录
+
+    Returns:
+        List[Path]: 按输入顺序排列的视频文件列表，目录和通配符内部按文件名排序
+
+    Raises:
+        FileNotFoundError: 当某个输入既不是文件、目录，也没有匹配到任何文件时抛出
+    """
+    entries = [str(item) for item in inputs]
+    if manifest is not None:
+        entries.extend(_read_manifest(Path(manifest)))
+
+    videos: List[Path] = []
+    seen = set()
+
+    def add(path: Path) -> None:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            videos.append(path)
+
+    for entry in entries:
+        path = Path(entry)
+        if path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            for candidate in sorted(path.glob(pattern)):
+                if candidate.is_file() and candidate.suffix.lower() in VIDEO_EXTENSIONS:
+                    add(candidate)
+        elif path.is_file():
+            add(path)
+        else:
+            matches = sorted(glob.glob(entry, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"找不到输入: {entry}")
+            for match in matches:
+                if Path(match).is_file():
+                    add(Path(match))
+
+    return videos
+
+
+def assign_output_dirs(videos: Sequence[Path], output_root: Path) -> Dict[Path, Path]:
+    """为每个视频分配独立的输出目录 ``<输出根目录>/<视频文件名>``。
+
+    不同目录下的同名视频依次追加 ``_2``、``_3`` 后缀，保证输出互不覆盖，
+    且同样的输入顺序总是得到同样的目录。
+
+    Args:
+        videos: 视频文件列表
+        output_root: 输出根目录
+
+    Returns:
+        Dict[Path, Path]: 视频路径到输出目录的映射
+    """
+    output_dirs: Dict[Path, Path] = {}
+    used = set()
+    for video in videos:
+        name = video.stem
+        suffix = 1
+        while name.lower() in used:
+            suffix += 1
+            name = f"{video.stem}_{suffix}"
+        used.add(name.lower())
+        output_dirs[video] = output_root / name
+    return output_dirs
@@ -0,0 +1,256 @@
+"""断点续传模块。
+
+此模块在输出目录中维护一份片段完成清单，记录每个 ``ExtractionTask`` 的
+处理参数、状态和输出文件。中断后重新运行时，参数一致且输出文件完好的
+片段直接从清单恢复，只重新处理缺失或失败的片段。
+"""
+
+import json
+import os
+import shutil
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import AudioSegment, DroppedFrame, ExtractionTask, KeyframeInfo, TaskResult
+
+# 完成清单的文件名，位于每个视频的输出目录下
+CHECKPOINT_FILE = "checkpoint.json"
+
+# 清单格式版本，格式不兼容时递增
+_VERSION = 2
+
+
+def _task_params(task: ExtractionTask) -> Dict:
+    """返回决定片段输出内容的任务参数。
+
+    视频文件的大小和修改时间也计入参数，源文件被替换后旧的输出不再有效。
+    """
+    stat = task.video_path.stat()
+    return {
+        "video_path": str(task.video_path.resolve()),
+        "video_size": stat.st_size,
+        "video_mtime_ns": stat.st_mtime_ns,
+        "start_time": task.start_time,
+        "end_time": task.end_time,
+        "interval_seconds": task.interval_seconds,
+        "single_pass": task.single_pass,
+        "frame_mode": task.frame_mode,
+        "scene_threshold": task.scene_threshold,
+        "scene_min_interval": task.scene_min_interval,
+        "scene_max_interval": task.scene_max_interval,
+        "dedup_algorithm": task.dedup_algorithm,
+        "dedup_threshold": task.dedup_threshold,
+        "image_format": task.image_format,
+        "quality": task.quality,
+        "png_compression": task.png_compression,
+        "audio_format": task.audio_format,
+        "audio_mode": task.audio_mode,
+    }
+
+
+class SegmentCheckpoint:
+    """片段完成清单。
+
+    每个片段开始处理和处理完成时都立即写回清单文件（先写临时文件再原子替换），
+    进程在任意时刻被终止，清单中记为完成的也只会是真正完成的片段。
+    """
+
+    def __init__(self, output_dir: Path):
+        """初始化并载入已有的清单。
+
+        Args:
+            output_dir: 视频的输出目录，清单保存在其中的 ``checkpoint.json``
+        """
+        self.output_dir = output_dir
+        self.path = output_dir / CHECKPOINT_FILE
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == _VERSION:
+                self._entries = dict(stored.get("segments", {}))
+        except (OSError, ValueError, AttributeError):
+            pass  # 清单不存在或已损坏时视为没有已完成的片段
+
+    def restore(self, task: ExtractionTask) -> Optional[TaskResult]:
+        """从清单恢复已完成片段的结果。
+
+        Args:
+            task: 处理任务
+
+        Returns:
+            Optional[TaskResult]: 片段已完成、参数一致且输出文件完好时返回其结果，否则返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(task.task_id)
+        if not entry or entry.get("status") != "done":
+            return None
+        try:
+            if entry.get("params") != _task_params(task):
+                return None
+            segment_dir = task.output_dir / f"segment_{task.task_id}"
+            keyframes = [
+                KeyframeInfo(
+                    pts=frame["pts"],
+                    frame_type=frame["frame_type"],
+                    file_path=segment_dir / frame["file"],
+                    quality=frame["quality"],
+                )
+                for frame in entry["keyframes"]
+            ]
+            if (
+                sum(k.file_path.stat().st_size for k in keyframes)
+                != entry["frame_bytes"]
+            ):
+                return None
+
+            audio_segment = None
+            audio = entry.get("audio")
+            if audio:
+                # 音频路径相对于输出目录记录（whole 模式下不在片段目录中）
+                audio = dict(audio)
+                audio_segment = AudioSegment(
+                    file_path=task.output_dir / audio.pop("file"), **audio
+                )
+                if not audio_segment.file_path.is_file():
+                    return None
+        except (OSError, KeyError, TypeError):
+            return None  # 输出文件缺失或清单条目不完整时重新处理
+
+        return TaskResult(
+            task_id=task.task_id,
+            keyframes=keyframes,
+            audio_segment=audio_segment,
+            frame_bytes=entry["frame_bytes"],
+            extract_seconds=entry.get("extract_seconds", 0.0),
+            resumed=True,
+            dropped_frames=[
+                DroppedFrame(**frame) for frame in entry.get("dropped_frames", [])
+            ],
+        )
+
+    def partition(
+        self, tasks: List[ExtractionTask]
+    ) -> Tuple[List[TaskResult], List[ExtractionTask]]:
+        """把任务分为可恢复和需要处理两部分。
+
+        需要处理的片段如果在清单中有记录（开始后中断、失败或参数已变化），
+        会先清空其输出目录，避免残留文件混入新的结果；清单中没有记录的目录
+        可能来自更早的版本或其他运行，不做改动，见 ``unknown_dirs``。
+
+        Args:
+            tasks: 任务列表
+
+        Returns:
+            Tuple[List[TaskResult], List[ExtractionTask]]: (恢复的结果, 待处理的任务)
+        """
+        restored: List[TaskResult] = []
+        pending: List[ExtractionTask] = []
+        for task in tasks:
+            result = self.restore(task)
+            if result is not None:
+                restored.append(result)
+                continue
+            with self._lock:
+                recorded = task.task_id in self._entries
+            segment_dir = task.output_dir / f"segment_{task.task_id}"
+            if recorded and segment_dir.is_dir():
+                shutil.rmtree(segment_dir, ignore_errors=True)
+            pending.append(task)
+        return restored, pending
+
+    def unknown_dirs(self, tasks: List[ExtractionTask]) -> List[Path]:
+        """返回已经存在、但清单中没有记录的片段输出目录。
+
+        这些目录不是由本清单对应的运行创建的，``partition`` 不会清空它们，
+        其中已有的帧文件可能混入重新处理的结果，调用方应提示用户。
+
+        Args:
+            tasks: 任务列表
+
+        Returns:
+            List[Path]: 片段输出目录列表
+        """
+        with self._lock:
+            recorded = set(self._entries)
+        return [
+            task.output_dir / f"segment_{task.task_id}"
+            for task in tasks
+            if task.task_id not in recorded
+            and (task.output_dir / f"segment_{task.task_id}").is_dir()
+        ]
+
+    @staticmethod
+    def _audio_entry(
+        task: ExtractionTask, audio_segment: Optional[AudioSegment]
+    ) -> Optional[Dict]:
+        """把音频片段转换为清单条目，文件路径记为相对于输出目录的路径。"""
+        if audio_segment is None:
+            return None
+        entry = asdict(audio_segment)
+        del entry["file_path"]
+        entry["file"] = Path(
+            os.path.relpath(audio_segment.file_path, task.output_dir)
+        ).as_posix()
+        return entry
+
+    def start(self, task: ExtractionTask) -> None:
+        """在片段开始处理前记为进行中，中断后下次运行可以安全地清空其输出目录。
+
+        Args:
+            task: 处理任务
+        """
+        try:
+            params = _task_params(task)
+        except OSError:
+            return
+        self._write(task, {"status": "started", "params": params})
+
+    def record(self, task: ExtractionTask, result: TaskResult) -> None:
+        """记录片段的处理结果并写回清单文件。
+
+        Args:
+            task: 处理任务
+            result: 处理结果，``error`` 非空时记为失败，下次运行会重新处理
+        """
+        try:
+            params = _task_params(task)
+        except OSError:
+            return
+        if result.error:
+            entry = {"status": "failed", "params": params, "error": result.error}
+        else:
+            entry = {
+                "status": "done",
+                "params": params,
+                "keyframes": [
+                    {
+                        "file": k.file_path.name,
+                        "pts": k.pts,
+                        "frame_type": k.frame_type,
+                        "quality": k.quality,
+                    }
+                    for k in result.keyframes
+                ],
+                "audio": self._audio_entry(task, result.audio_segment),
+                "frame_bytes": result.frame_bytes,
+                "extract_seconds": result.extract_seconds,
+                "dropped_frames": [asdict(frame) for frame in result.dropped_frames],
+            }
+        self._write(task, entry)
+
+    def _write(self, task: ExtractionTask, entry: Dict) -> None:
+        """更新片段的条目并写回清单文件。"""
+        with self._lock:
+            self._entries[task.task_id] = entry
+            try:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": _VERSION, "segments": self._entries}, f)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass  # 清单写入失败只影响续传，不影响本次处理
@@ -1,57 +1,250 @@
 """命令行入口模块。"""
+
 import argparse
 import sys
 from pathlib import Path
 
 from .controllers import ExtractionConfig, VideoExtractor
+from .events import EventBus, FileSink
 
 
 def main():
     """命令行入口函数。"""
     parser = argparse.ArgumentParser(description="视频关键帧提取工具")
-    parser.add_argument("video_path", type=str, help="视频文件路径")
+    parser.add_argument(
+        "video_path",
+        type=str,
+        nargs="*",
+        help="视频文件路径；传入多个文件、目录或通配符时进入批量模式",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="批量模式的清单文件（每行一个视频路径，或 JSON 数组）",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true", help="批量模式下递归查找目录中的视频"
+    )
     parser.add_argument("--output-dir", type=str, help="输出目录路径")
-    parser.add_argument("--segment-duration", type=float, default=30.0,
-                      help="每个片段的时长（秒）")
-    parser.add_argument("--workers", type=int, help="工作进程数")
-    parser.add_argument("--format", type=str, default="png",
-                      help="输出图像格式")
-    parser.add_argument("--audio-format", type=str, default="mp3",
-                      help="输出音频格式")
-    parser.add_argument("--quality", type=int, default=95,
-                      help="输出质量（1-100）")
+    parser.add_argument(
+        "--segment-duration", type=float, default=30.0, help="每个片段的时长（秒）"
+    )
+    parser.add_argument("--workers", type=int, help="同时处理的片段数上限")
+    parser.add_argument(
+        "--ffmpeg-threads",
+        type=int,
+        help="每个 ffmpeg 进程的线程数，默认按CPU核心数自动分配",
+    )
+    parser.add_argument(
+        "--no-adaptive",
+        dest="adaptive",
+        action="store_false",
+        help="固定使用 --workers 个并发片段，不按负载动态调整",
+    )
+    parser.add_argument(
+        "--format", type=str, default="png", help="输出图像格式（png/jpg/webp/bmp/npy）"
+    )
+    parser.add_argument(
+        "--audio-format",
+        type=str,
+        default="mp3",
+        help="输出音频格式（mp3/aac/wav/flac/opus/ogg），copy 直接复制源音频流不重新编码",
+    )
+    parser.add_argument(
+        "--audio-mode",
+        type=str,
+        default="segment",
+        choices=["segment", "whole", "none"],
+        help="音频模式：segment 每个片段一个文件，whole 整个视频一个文件加偏移索引，none 不提取音频",
+    )
+    parser.add_argument(
+        "--quality", type=int, default=95, help="输出质量（1-100），用于 jpg/webp"
+    )
+    parser.add_argument(
+        "--png-compression",
+        type=int,
+        default=6,
+        help="PNG 压缩级别（0-9），越低编码越快",
+    )
+    parser.add_argument(
+        "--frame-mode",
+        type=str,
+        default="interval",
+        choices=["interval", "keyframe", "scene"],
+        help="抽帧模式：interval 按间隔抽帧，keyframe 只提取 I 帧，scene 按画面变化抽帧",
+    )
+    parser.add_argument(
+        "--scene-threshold",
+        type=float,
+        default=0.3,
+        help="scene 模式的场景切换分数阈值（0-1），越低抽帧越多",
+    )
+    parser.add_argument(
+        "--scene-min-interval",
+        type=float,
+        default=0.5,
+        help="scene 模式相邻两帧的最小间隔（秒）",
+    )
+    parser.add_argument(
+        "--scene-max-interval",
+        type=float,
+        default=10.0,
+        help="scene 模式画面无变化时的最大抽帧间隔（秒），0 表示不限制",
+    )
+    parser.add_argument(
+        "--dedup",
+        type=str,
+        dest="dedup_algorithm",
+        choices=["hash", "pixel", "hybrid"],
+        help="抽帧时去重：与上一保留帧重复的帧不编码也不写盘（算法同 SeqPurge）",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=5.0,
+        help="去重阈值（允许的差异百分比），越大去重越激进",
+    )
+    parser.add_argument(
+        "--no-keyframe-align",
+        dest="align_to_keyframes",
+        action="store_false",
+        help="按固定时长切分片段，不对齐到关键帧",
+    )
+    parser.add_argument(
+        "--metadata-cache",
+        type=str,
+        help="元数据缓存文件路径，probe 结果和关键帧索引会在多次运行间复用",
+    )
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="忽略输出目录中的完成清单，重新处理所有片段",
+    )
+    parser.add_argument(
+        "--event-log",
+        type=str,
+        help="把进度和错误事件逐行写为 JSON 的文件路径（限速写入）",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="把各片段各阶段的耗时导出为输出目录下的 trace.json（Chrome trace 格式）",
+    )
+    parser.add_argument(
+        "--no-single-pass",
+        dest="single_pass",
+        action="store_false",
+        help="分别启动 ffmpeg 提取帧和音频（默认一次调用同时提取）",
+    )
 
     args = parser.parse_args()
+    if not args.video_path and not args.manifest:
+        parser.error("请提供视频文件路径或 --manifest 清单文件")
 
     # 创建配置
     config = ExtractionConfig(
         segment_duration=args.segment_duration,
         n_workers=args.workers,
+        adaptive_concurrency=args.adaptive,
+        ffmpeg_threads=args.ffmpeg_threads,
         output_format=args.format,
         audio_format=args.audio_format,
-        quality=args.quality
+        audio_mode=args.audio_mode,
+        quality=args.quality,
+        png_compression=args.png_compression,
+        single_pass=args.single_pass,
+        frame_mode=args.frame_mode,
+        scene_threshold=args.scene_threshold,
+        scene_min_interval=args.scene_min_interval,
+        scene_max_interval=args.scene_max_interval,
+        dedup_algorithm=args.dedup_algorithm,
+        dedup_threshold=args.dedup_threshold,
+        align_to_keyframes=args.align_to_keyframes,
+        metadata_cache_file=args.metadata_cache,
+        resume=args.resume,
+        trace=args.trace,
     )
 
+    # 事件日志：进度和错误事件经限速总线成批写入文件
+    events = event_sink = None
+    if args.event_log:
+        event_sink = FileSink(args.event_log)
+        events = EventBus()
+        events.subscribe(event_sink)
+        events.start()
+
     # 创建提取器
-    extractor = VideoExtractor(config)
+    extractor = VideoExtractor(config, events=events)
 
     try:
+        single_video = (
+            len(args.video_path) == 1
+            and not args.manifest
+            and Path(args.video_path[0]).is_file()
+        )
+        if not single_video:
+            return _run_batch(extractor, args)
+
         # 执行提取
-        result = extractor.extract(args.video_path, args.output_dir)
-        
+        result = extractor.extract(args.video_path[0], args.output_dir)
+
         # 打印结果摘要
         print("\n处理完成！")
         print(f"总处理时间: {result.processing_time}")
         print(f"提取关键帧数: {len(result.keyframes)}")
         print(f"提取音频片段数: {len(result.audio_segments)}")
+        if result.dropped_frames:
+            print(f"去重丢弃帧数: {len(result.dropped_frames)}")
+        if result.resumed_segments:
+            print(f"从断点恢复片段数: {result.resumed_segments}")
+        if result.encode_stats:
+            stats = result.encode_stats
+            print(
+                f"帧编码: {stats.image_format}, {stats.frames_per_second:.1f} 帧/秒, "
+                f"平均 {stats.bytes_per_frame / 1024:.1f} KB/帧"
+            )
         if result.error_log:
             print(f"错误数: {len(result.error_log)}")
-        
+
         return 0
     except Exception as e:
         print(f"错误: {str(e)}", file=sys.stderr)
         return 1
+    finally:
+        if events is not None:
+            events.close()
+            event_sink.close()
+
+
+def _run_batch(extractor: VideoExtractor, args: argparse.Namespace) -> int:
+    """执行批量提取并打印汇总。
+
+    Returns:
+        int: 退出码，有视频无法处理或有片段失败时为 1，便于脚本判断
+    """
+    batch = extractor.extract_batch(
+        args.video_path,
+        args.output_dir or "output",
+        manifest=args.manifest,
+        recursive=args.recursive,
+    )
+
+    print("\n批量处理完成！")
+    print(f"总处理时间: {batch.processing_time}")
+    print(f"成功处理视频数: {len(batch.results)}")
+    print(f"提取关键帧总数: {sum(len(r.keyframes) for r in batch.results.values())}")
+    failed_segments = sum(
+        len(r.error_log) for r in batch.results.values() if r.error_log
+    )
+    if failed_segments:
+        print(f"失败片段数: {failed_segments}")
+    if batch.errors:
+        print(f"无法处理的视频数: {len(batch.errors)}")
+        for video, error in batch.errors.items():
+            print(f"  - {video}: {error}")
+    return 1 if batch.errors or failed_segments else 0
 
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -2,48 +2,170 @@
 
 此模块提供了视频处理的主要接口，包括配置管理和任务执行。
 """
+
 import json
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
 
-from .models import ExtractionResult
+from .batch import collect_videos
+from .events import EventBus
+from .ffmpeg import FFmpegWrapper, metadata_cache
+from .models import BatchResult, ExtractionResult, TaskResult
 from .scheduler import TaskScheduler
+from .tracing import summarize_spans, write_chrome_trace
 
 
 @dataclass
 class ExtractionConfig:
     """提取配置。"""
+
     segment_duration: float = 30.0  # 每个片段的时长（秒）
-    n_workers: Optional[int] = None  # 工作进程数
-    output_format: str = "png"  # 输出图像格式
-    audio_format: str = "mp3"  # 输出音频格式
-    quality: int = 95  # 输出质量（1-100）
+    n_workers: Optional[int] = None  # 同时处理的片段数上限
+    adaptive_concurrency: bool = True  # 是否按负载和吞吐量动态调整并发数
+    # 每个 ffmpeg 进程的线程数，默认按核心数自动分配
+    ffmpeg_threads: Optional[int] = None
+    output_format: str = "png"  # 输出图像格式（png/jpg/webp/bmp/npy）
+    # 输出音频格式（mp3/aac/wav/flac/opus/ogg），copy 直接复制源音频流
+    audio_format: str = "mp3"
+    # 音频模式（segment：每个片段一个文件；whole：整个视频一个文件加偏移索引；none：不提取）
+    audio_mode: str = "segment"
+    quality: int = 95  # 输出质量（1-100），用于 jpg/webp
+    png_compression: int = 6  # PNG 压缩级别（0-9），越低编码越快、文件越大
     interval_seconds: float = 0.5  # 帧提取间隔（秒）
+    single_pass: bool = True  # 是否用一次 ffmpeg 调用同时提取帧和音频
+    # 抽帧模式（interval：按间隔；keyframe：仅 I 帧；scene：按画面变化）
+    frame_mode: str = "interval"
+    scene_threshold: float = 0.3  # scene 模式的场景切换分数阈值（0-1），越低抽帧越多
+    scene_min_interval: float = 0.5  # scene 模式相邻两帧的最小间隔（秒）
+    # scene 模式画面无变化时的最大抽帧间隔（秒），0 表示不限制
+    scene_max_interval: float = 10.0
+    # 抽帧时的去重算法（hash/pixel/hybrid），重复帧不编码也不写盘
+    dedup_algorithm: Optional[str] = None
+    dedup_threshold: float = 5.0  # 去重阈值（允许的差异百分比），与 SeqPurge 含义相同
+    align_to_keyframes: bool = True  # 片段边界是否对齐到关键帧
+    # 元数据缓存文件，设置后 probe 结果和关键帧索引跨运行复用
+    metadata_cache_file: Optional[str] = None
+    resume: bool = True  # 是否跳过输出目录完成清单中已完成的片段（断点续传）
+    # 是否把各阶段耗时导出为输出目录下的 trace.json（Chrome trace 格式）
+    trace: bool = False
 
 
 class VideoExtractor:
     """视频提取器。"""
 
-    def __init__(self, config: Optional[Union[ExtractionConfig, Dict]] = None):
+    def __init__(
+        self,
+        config: Optional[Union[ExtractionConfig, Dict]] = None,
+        events: Optional[EventBus] = None,
+    ):
         """初始化提取器。
 
         Args:
             config: 提取配置，可以是ExtractionConfig实例或配置字典
+            events: 可选的事件总线，处理过程中的进度和错误发布到其中
         """
+        self.events = events
         if isinstance(config, dict):
             self.config = ExtractionConfig(**config)
         else:
             self.config = config or ExtractionConfig()
-        
-        self.scheduler = TaskScheduler(self.config.n_workers)
+
+        self._configure()
+
+    def _configure(self) -> None:
+        """按当前配置创建调度器并启用元数据缓存。"""
+        self.scheduler = TaskScheduler(
+            self.config.n_workers,
+            adaptive=self.config.adaptive_concurrency,
+            ffmpeg_threads=self.config.ffmpeg_threads,
+        )
+        self._attach_metadata_cache()
+
+    def _attach_metadata_cache(self) -> None:
+        """按配置启用元数据缓存的持久化。"""
+        if self.config.metadata_cache_file:
+            metadata_cache.attach(Path(self.config.metadata_cache_file))
+
+    def _update_config(self, config: Optional[Union[ExtractionConfig, Dict]]) -> None:
+        """替换当前配置。"""
+        if config is None:
+            return
+        if isinstance(config, dict):
+            self.config = ExtractionConfig(**config)
+        else:
+            self.config = config
+        self._configure()
+
+    def _task_options(self) -> Dict:
+        """把配置转换为调度器的处理参数。"""
+        return {
+            "interval_seconds": self.config.interval_seconds,
+            "single_pass": self.config.single_pass,
+            "frame_mode": self.config.frame_mode,
+            "scene_threshold": self.config.scene_threshold,
+            "scene_min_interval": self.config.scene_min_interval,
+            "scene_max_interval": self.config.scene_max_interval,
+            "dedup_algorithm": self.config.dedup_algorithm,
+            "dedup_threshold": self.config.dedup_threshold,
+            "segment_duration": self.config.segment_duration,
+            "align_to_keyframes": self.config.align_to_keyframes,
+            "image_format": self.config.output_format,
+            "quality": self.config.quality,
+            "png_compression": self.config.png_compression,
+            "audio_format": self.config.audio_format,
+            "audio_mode": self.config.audio_mode,
+            "resume": self.config.resume,
+        }
+
+    def _save_config(self, output_dir: Path) -> None:
+        """把当前配置保存到输出目录。"""
+        config_path = output_dir / "config.json"
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump(self.config.__dict__, f, indent=2)
+
+    def _build_report(
+        self, video_path: Path, output_dir: Path, result: ExtractionResult
+    ) -> Dict:
+        """生成单个视频的处理报告。"""
+        return {
+            "video_path": str(video_path),
+            "output_dir": str(output_dir),
+            "config": self.config.__dict__,
+            "processing_time": str(result.processing_time),
+            "total_keyframes": len(result.keyframes),
+            "total_audio_segments": len(result.audio_segments),
+            "error_count": len(result.error_log) if result.error_log else 0,
+            "resumed_segments": result.resumed_segments,
+            "dropped_frames": [asdict(frame) for frame in result.dropped_frames],
+            "encode_stats": (
+                result.encode_stats.to_dict() if result.encode_stats else None
+            ),
+            "timing": summarize_spans(
+                result.spans, result.processing_time.total_seconds()
+            ),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _write_outputs(
+        self, video_path: Path, output_dir: Path, result: ExtractionResult
+    ) -> Dict:
+        """写出单个视频的处理报告，启用 trace 时同时导出阶段耗时，返回报告内容。"""
+        report = self._build_report(video_path, output_dir, result)
+        with open(output_dir / "report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        if self.config.trace:
+            write_chrome_trace(output_dir / "trace.json", result.spans, video_path.name)
+        return report
 
     def extract(
         self,
         video_path: Union[str, Path],
         output_dir: Optional[Union[str, Path]] = None,
-        config: Optional[Union[ExtractionConfig, Dict]] = None
+        config: Optional[Union[ExtractionConfig, Dict]] = None,
     ) -> ExtractionResult:
         """提取视频内容。
 
@@ -63,40 +185,159 @@ class VideoExtractor:
             output_dir = Path(output_dir)
 
         # 更新配置
-        if config is not None:
-            if isinstance(config, dict):
-                self.config = ExtractionConfig(**config)
-            else:
-                self.config = config
+        self._update_config(config)
 
         # 创建输出目录
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # 保存配置
-        config_path = output_dir / "config.json"
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(self.config.__dict__, f, indent=2)
+        self._save_config(output_dir)
 
         # 处理视频
         result = self.scheduler.process_video(
-            video_path, 
-            output_dir,
-            interval_seconds=self.config.interval_seconds
+            video_path, output_dir, events=self.events, **self._task_options()
         )
 
         # 保存处理报告
-        report_path = output_dir / "report.json"
-        report = {
-            "video_path": str(video_path),
+        self._write_outputs(video_path, output_dir, result)
+
+        return result
+
+    def extract_batch(
+        self,
+        inputs: Iterable[Union[str, Path]],
+        output_dir: Union[str, Path] = "output",
+        config: Optional[Union[ExtractionConfig, Dict]] = None,
+        manifest: Optional[Union[str, Path]] = None,
+        recursive: bool = False,
+    ) -> BatchResult:
+        """批量提取多个视频。
+
+        所有视频的片段共享同一个工作池，每个视频的结果写入
+        ``<output_dir>/<视频文件名>`` 下，各自带有 ``report.json``；
+        根目录下另有汇总的 ``batch_report.json``。
+
+        Args:
+            inputs: 视频文件、目录或通配符
+            output_dir: 输出根目录，默认为当前目录下的output文件夹
+            config: 可选的提取配置
+            manifest: 可选的清单文件（每行一个路径，或 JSON 数组）
+            recursive: 目录输入是否递归查找子目录
+
+        Returns:
+            BatchResult: 批量提取结果
+
+        Raises:
+            ValueError: 当没有找到任何视频文件时抛出
+        """
+        videos = collect_videos(inputs, manifest=manifest, recursive=recursive)
+        if not videos:
+            raise ValueError("没有找到任何视频文件")
+        output_dir = Path(output_dir)
+
+        self._update_config(config)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._save_config(output_dir)
+
+        batch = self.scheduler.process_batch(
+            videos, output_dir, events=self.events, **self._task_options()
+        )
+
+        summaries = []
+        for video, result in batch.results.items():
+            video_output_dir = batch.output_dirs[video]
+            video_output_dir.mkdir(parents=True, exist_ok=True)
+            report = self._write_outputs(video, video_output_dir, result)
+            summaries.append(
+                {
+                    key: report[key]
+                    for key in (
+                        "video_path",
+                        "output_dir",
+                        "processing_time",
+                        "total_keyframes",
+                        "total_audio_segments",
+                        "error_count",
+                        "resumed_segments",
+                    )
+                }
+            )
+
+        batch_report = {
             "output_dir": str(output_dir),
             "config": self.config.__dict__,
-            "processing_time": str(result.processing_time),
-            "total_keyframes": len(result.keyframes),
-            "total_audio_segments": len(result.audio_segments),
-            "error_count": len(result.error_log) if result.error_log else 0,
-            "timestamp": datetime.now().isoformat()
+            "processing_time": str(batch.processing_time),
+            "total_videos": len(videos),
+            "failed_videos": {str(k): v for k, v in (batch.errors or {}).items()},
+            "videos": summaries,
+            "timestamp": datetime.now().isoformat(),
         }
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2)
+        with open(output_dir / "batch_report.json", "w", encoding="utf-8") as f:
+            json.dump(batch_report, f, indent=2, ensure_ascii=False)
+
+        return batch
+
+    def iter_results(
+        self,
+        video_path: Union[str, Path],
+        output_dir: Optional[Union[str, Path]] = None,
+        ordered: bool = False,
+    ) -> Iterator[TaskResult]:
+        """按当前配置提取视频，片段一完成就产出其结果。
+
+        帧和音频照常写入输出目录并记入完成清单，但结果不在内存中累积，
+        也不生成 ``report.json``，适合边提取边处理的长视频。
 
-        return result 
\ No newline at end of file
+        Args:
+            video_path: 视频文件路径
+            output_dir: 输出目录，默认为视频所在目录下的output文件夹
+            ordered: 为 True 时按片段时间顺序产出，片段内的帧已按时间戳排序
+
+        Yields:
+            TaskResult: 片段处理结果
+        """
+        video_path = Path(video_path)
+        output_dir = (
+            Path(output_dir) if output_dir is not None else video_path.parent / "output"
+        )
+        yield from self.scheduler.iter_results(
+            video_path, output_dir, ordered=ordered, **self._task_options()
+        )
+
+    def iter_frames(
+        self,
+        video_path: Union[str, Path],
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        gray: bool = False,
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """按当前配置逐帧解码视频，直接产出像素数组而不写出图像文件。
+
+        适合在进程内直接消费像素的场景（如模型推理），产出的数组是复用的
+        缓冲区，需要保留时请自行 ``copy()``。
+
+        Args:
+            video_path: 视频文件路径
+            start_time: 开始时间（秒），默认从头开始
+            end_time: 结束时间（秒），默认到视频结尾
+            gray: 是否输出单通道灰度图
+
+        Yields:
+            Tuple[float, np.ndarray]: (时间戳, 像素数组)
+        """
+        ffmpeg = FFmpegWrapper(
+            Path(video_path),
+            scene_threshold=self.config.scene_threshold,
+            scene_min_interval=self.config.scene_min_interval,
+            scene_max_interval=self.config.scene_max_interval,
+        )
+        if end_time is None:
+            end_time = ffmpeg.get_metadata().duration
+
+        yield from ffmpeg.iter_frames(
+            start_time,
+            end_time,
+            interval_seconds=self.config.interval_seconds,
+            frame_mode=self.config.frame_mode,
+            gray=gray,
+        )
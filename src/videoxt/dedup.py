@@ -0,0 +1,124 @@
+"""帧去重模块。
+
+此模块在抽帧流水线中直接对解码后的像素数组去重，判定规则与
+SeqPurge 的 ``ImageComparator`` 一致（平均哈希、SSIM 或两者结合），
+重复帧在编码和写盘之前就被丢弃。平均哈希和 SSIM 直接使用 SeqPurge 的实现，
+同一帧在两边得到相同的哈希和 SSIM 分数。
+"""
+
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from SeqPurge.core.image_utils import SSIM_MAX_SIDE
+from SeqPurge.core.perceptual_hash import image_hash
+from SeqPurge.core.ssim import SSIMReference, downscale
+
+from .models import DroppedFrame
+
+# 去重算法：hash 平均哈希；pixel 结构相似性（SSIM）；hybrid 哈希相似后再用 SSIM 确认
+DEDUP_ALGORITHMS = ("hash", "pixel", "hybrid")
+
+
+def _to_gray(frame: np.ndarray) -> np.ndarray:
+    """把 RGB 帧转换为 uint8 灰度图，与 SeqPurge 解码帧文件后的转换相同。"""
+    if frame.ndim == 2 or frame.shape[2] == 1:
+        return frame.reshape(frame.shape[0], frame.shape[1])
+    return cv2.cvtColor(np.ascontiguousarray(frame[..., :3]), cv2.COLOR_RGB2GRAY)
+
+
+def average_hash(frame: np.ndarray) -> int:
+    """计算帧的平均哈希。
+
+    Args:
+        frame: 形状为 (高, 宽, 3) 的 RGB 数组或 (高, 宽) 的灰度数组
+
+    Returns:
+        int: 打包为 64 位整数的哈希，与 SeqPurge 对同一帧计算的结果相同
+    """
+    return image_hash(_to_gray(frame), "ahash")
+
+
+class FrameDeduplicator:
+    """逐帧去重器。
+
+    每一帧与上一个保留帧比较，相似度超过 ``100 - threshold`` 即视为重复。
+    哈希和 SSIM 直接使用 SeqPurge 的实现，像素比对前同样把长边缩小到
+    ``SSIM_MAX_SIDE``。上一个保留帧的哈希和 SSIM 参考统计量会被缓存，
+    每帧只需计算自身的部分。
+    一个实例对应一个片段，被丢弃的帧记录在 ``dropped`` 中。
+    """
+
+    def __init__(self, algorithm: str = "hash", threshold: float = 5.0):
+        """初始化去重器。
+
+        Args:
+            algorithm: 去重算法（hash/pixel/hybrid）
+            threshold: 允许的差异百分比，越大去重越激进，与 SeqPurge 的阈值含义相同
+
+        Raises:
+            ValueError: 当算法不受支持时抛出
+        """
+        if algorithm not in DEDUP_ALGORITHMS:
+            raise ValueError(
+                f"不支持的去重算法: {algorithm}，可选值: {', '.join(DEDUP_ALGORITHMS)}"
+            )
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.dropped: List[DroppedFrame] = []
+        self._kept_pts: Optional[float] = None
+        self._kept_hash: Optional[int] = None
+        self._kept_reference: Optional[SSIMReference] = None
+
+    def _hash_similar(self, frame_hash: int) -> bool:
+        similarity = (64 - bin(frame_hash ^ self._kept_hash).count("1")) / 64 * 100
+        return similarity > (100 - self.threshold)
+
+    def _pixel_similar(self, small: np.ndarray) -> bool:
+        return self._kept_reference.score(small) * 100 > (100 - self.threshold)
+
+    def keep(self, pts: float, frame_type: str, frame: np.ndarray) -> bool:
+        """判断一帧是否需要保留，需要保留时将其设为新的比较基准。
+
+        Args:
+            pts: 帧时间戳
+            frame_type: 帧类型
+            frame: 像素数组
+
+        Returns:
+            bool: 不是重复帧时返回 True
+        """
+        gray = _to_gray(frame)
+        frame_hash = (
+            average_hash(gray) if self.algorithm in ("hash", "hybrid") else None
+        )
+        small = None
+
+        if self._kept_pts is not None:
+            if self.algorithm == "hash":
+                duplicate = self._hash_similar(frame_hash)
+            elif self.algorithm == "pixel":
+                small = downscale(gray, SSIM_MAX_SIDE)
+                duplicate = self._pixel_similar(small)
+            else:
+                # 先用哈希快速比较，相似时再用 SSIM 确认
+                duplicate = self._hash_similar(frame_hash)
+                if duplicate:
+                    small = downscale(gray, SSIM_MAX_SIDE)
+                    duplicate = self._pixel_similar(small)
+            if duplicate:
+                self.dropped.append(
+                    DroppedFrame(
+                        pts=pts, frame_type=frame_type, kept_pts=self._kept_pts
+                    )
+                )
+                return False
+
+        self._kept_pts = pts
+        self._kept_hash = frame_hash
+        if self.algorithm != "hash":
+            if small is None:
+                small = downscale(gray, SSIM_MAX_SIDE)
+            self._kept_reference = SSIMReference(small)
+        return True
@@ -0,0 +1,147 @@
+"""帧编码器模块。
+
+此模块定义了抽帧结果的输出格式，每种格式对应一个编码器，负责提供
+文件扩展名和传给 ffmpeg 的编码参数。新的格式可以通过 ``register_encoder`` 注册。
+"""
+
+from typing import Callable, Dict, List
+
+
+class FrameEncoder:
+    """帧编码器基类。"""
+
+    name = ""  # 格式名称
+    extension = ""  # 输出文件扩展名（不含点）
+    raw = False  # 为 True 时不经 ffmpeg 编码，由 Python 直接保存像素数组
+
+    def __init__(self, quality: int = 95, compression_level: int = 6):
+        """初始化编码器。
+
+        Args:
+            quality: 输出质量（1-100），只对有损格式生效
+            compression_level: 压缩级别（0-9），只对 PNG 生效
+        """
+        self.quality = min(max(int(quality), 1), 100)
+        self.compression_level = min(max(int(compression_level), 0), 9)
+
+    def output_kwargs(self) -> Dict[str, str]:
+        """返回传给 ffmpeg 输出的编码参数。"""
+        return {}
+
+    @property
+    def quality_score(self) -> float:
+        """写入 ``KeyframeInfo.quality`` 的质量分数（0-1），无损格式为 1.0。"""
+        return 1.0
+
+
+class PngEncoder(FrameEncoder):
+    """PNG 无损编码，压缩级别越高文件越小、编码越慢。"""
+
+    name = "png"
+    extension = "png"
+
+    def output_kwargs(self) -> Dict[str, str]:
+        return {"pix_fmt": "rgb24", "compression_level": str(self.compression_level)}
+
+
+class JpegEncoder(FrameEncoder):
+    """JPEG 有损编码。"""
+
+    name = "jpg"
+    extension = "jpg"
+
+    def output_kwargs(self) -> Dict[str, str]:
+        # 质量 1-100 线性映射到 mjpeg 的 qscale 31-2（越小质量越高）
+        qscale = round(31 - (self.quality - 1) * 29 / 99)
+        return {"pix_fmt": "yuvj420p", "qscale:v": str(qscale)}
+
+    @property
+    def quality_score(self) -> float:
+        return self.quality / 100
+
+
+class WebpEncoder(FrameEncoder):
+    """WebP 有损编码（需要 ffmpeg 编译时启用 libwebp）。"""
+
+    name = "webp"
+    extension = "webp"
+
+    def output_kwargs(self) -> Dict[str, str]:
+        return {
+            "vcodec": "libwebp",
+            "pix_fmt": "yuv420p",
+            "lossless": "0",
+            "quality": str(self.quality),
+        }
+
+    @property
+    def quality_score(self) -> float:
+        return self.quality / 100
+
+
+class BmpEncoder(FrameEncoder):
+    """BMP 无压缩位图。"""
+
+    name = "bmp"
+    extension = "bmp"
+
+    def output_kwargs(self) -> Dict[str, str]:
+        return {"pix_fmt": "bgr24"}
+
+
+class NpyEncoder(FrameEncoder):
+    """原始像素，每帧保存为一个 (高, 宽, 3) 的 uint8 ``.npy`` 数组。"""
+
+    name = "npy"
+    extension = "npy"
+    raw = True
+
+
+_ENCODERS: Dict[str, Callable[..., FrameEncoder]] = {
+    "png": PngEncoder,
+    "jpg": JpegEncoder,
+    "jpeg": JpegEncoder,
+    "webp": WebpEncoder,
+    "bmp": BmpEncoder,
+    "npy": NpyEncoder,
+}
+
+
+def register_encoder(name: str, factory: Callable[..., FrameEncoder]) -> None:
+    """注册新的输出格式。
+
+    Args:
+        name: 格式名称（即 ``ExtractionConfig.output_format`` 的取值）
+        factory: 接受 ``quality`` 和 ``compression_level`` 关键字参数并返回编码器的可调用对象
+    """
+    _ENCODERS[name.lower()] = factory
+
+
+def available_formats() -> List[str]:
+    """返回所有已注册的输出格式名称。"""
+    return sorted(_ENCODERS)
+
+
+def get_encoder(
+    name: str, quality: int = 95, compression_level: int = 6
+) -> FrameEncoder:
+    """按格式名称创建编码器。
+
+    Args:
+        name: 格式名称，不区分大小写
+        quality: 输出质量（1-100）
+        compression_level: PNG 压缩级别（0-9）
+
+    Returns:
+        FrameEncoder: 编码器实例
+
+    Raises:
+        ValueError: 当格式未注册时抛出
+    """
+    try:
+        factory = _ENCODERS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"不支持的输出格式: {name}，可选值: {', '.join(available_formats())}"
+        )
+    return factory(quality=quality, compression_level=compression_level)
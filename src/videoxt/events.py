@@ -0,0 +1,28 @@
+"""事件总线模块。
+
+处理过程中的进度和日志以结构化事件发布到总线，总线在有界队列中合并
+高频事件，再按固定的最高频率成批投递给 GUI、命令行或文件等接收端。
+发布事件只是一次加锁的入队操作，工作线程不会被界面刷新拖慢。
+
+实现与 SeqPurge 共用，见 ``SeqPurge.utils.events``。
+"""
+
+from SeqPurge.utils.events import (
+    Event,
+    EventBus,
+    FileSink,
+    LogEvent,
+    ProgressEvent,
+    Sink,
+    pump_tk,
+)
+
+__all__ = [
+    "Event",
+    "EventBus",
+    "FileSink",
+    "LogEvent",
+    "ProgressEvent",
+    "Sink",
+    "pump_tk",
+]
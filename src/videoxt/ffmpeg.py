@@ -2,33 +2,334 @@
 
 此模块封装了所有与 FFmpeg 相关的操作，包括视频元数据获取、关键帧提取等。
 """
+
 import json
+import os
+import queue
+import re
 import subprocess
+import threading
+from dataclasses import asdict
+from fractions import Fraction
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import ffmpeg
+import numpy as np
 from ffmpeg.nodes import Stream
 
-from .models import AudioSegment, KeyframeInfo, VideoMetadata, ExtractionTask
+from .audio import audio_output, wav_layout
+from .dedup import FrameDeduplicator
+from .encoders import FrameEncoder, PngEncoder
+from .models import AudioSegment, KeyframeInfo, VideoMetadata
+from .tracing import SpanRecorder
 
 
 class FFmpegError(Exception):
     """FFmpeg 操作异常。"""
+
     pass
 
 
+# 常见声道布局对应的声道数
+_CHANNEL_LAYOUTS = {
+    "mono": 1,
+    "stereo": 2,
+    "2.1": 3,
+    "quad": 4,
+    "4.0": 4,
+    "5.0": 5,
+    "5.1": 6,
+    "5.1(side)": 6,
+    "6.1": 7,
+    "7.1": 8,
+}
+
+
+# 抽帧模式：interval 按固定间隔抽帧；keyframe 只解码并输出 I 帧；
+# scene 按画面变化程度（场景切换分数）自适应抽帧
+FRAME_MODES = ("interval", "keyframe", "scene")
+
+_SHOWINFO_PATTERN = re.compile(
+    r"\[Parsed_showinfo_\d+ @ [^\]]+\] n:\s*(\d+)\s+pts:\s*-?\d+\s+"
+    r"pts_time:(-?[\d.]+(?:e[-+]?\d+)?).*?\btype:(\S)"
+)
+
+
+# metadata 滤镜先打印一行帧的时间戳，再打印场景切换分数（由 select 滤镜计算），
+# 两行都位于对应帧的 showinfo 行之前；没有分数的帧只有时间戳行
+_SCENE_FRAME_PATTERN = re.compile(
+    r"\[Parsed_metadata_\d+ @ [^\]]+\] frame:\s*\d+\s+pts:\s*-?\d+\s+"
+    r"pts_time:(-?[\d.]+(?:e[-+]?\d+)?)"
+)
+_SCENE_SCORE_PATTERN = re.compile(
+    r"\[Parsed_metadata_\d+ @ [^\]]+\] lavfi\.scene_score=([\d.]+)"
+)
+
+
+def _parse_showinfo(log: str) -> List[Tuple[float, str]]:
+    """从 showinfo 滤镜的日志中解析每个输出帧的时间戳和帧类型。
+
+    Args:
+        log: ffmpeg 标准错误输出
+
+    Returns:
+        List[Tuple[float, str]]: 按输出顺序排列的 (相对时间戳, 帧类型) 列表
+    """
+    frames = {}
+    for match in _SHOWINFO_PATTERN.finditer(log):
+        frames[int(match.group(1))] = (float(match.group(2)), match.group(3))
+    return [frames[n] for n in sorted(frames)]
+
+
+def _parse_scene_scores(log: str) -> Dict[float, float]:
+    """从 metadata 滤镜的日志中解析每帧的场景切换分数。
+
+    分数按帧的时间戳索引，而不是按出现顺序：某一帧缺少分数行时，
+    其后各帧的分数不会错位。
+
+    Args:
+        log: ffmpeg 标准错误输出
+
+    Returns:
+        Dict[float, float]: 相对时间戳（保留 6 位小数）到场景切换分数的映射
+    """
+    scores: Dict[float, float] = {}
+    pts_time = None
+    for line in log.splitlines():
+        match = _SCENE_FRAME_PATTERN.search(line)
+        if match is not None:
+            pts_time = round(float(match.group(1)), 6)
+            continue
+        match = _SCENE_SCORE_PATTERN.search(line)
+        if match is not None and pts_time is not None:
+            scores[pts_time] = float(match.group(1))
+            pts_time = None
+    return scores
+
+
+def _parse_keyframe_scan(output: str) -> List[float]:
+    """解析 ffprobe 扫描视频包的 csv 输出，返回升序的关键帧时间戳。
+
+    包的 ``pts_time`` 是绝对时间，而输入的 ``-ss`` 相对于容器的 ``start_time``
+    （MPEG-TS、裁剪过的 MP4 等起始时间不为 0），所以减去起始时间后再返回。
+
+    Args:
+        output: ``packet=pts_time,flags:format=start_time`` 的 csv 输出
+
+    Returns:
+        List[float]: 相对于容器起始时间的关键帧时间戳（秒）
+    """
+    keyframes = set()
+    start_time = 0.0
+    for line in output.splitlines():
+        parts = line.strip().split(",")
+        try:
+            if parts[0] == "packet" and len(parts) >= 3 and "K" in parts[2]:
+                keyframes.add(float(parts[1]))
+            elif parts[0] == "format" and len(parts) >= 2:
+                start_time = float(parts[1])
+        except ValueError:
+            continue  # pts_time 或 start_time 为 N/A
+    return sorted({round(t - start_time, 6) for t in keyframes})
+
+
+def _log_level(frame_mode: str) -> str:
+    """返回抽帧所需的 ffmpeg 日志级别（showinfo 只在 info 级别输出）。"""
+    return "info" if frame_mode in ("keyframe", "scene") else "error"
+
+
+def _parse_output_audio_info(log: str, output_index: int) -> Tuple[int, int]:
+    """从 ffmpeg 的 info 级别日志中解析指定输出的音频流参数。
+
+    Args:
+        log: ffmpeg 标准错误输出
+        output_index: 输出文件序号（对应日志中的 ``Output #N``）
+
+    Returns:
+        Tuple[int, int]: 采样率和声道数
+
+    Raises:
+        FFmpegError: 当日志中找不到对应的音频流时抛出
+    """
+    # ffmpeg 的多线程日志可能把其他消息插进 "Stream #N:M" 这一行中间，
+    # 所以只在对应输出的信息段之后查找第一条音频流描述
+    pattern = re.compile(r"Audio: [^,\n]+, (\d+) Hz, ([^,\n]+)")
+    offset = log.find(f"Output #{output_index},")
+    match = pattern.search(log, offset) if offset >= 0 else None
+    if match is None:
+        raise FFmpegError(
+            f"无法从 ffmpeg 输出中解析音频流信息 (Output #{output_index})"
+        )
+
+    layout = match.group(2).strip()
+    if layout in _CHANNEL_LAYOUTS:
+        channels = _CHANNEL_LAYOUTS[layout]
+    else:
+        count = re.match(r"(\d+) channels", layout)
+        if count is None:
+            raise FFmpegError(f"无法识别的声道布局: {layout}")
+        channels = int(count.group(1))
+    return int(match.group(1)), channels
+
+
+def _probe_audio(
+    audio_path: Path, tracer: Optional[SpanRecorder] = None
+) -> Tuple[int, int]:
+    """读取音频文件的采样率和声道数。"""
+    with (tracer or SpanRecorder()).span("audio_probe"):
+        probe = ffmpeg.probe(str(audio_path))
+    audio_info = next(s for s in probe["streams"] if s["codec_type"] == "audio")
+    return int(audio_info["sample_rate"]), int(audio_info["channels"])
+
+
+def _parse_frame_rate(value: str) -> float:
+    """解析 ffprobe 的分数形式帧率（如 ``"30000/1001"``），无效值返回 0。"""
+    try:
+        return float(Fraction(value))
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+class MetadataCache:
+    """进程内共享的视频元数据缓存。
+
+    以 (解析后的绝对路径, 文件大小, 修改时间) 为键，同一个视频在整个进程中
+    只 probe 一次、只扫描一次关键帧索引；文件被替换或修改后键随之变化，
+    自动重新 probe。调用 ``attach`` 后缓存还会持久化到 JSON 文件，供后续运行复用。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, VideoMetadata] = {}
+        self._keyframes: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+
+    @staticmethod
+    def _key(video_path: Path) -> str:
+        stat = video_path.stat()
+        return f"{video_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def attach(self, path: Path) -> None:
+        """启用持久化，并载入已有的缓存文件。
+
+        Args:
+            path: 缓存文件路径
+        """
+        with self._lock:
+            self._path = path
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                for key, value in stored.get("metadata", {}).items():
+                    self._entries.setdefault(key, VideoMetadata(**value))
+                for key, value in stored.get("keyframes", {}).items():
+                    self._keyframes.setdefault(key, [float(t) for t in value])
+            except (OSError, ValueError, TypeError, AttributeError):
+                pass  # 缓存文件不存在、已损坏或是旧格式时从空缓存开始
+
+    def get(self, video_path: Path) -> Optional[VideoMetadata]:
+        """查找缓存的元数据，未命中时返回 None。"""
+        try:
+            key = self._key(video_path)
+        except OSError:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, video_path: Path, metadata: VideoMetadata) -> None:
+        """写入元数据，启用持久化时同时写回缓存文件。"""
+        try:
+            key = self._key(video_path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[key] = metadata
+            self._save()
+
+    def get_keyframes(self, video_path: Path) -> Optional[List[float]]:
+        """查找缓存的关键帧时间戳，未命中时返回 None。"""
+        try:
+            key = self._key(video_path)
+        except OSError:
+            return None
+        with self._lock:
+            return self._keyframes.get(key)
+
+    def put_keyframes(self, video_path: Path, keyframe_times: List[float]) -> None:
+        """写入关键帧时间戳，启用持久化时同时写回缓存文件。"""
+        try:
+            key = self._key(video_path)
+        except OSError:
+            return
+        with self._lock:
+            self._keyframes[key] = keyframe_times
+            self._save()
+
+    def _save(self) -> None:
+        """把缓存写回文件（调用方需持有锁）。"""
+        if self._path is None:
+            return
+        try:
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "metadata": {k: asdict(v) for k, v in self._entries.items()},
+                        "keyframes": self._keyframes,
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self._path)
+        except OSError:
+            pass  # 持久化失败不影响本次处理
+
+    def clear(self) -> None:
+        """清空内存中的缓存。"""
+        with self._lock:
+            self._entries.clear()
+            self._keyframes.clear()
+
+
+# 默认的进程级元数据缓存，所有 FFmpegWrapper 实例共享
+metadata_cache = MetadataCache()
+
+
 class FFmpegWrapper:
     """FFmpeg 操作封装类。"""
 
-    def __init__(self, video_path: Path):
+    def __init__(
+        self,
+        video_path: Path,
+        metadata: Optional[VideoMetadata] = None,
+        cache: Optional[MetadataCache] = None,
+        threads: Optional[int] = None,
+        scene_threshold: float = 0.3,
+        scene_min_interval: float = 0.5,
+        scene_max_interval: float = 10.0,
+        tracer: Optional[SpanRecorder] = None,
+    ):
         """初始化 FFmpeg 封装类。
 
         Args:
             video_path: 视频文件路径
+            metadata: 已知的视频元数据，提供时不再 probe
+            cache: 元数据缓存，默认使用进程级共享缓存
+            threads: 每个 ffmpeg 进程的解码/滤镜/编码线程数，默认由 ffmpeg 自行决定
+            scene_threshold: scene 模式下场景切换分数（0-1）超过该值才抽帧
+            scene_min_interval: scene 模式下相邻两帧的最小间隔（秒）
+            scene_max_interval: scene 模式下画面无变化时的最大抽帧间隔（秒），0 表示不限制
+            tracer: 阶段耗时记录器，probe、启动进程、解码编码等阶段的耗时记录到其中
         """
         self.video_path = video_path
-        self._metadata: Optional[VideoMetadata] = None
+        self.tracer = tracer if tracer is not None else SpanRecorder()
+        self.threads = threads
+        self.scene_threshold = scene_threshold
+        self.scene_min_interval = scene_min_interval
+        self.scene_max_interval = scene_max_interval
+        self._metadata: Optional[VideoMetadata] = metadata
+        self._cache = cache if cache is not None else metadata_cache
+        self._keyframe_times: Optional[List[float]] = None
 
     def get_metadata(self) -> VideoMetadata:
         """获取视频元数据。
@@ -42,32 +343,102 @@ class FFmpegWrapper:
         if self._metadata is not None:
             return self._metadata
 
+        self._metadata = self._cache.get(self.video_path)
+        if self._metadata is not None:
+            return self._metadata
+
         try:
-            probe = ffmpeg.probe(str(self.video_path))
-            video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-            audio_info = next((s for s in probe['streams'] if s['codec_type'] == 'audio'), None)
+            with self.tracer.span("probe"):
+                probe = ffmpeg.probe(str(self.video_path))
+            video_info = next(s for s in probe["streams"] if s["codec_type"] == "video")
+            audio_info = next(
+                (s for s in probe["streams"] if s["codec_type"] == "audio"), None
+            )
 
             self._metadata = VideoMetadata(
-                duration=float(probe['format']['duration']),
-                width=int(video_info['width']),
-                height=int(video_info['height']),
-                fps=eval(video_info['r_frame_rate']),  # 如 "30000/1001"
-                audio_codec=audio_info['codec_name'] if audio_info else 'none',
-                video_codec=video_info['codec_name'],
-                total_frames=int(video_info.get('nb_frames', 0))
+                duration=float(probe["format"]["duration"]),
+                width=int(video_info["width"]),
+                height=int(video_info["height"]),
+                fps=(
+                    _parse_frame_rate(
+                        video_info.get("r_frame_rate", "0/0")
+                    )  # 如 "30000/1001"
+                    or _parse_frame_rate(video_info.get("avg_frame_rate", "0/0"))
+                ),
+                audio_codec=audio_info["codec_name"] if audio_info else "none",
+                video_codec=video_info["codec_name"],
+                total_frames=int(video_info.get("nb_frames", 0)),
             )
+            self._cache.put(self.video_path, self._metadata)
             return self._metadata
         except Exception as e:
             raise FFmpegError(f"获取视频元数据失败: {str(e)}")
 
-    def extract_keyframes(self, output_dir: Path, start_time: float, end_time: float, interval_seconds: float = 0.5) -> List[KeyframeInfo]:
+    def get_keyframe_times(self) -> List[float]:
+        """获取视频流中所有关键帧的时间戳。
+
+        首次调用时扫描一遍视频包索引（不解码），结果与元数据一起保存在元数据缓存中，
+        同一进程内不再重复扫描；缓存启用持久化时后续运行也直接复用。
+
+        Returns:
+            List[float]: 升序排列的关键帧时间戳（秒）
+
+        Raises:
+            FFmpegError: 当扫描失败时抛出
+        """
+        if self._keyframe_times is not None:
+            return self._keyframe_times
+
+        self._keyframe_times = self._cache.get_keyframes(self.video_path)
+        if self._keyframe_times is not None:
+            return self._keyframe_times
+
+        with self.tracer.span("probe"):
+            self._keyframe_times = self._scan_keyframes()
+        self._cache.put_keyframes(self.video_path, self._keyframe_times)
+        return self._keyframe_times
+
+    def _scan_keyframes(self) -> List[float]:
+        """用 ffprobe 扫描视频包，返回关键帧相对于容器起始时间的时间戳。"""
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags:format=start_time",
+            "-of",
+            "csv",
+            str(self.video_path),
+        ]
+        try:
+            process = subprocess.run(cmd, capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise FFmpegError(f"扫描关键帧索引失败: {str(e)}")
+        return _parse_keyframe_scan(process.stdout.decode(errors="replace"))
+
+    def extract_keyframes(
+        self,
+        output_dir: Path,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float = 0.5,
+        frame_mode: str = "interval",
+        encoder: Optional[FrameEncoder] = None,
+        dedup: Optional[FrameDeduplicator] = None,
+    ) -> List[KeyframeInfo]:
         """提取指定时间段的帧。
 
         Args:
             output_dir: 输出目录
             start_time: 开始时间（秒）
             end_time: 结束时间（秒）
-            interval_seconds: 提取帧的时间间隔（秒），默认0.5秒
+            interval_seconds: 提取帧的时间间隔（秒），默认0.5秒，仅 interval 模式使用
+            frame_mode: 抽帧模式，``interval`` 按间隔抽帧，``keyframe`` 只解码 I 帧，
+                ``scene`` 按画面变化抽帧
+            encoder: 帧编码器，默认输出 PNG
+            dedup: 帧去重器，提供时在编码前丢弃与上一保留帧重复的帧
 
         Returns:
             List[KeyframeInfo]: 帧信息列表
@@ -76,59 +447,578 @@ class FFmpegWrapper:
             FFmpegError: 当提取失败时抛出
         """
         output_dir.mkdir(parents=True, exist_ok=True)
-        frames: List[KeyframeInfo] = []
+        encoder = encoder or PngEncoder()
 
         try:
-            # 获取视频帧率并计算帧间隔
-            metadata = self.get_metadata()
-            fps = metadata.fps
-            frame_interval = int(fps * interval_seconds)  # 每隔多少帧提取一帧
+            if encoder.raw or dedup is not None:
+                return self._write_frames(
+                    output_dir,
+                    self._stream_frames(
+                        start_time, end_time, interval_seconds, frame_mode
+                    ),
+                    encoder,
+                    dedup,
+                )
 
-            # 使用 ffmpeg 提取帧
             stream = (
-                ffmpeg
-                .input(str(self.video_path), ss=start_time, t=end_time-start_time)
-                .filter('select', f'not(mod(n,{frame_interval}))')  # 按间隔提取帧
-                .filter('setpts', 'N/FRAME_RATE/TB')  # 修正时间戳
-                .output(str(output_dir / 'frame_%d.png'), 
-                       vsync='1',                      # 使用 CFR 模式确保帧序
-                       **{
-                           'qscale:v': '1',           # 最高质量
-                           'pix_fmt': 'rgb24'         # RGB24格式
-                       })
+                self._frame_output(
+                    output_dir,
+                    start_time,
+                    end_time,
+                    interval_seconds,
+                    frame_mode,
+                    encoder,
+                )
                 .overwrite_output()
-                .global_args('-loglevel', 'error')
+                .global_args(*self._global_args(_log_level(frame_mode)))
             )
 
             # 执行命令并获取输出
-            process = stream.run_async(pipe_stdout=True, pipe_stderr=True)
-            stdout, stderr = process.communicate()
+            log = self._run(stream)
+
+            return self._collect_frames(
+                output_dir, start_time, interval_seconds, frame_mode, log, encoder
+            )
+        except Exception as e:
+            raise FFmpegError(f"提取帧失败: {str(e)}")
+
+    def extract_segment(
+        self,
+        output_dir: Path,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float = 0.5,
+        frame_mode: str = "interval",
+        encoder: Optional[FrameEncoder] = None,
+        audio_format: Optional[str] = "mp3",
+        dedup: Optional[FrameDeduplicator] = None,
+    ) -> Tuple[List[KeyframeInfo], Optional[AudioSegment]]:
+        """单次 ffmpeg 调用同时提取指定时间段的帧和音频。
 
+        与分别调用 ``extract_keyframes`` 和 ``extract_audio`` 相比，片段只被
+        定位和解复用一次，音频流信息直接从本次运行的输出日志中解析，
+        不再额外执行 probe。
+
+        Args:
+            output_dir: 输出目录
+            start_time: 开始时间（秒）
+            end_time: 结束时间（秒）
+            interval_seconds: 提取帧的时间间隔（秒），默认0.5秒，仅 interval 模式使用
+            frame_mode: 抽帧模式，``interval`` 按间隔抽帧，``keyframe`` 只解码 I 帧，
+                ``scene`` 按画面变化抽帧
+            encoder: 帧编码器，默认输出 PNG
+            audio_format: 音频格式，``copy`` 直接复制源音频流，为 None 时不提取音频
+            dedup: 帧去重器，提供时在编码前丢弃与上一保留帧重复的帧
+
+        Returns:
+            Tuple[List[KeyframeInfo], Optional[AudioSegment]]: 帧信息列表和音频片段信息，
+            视频没有音频流或不提取音频时音频片段为 None
+
+        Raises:
+            FFmpegError: 当提取失败时抛出
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        encoder = encoder or PngEncoder()
+
+        try:
+            has_audio = (
+                audio_format is not None and self.get_metadata().audio_codec != "none"
+            )
+            audio_outputs = []
+            if has_audio:
+                audio_path, audio_kwargs = self._audio_output(
+                    output_dir, f"audio_{start_time:.3f}_{end_time:.3f}", audio_format
+                )
+                audio_outputs.append(
+                    self._input(start_time, end_time, frame_mode).audio.output(
+                        str(audio_path), **audio_kwargs
+                    )
+                )
+
+            if encoder.raw or dedup is not None:
+                # 原始像素从管道读出，音频作为同一进程的第二个输出写入文件
+                log_lines: List[str] = []
+                frames = self._write_frames(
+                    output_dir,
+                    self._stream_frames(
+                        start_time,
+                        end_time,
+                        interval_seconds,
+                        frame_mode,
+                        extra_outputs=audio_outputs,
+                        log_lines=log_lines,
+                    ),
+                    encoder,
+                    dedup,
+                )
+                log = "".join(log_lines)
+            else:
+                outputs = [
+                    self._frame_output(
+                        output_dir,
+                        start_time,
+                        end_time,
+                        interval_seconds,
+                        frame_mode,
+                        encoder,
+                    )
+                ]
+
+                # 需要 info 级别日志才能拿到输出流信息
+                stream = (
+                    ffmpeg.merge_outputs(*outputs, *audio_outputs)
+                    .overwrite_output()
+                    .global_args(*self._global_args("info"))
+                )
+                log = self._run(stream)
+                frames = self._collect_frames(
+                    output_dir, start_time, interval_seconds, frame_mode, log, encoder
+                )
+
+            if not has_audio:
+                return frames, None
+
+            try:
+                sample_rate, channels = _parse_output_audio_info(log, output_index=1)
+            except FFmpegError:
+                # 日志不完整时退回读取已写出的音频文件
+                sample_rate, channels = _probe_audio(audio_path, self.tracer)
+            return frames, AudioSegment(
+                start_time=start_time,
+                end_time=end_time,
+                file_path=audio_path,
+                sample_rate=sample_rate,
+                channels=channels,
+            )
+        except Exception as e:
+            raise FFmpegError(f"提取片段失败: {str(e)}")
+
+    def _spawn(self, stream: Stream, **kwargs) -> subprocess.Popen:
+        """启动 ffmpeg 进程，记录启动耗时。"""
+        with self.tracer.span("spawn"):
+            return stream.run_async(**kwargs)
+
+    def _run(self, stream: Stream, stage: str = "transcode") -> str:
+        """运行 ffmpeg 直到结束，返回标准错误输出。
+
+        Raises:
+            FFmpegError: 当 ffmpeg 返回非零状态时抛出，消息为其日志
+        """
+        process = self._spawn(stream, pipe_stdout=True, pipe_stderr=True)
+        with self.tracer.span(stage):
+            _, stderr = process.communicate()
+        log = stderr.decode(errors="replace")
+        if process.returncode != 0:
+            raise FFmpegError(log)
+        return log
+
+    def _input(
+        self, start_time: float, end_time: float, frame_mode: str = "interval"
+    ) -> Stream:
+        """创建定位到指定时间段的输入流。
+
+        keyframe 模式下让解码器直接跳过非关键帧，P/B 帧完全不会被解码。
+        """
+        input_kwargs = {"skip_frame": "nokey"} if frame_mode == "keyframe" else {}
+        if self.threads:
+            input_kwargs["threads"] = str(self.threads)  # 解码线程数
+        return ffmpeg.input(
+            str(self.video_path), ss=start_time, t=end_time - start_time, **input_kwargs
+        )
+
+    def _global_args(self, log_level: str) -> List[str]:
+        """返回 ffmpeg 全局参数，设置了线程预算时同时限制滤镜线程数。"""
+        args = ["-hide_banner", "-nostats", "-loglevel", log_level]
+        if self.threads:
+            args += [
+                "-filter_threads",
+                str(self.threads),
+                "-filter_complex_threads",
+                str(self.threads),
+            ]
+        return args
+
+    def _frame_stream(
+        self,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float,
+        frame_mode: str = "interval",
+    ) -> Tuple[Stream, Dict[str, str]]:
+        """构建抽帧滤镜链。
+
+        Returns:
+            Tuple[Stream, Dict[str, str]]: 滤镜处理后的视频流和对应的输出参数
+        """
+        if frame_mode not in FRAME_MODES:
+            raise FFmpegError(f"不支持的抽帧模式: {frame_mode}")
+
+        video = self._input(start_time, end_time, frame_mode).video
+
+        if frame_mode == "keyframe":
+            # showinfo 记录每个输出帧的真实时间戳和帧类型，passthrough 保证不补帧也不丢帧
+            return video.filter("showinfo"), {"vsync": "passthrough"}
+
+        if frame_mode == "scene":
+            # 片段第一帧必选；之后场景分数超过阈值且距上一帧足够远时选中，
+            # 超过最大间隔时无论画面是否变化都补一帧
+            terms = [
+                "isnan(prev_selected_t)",
+                f"gt(scene,{self.scene_threshold})"
+                f"*gte(t-prev_selected_t,{self.scene_min_interval})",
+            ]
+            if self.scene_max_interval > 0:
+                terms.append(f"gte(t-prev_selected_t,{self.scene_max_interval})")
+            video = (
+                video.filter("select", "+".join(terms))
+                .filter("metadata", "print", key="lavfi.scene_score")  # 输出场景分数
+                .filter("showinfo")
+            )
+            return video, {"vsync": "passthrough"}
+
+        # 获取视频帧率并计算帧间隔
+        metadata = self.get_metadata()
+        fps = metadata.fps
+        frame_interval = max(int(fps * interval_seconds), 1)  # 每隔多少帧提取一帧
+
+        video = video.filter(
+            "select", f"not(mod(n,{frame_interval}))"
+        ).filter(  # 按间隔提取帧
+            "setpts", "N/FRAME_RATE/TB"
+        )  # 修正时间戳
+        return video, {"vsync": "1"}  # 使用 CFR 模式确保帧序
+
+    def _frame_output(
+        self,
+        output_dir: Path,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float,
+        frame_mode: str = "interval",
+        encoder: Optional[FrameEncoder] = None,
+    ) -> Stream:
+        """构建抽帧并按编码器参数写出图像序列的输出节点。"""
+        encoder = encoder or PngEncoder()
+        video, output_kwargs = self._frame_stream(
+            start_time, end_time, interval_seconds, frame_mode
+        )
+        if self.threads:
+            output_kwargs["threads"] = str(self.threads)  # 编码线程数
+        return video.output(
+            str(output_dir / f"frame_%d.{encoder.extension}"),
+            **output_kwargs,
+            **encoder.output_kwargs(),
+        )
+
+    def iter_frames(
+        self,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float = 0.5,
+        frame_mode: str = "interval",
+        gray: bool = False,
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """逐帧解码指定时间段，直接产出像素数组而不写任何文件。
+
+        ffmpeg 把原始 ``rgb24``/``gray`` 数据写到标准输出管道，数据被直接读入
+        一块复用的缓冲区。为避免每帧分配内存，每次产出的都是同一个数组，
+        需要保留帧数据的调用方应自行 ``copy()``。
+
+        Args:
+            start_time: 开始时间（秒）
+            end_time: 结束时间（秒）
+            interval_seconds: 提取帧的时间间隔（秒），默认0.5秒，仅 interval 模式使用
+            frame_mode: 抽帧模式，``interval`` 按间隔抽帧，``keyframe`` 只解码 I 帧，
+                ``scene`` 按画面变化抽帧
+            gray: 是否输出单通道灰度图，默认输出 RGB
+
+        Yields:
+            Tuple[float, np.ndarray]: (时间戳, 形状为 (高, 宽, 通道数) 的 uint8 数组)
+
+        Raises:
+            FFmpegError: 当解码失败时抛出
+        """
+        for pts, _, _, frame in self._stream_frames(
+            start_time, end_time, interval_seconds, frame_mode, gray
+        ):
+            yield pts, frame
+
+    def _stream_frames(
+        self,
+        start_time: float,
+        end_time: float,
+        interval_seconds: float,
+        frame_mode: str = "interval",
+        gray: bool = False,
+        extra_outputs: Sequence[Stream] = (),
+        log_lines: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[float, str, Optional[float], np.ndarray]]:
+        """启动 ffmpeg 把抽出的帧以原始像素写入管道，逐帧读入复用缓冲区。
+
+        Args:
+            extra_outputs: 与帧管道合并到同一进程中的其他输出（如音频文件）
+            log_lines: 收集 ffmpeg 日志的列表，有额外输出时以 info 级别记录
+
+        Yields:
+            Tuple[float, str, Optional[float], np.ndarray]: (时间戳, 帧类型, 场景分数, 像素数组)，
+            非 scene 模式下场景分数为 None
+        """
+        metadata = self.get_metadata()
+        channels = 1 if gray else 3
+        frame = np.empty((metadata.height, metadata.width, channels), dtype=np.uint8)
+        frame_view = memoryview(frame).cast("B")
+        frame_size = frame.nbytes
+        if log_lines is None:
+            log_lines = []
+
+        video, output_kwargs = self._frame_stream(
+            start_time, end_time, interval_seconds, frame_mode
+        )
+        frame_output = video.output(
+            "pipe:",
+            format="rawvideo",
+            pix_fmt="gray" if gray else "rgb24",
+            **output_kwargs,
+        )
+        log_level = "info" if extra_outputs else _log_level(frame_mode)
+        process = self._spawn(
+            ffmpeg.merge_outputs(frame_output, *extra_outputs)
+            .overwrite_output()
+            .global_args(*self._global_args(log_level)),
+            pipe_stdout=True,
+            pipe_stderr=True,
+        )
+
+        # 后台线程持续读取标准错误，防止管道写满阻塞 ffmpeg，同时解析 showinfo
+        frame_info: "queue.Queue[Optional[Tuple[float, str, Optional[float]]]]" = (
+            queue.Queue()
+        )
+
+        def drain_stderr():
+            score = None
+            for raw_line in process.stderr:
+                line = raw_line.decode(errors="replace")
+                match = _SHOWINFO_PATTERN.search(line)
+                if match is not None:
+                    frame_info.put((float(match.group(2)), match.group(3), score))
+                    score = None  # 分数只属于紧随其后的这一帧
+                    continue
+                match = _SCENE_SCORE_PATTERN.search(line)
+                if match is not None:
+                    score = float(match.group(1))
+                else:
+                    log_lines.append(line)
+            frame_info.put(None)
+
+        stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+        stderr_thread.start()
+
+        # 等待管道中下一帧的时间即解码和滤镜的耗时
+        decode_timer = self.tracer.timer("decode")
+        try:
+            index = 0
+            while True:
+                filled = 0
+                with decode_timer:
+                    while filled < frame_size:
+                        n = process.stdout.readinto(frame_view[filled:])
+                        if not n:
+                            break
+                        filled += n
+                if filled < frame_size:
+                    break  # 数据读完（不完整的尾帧直接丢弃）
+
+                if frame_mode in ("keyframe", "scene"):
+                    with decode_timer:
+                        info = frame_info.get()
+                    if info is None:
+                        break
+                    pts, frame_type, score = start_time + info[0], info[1], info[2]
+                else:
+                    pts, frame_type, score = (
+                        start_time + index * interval_seconds,
+                        "F",
+                        None,
+                    )
+                index += 1
+                yield pts, frame_type, score, frame
+
+            with decode_timer:
+                process.wait()
+                stderr_thread.join()
             if process.returncode != 0:
-                raise FFmpegError(f"提取帧失败: {stderr.decode()}")
-
-            # 解析输出获取帧信息
-            for frame_file in sorted(output_dir.glob('frame_*.png')):
-                frame_num = int(frame_file.stem.split('_')[1])
-                pts = start_time + (frame_num * interval_seconds)  # 使用间隔计算实际时间戳
-                frames.append(KeyframeInfo(
-                    pts=pts,
-                    frame_type='F',  # 使用 'F' 表示这是按间隔提取的帧
-                    file_path=frame_file,
-                    quality=1.0  # 最高质量
-                ))
+                raise FFmpegError(f"解码帧失败: {''.join(log_lines)}")
+        finally:
+            decode_timer.close()
+            if process.poll() is None:
+                # 调用方提前结束迭代时终止 ffmpeg
+                process.kill()
+                process.wait()
+
+    def _write_frames(
+        self,
+        output_dir: Path,
+        frames: Iterator[Tuple[float, str, Optional[float], np.ndarray]],
+        encoder: FrameEncoder,
+        dedup: Optional[FrameDeduplicator] = None,
+    ) -> List[KeyframeInfo]:
+        """把管道读出的原始像素帧写出为文件。
 
+        ``raw`` 编码器直接保存 ``.npy``；其他格式把像素送入另一个 ffmpeg
+        进程的标准输入，按编码器参数编码，编码结果与直接抽帧完全相同。
+        提供去重器时，重复帧在编码之前就被丢弃。
+        """
+        metadata = self.get_metadata()
+        process = None
+        stderr_lines: List[str] = []
+        stderr_thread = None
+        if not encoder.raw:
+            output_kwargs = dict(encoder.output_kwargs())
+            if self.threads:
+                output_kwargs["threads"] = str(self.threads)
+            process = self._spawn(
+                ffmpeg.input(
+                    "pipe:",
+                    format="rawvideo",
+                    pix_fmt="rgb24",
+                    s=f"{metadata.width}x{metadata.height}",
+                )
+                .output(
+                    str(output_dir / f"frame_%d.{encoder.extension}"), **output_kwargs
+                )
+                .overwrite_output()
+                .global_args(*self._global_args("error")),
+                pipe_stdin=True,
+                pipe_stderr=True,
+            )
+            stderr_thread = threading.Thread(
+                target=lambda: stderr_lines.extend(
+                    line.decode(errors="replace") for line in process.stderr
+                ),
+                daemon=True,
+            )
+            stderr_thread.start()
+
+        keyframes: List[KeyframeInfo] = []
+        dedup_timer = self.tracer.timer("dedup")
+        # 写入编码进程的管道在其忙于编码时阻塞，写入的时间即编码和写盘的耗时
+        encode_timer = self.tracer.timer("encode")
+        try:
+            for pts, frame_type, score, frame in frames:
+                if dedup is not None:
+                    with dedup_timer:
+                        keep = dedup.keep(pts, frame_type, frame)
+                    if not keep:
+                        continue
+                frame_file = (
+                    output_dir / f"frame_{len(keyframes) + 1}.{encoder.extension}"
+                )
+                with encode_timer:
+                    if process is None:
+                        np.save(frame_file, frame)
+                    else:
+                        process.stdin.write(frame.data)
+                keyframes.append(
+                    KeyframeInfo(
+                        pts=pts,
+                        frame_type=frame_type,
+                        file_path=frame_file,
+                        quality=score if score is not None else encoder.quality_score,
+                    )
+                )
+        finally:
+            if process is not None:
+                with encode_timer:
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass  # ffmpeg 已退出，错误信息从标准错误中读取
+                    process.wait()
+                    stderr_thread.join()
+            dedup_timer.close()
+            encode_timer.close()
+
+        if process is not None and process.returncode != 0:
+            raise FFmpegError(f"编码帧失败: {''.join(stderr_lines)}")
+        return keyframes
+
+    def _collect_frames(
+        self,
+        output_dir: Path,
+        start_time: float,
+        interval_seconds: float,
+        frame_mode: str = "interval",
+        log: str = "",
+        encoder: Optional[FrameEncoder] = None,
+    ) -> List[KeyframeInfo]:
+        """扫描输出目录，解析已写出的帧文件。"""
+        encoder = encoder or PngEncoder()
+        with self.tracer.span("glob"):
+            # keyframe/scene 模式的时间戳和帧类型来自 showinfo，相对于片段起点
+            frame_info = (
+                _parse_showinfo(log) if frame_mode in ("keyframe", "scene") else []
+            )
+            # scene 模式的质量分数即场景切换分数，按时间戳与帧对应
+            scene_scores = _parse_scene_scores(log) if frame_mode == "scene" else {}
+
+            frames: List[KeyframeInfo] = []
+            for frame_file in output_dir.glob(f"frame_*.{encoder.extension}"):
+                frame_num = int(frame_file.stem.split("_")[1])
+                # frame_%d 从 1 开始编号
+                quality = encoder.quality_score
+                if frame_num <= len(frame_info):
+                    pts_time, frame_type = frame_info[frame_num - 1]
+                    pts = start_time + pts_time
+                    quality = scene_scores.get(round(pts_time, 6), quality)
+                else:
+                    pts = start_time + (
+                        (frame_num - 1) * interval_seconds
+                    )  # 使用间隔计算实际时间戳
+                    frame_type = "F"  # 使用 'F' 表示这是按间隔提取的帧
+                frames.append(
+                    KeyframeInfo(
+                        pts=pts,
+                        frame_type=frame_type,
+                        file_path=frame_file,
+                        quality=quality,
+                    )
+                )
+            frames.sort(key=lambda x: x.pts)
             return frames
-        except Exception as e:
-            raise FFmpegError(f"提取帧失败: {str(e)}")
 
-    def extract_audio(self, output_dir: Path, start_time: float, end_time: float) -> AudioSegment:
+    def _audio_output(
+        self, output_dir: Path, name: str, audio_format: str
+    ) -> Tuple[Path, Dict[str, str]]:
+        """返回音频输出文件路径和编码参数，copy 格式按源音频编码选择容器。"""
+        extension, kwargs = audio_output(audio_format, self.get_metadata().audio_codec)
+        return output_dir / f"{name}.{extension}", kwargs
+
+    def _run_audio(self, stream: Stream, audio_path: Path) -> Tuple[int, int]:
+        """运行音频提取，返回输出的采样率和声道数。"""
+        log = self._run(
+            stream.overwrite_output().global_args(*self._global_args("info")),
+            stage="audio_encode",
+        )
+
+        try:
+            return _parse_output_audio_info(log, output_index=0)
+        except FFmpegError:
+            return _probe_audio(audio_path, self.tracer)
+
+    def extract_audio(
+        self,
+        output_dir: Path,
+        start_time: float,
+        end_time: float,
+        audio_format: str = "mp3",
+    ) -> AudioSegment:
         """提取指定时间段的音频。
 
         Args:
             output_dir: 输出目录
             start_time: 开始时间（秒）
             end_time: 结束时间（秒）
+            audio_format: 音频格式，``copy`` 直接复制源音频流，不重新编码
 
         Returns:
             AudioSegment: 音频片段信息
@@ -137,63 +1027,76 @@ class FFmpegWrapper:
             FFmpegError: 当提取失败时抛出
         """
         output_dir.mkdir(parents=True, exist_ok=True)
-        audio_path = output_dir / f'audio_{start_time:.3f}_{end_time:.3f}.mp3'
 
         try:
-            # 提取音频
-            stream = (
-                ffmpeg
-                .input(str(self.video_path), ss=start_time, t=end_time-start_time)
-                .output(str(audio_path), acodec='libmp3lame', loglevel='error')
-                .overwrite_output()
+            audio_path, audio_kwargs = self._audio_output(
+                output_dir, f"audio_{start_time:.3f}_{end_time:.3f}", audio_format
             )
-            stream.run(capture_stdout=True, capture_stderr=True)
 
-            # 获取音频信息
-            probe = ffmpeg.probe(str(audio_path))
-            audio_info = next(s for s in probe['streams'] if s['codec_type'] == 'audio')
+            # 提取音频，采样率和声道数从输出日志中解析
+            sample_rate, channels = self._run_audio(
+                self._input(start_time, end_time).audio.output(
+                    str(audio_path), **audio_kwargs
+                ),
+                audio_path,
+            )
 
             return AudioSegment(
                 start_time=start_time,
                 end_time=end_time,
                 file_path=audio_path,
-                sample_rate=int(audio_info['sample_rate']),
-                channels=int(audio_info['channels'])
+                sample_rate=sample_rate,
+                channels=channels,
             )
         except Exception as e:
             raise FFmpegError(f"提取音频失败: {str(e)}")
 
-    def _split_tasks(self, video_path: Path, segment_duration: float = 30.0, interval_seconds: float = 0.5) -> List[ExtractionTask]:
-        """将视频分割成多个处理任务。
+    def extract_full_audio(
+        self, output_dir: Path, audio_format: str = "copy"
+    ) -> Optional[AudioSegment]:
+        """把整个视频的音频提取为一个文件。
+
+        配合 ``audio.slice_audio`` 使用，各片段只记录在该文件中的偏移，
+        不再为每个片段单独启动 ffmpeg 和写出小文件。
 
         Args:
-            video_path: 视频文件路径
-            segment_duration: 每个片段的时长（秒）
-            interval_seconds: 帧提取间隔（秒）
+            output_dir: 输出目录
+            audio_format: 音频格式，默认 ``copy`` 直接复制源音频流
 
         Returns:
-            List[ExtractionTask]: 任务列表
+            Optional[AudioSegment]: 整个视频的音频，视频没有音频流时返回 None
+
+        Raises:
+            FFmpegError: 当提取失败时抛出
         """
-        ffmpeg = FFmpegWrapper(video_path)
-        metadata = ffmpeg.get_metadata()
-        duration = metadata.duration
-        
-        tasks = []
-        current_time = 0.0
-        
-        while current_time < duration:
-            end_time = min(current_time + segment_duration, duration)
-            task_id = f"{current_time:.1f}_{end_time:.1f}"
-            
-            tasks.append(ExtractionTask(
-                video_path=video_path,
-                start_time=current_time,
-                end_time=end_time,
-                output_dir=video_path.parent / "output",
-                task_id=task_id,
-                interval_seconds=interval_seconds  # 添加这个参数
-            ))
-            
-            current_time = end_time
-            
-        return tasks
\ No newline at end of file
+        metadata = self.get_metadata()
+        if metadata.audio_codec == "none":
+            return None
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            audio_path, audio_kwargs = self._audio_output(
+                output_dir, "audio", audio_format
+            )
+            input_kwargs = {"threads": str(self.threads)} if self.threads else {}
+            sample_rate, channels = self._run_audio(
+                ffmpeg.input(str(self.video_path), **input_kwargs).audio.output(
+                    str(audio_path), **audio_kwargs
+                ),
+                audio_path,
+            )
+
+            layout = wav_layout(audio_path) if audio_path.suffix == ".wav" else None
+            sample_count = round(metadata.duration * sample_rate)
+            return AudioSegment(
+                start_time=0.0,
+                end_time=metadata.duration,
+                file_path=audio_path,
+                sample_rate=sample_rate,
+                channels=channels,
+                sample_count=sample_count,
+                byte_offset=layout[0] if layout else None,
+                byte_length=sample_count * layout[1] if layout else None,
+            )
+        except Exception as e:
+            raise FFmpegError(f"提取音频失败: {str(e)}")
@@ -0,0 +1,146 @@
+"""并发调控模块。
+
+此模块负责在并发的 ffmpeg 子进程之间分配 CPU 核心，并根据系统负载和
+实测吞吐量动态调整同时处理的片段数，避免线程过度订阅导致的上下文切换开销。
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+def available_cpus() -> int:
+    """返回当前进程可用的 CPU 核心数。"""
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return max(len(os.sched_getaffinity(0)), 1)
+        except OSError:
+            pass
+    return os.cpu_count() or 1
+
+
+def _load_average() -> Optional[float]:
+    """返回 1 分钟平均负载，平台不支持时返回 None（如 Windows）。"""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+class ConcurrencyGovernor:
+    """ffmpeg 子进程并发调控器。
+
+    每个在途片段占用一个槽位，调控器把可用核心平均分给在途的 ffmpeg 进程，
+    并据此设置解码和滤镜线程数。开启自适应后，每完成一批片段会比较一次
+    吞吐量（每秒处理的媒体时长），用爬山法调整在途片段数：吞吐量上升则
+    继续沿当前方向调整，下降则反向；系统负载明显超过核心数时直接减少并发。
+    """
+
+    # 负载超过核心数的该倍数时视为过度订阅
+    OVERLOAD_RATIO = 1.25
+    # 吞吐量下降超过该比例时反转调整方向
+    TOLERANCE = 0.05
+
+    def __init__(
+        self,
+        max_workers: int,
+        cpu_count: Optional[int] = None,
+        adaptive: bool = True,
+        threads_per_process: Optional[int] = None,
+    ):
+        """初始化调控器。
+
+        Args:
+            max_workers: 在途片段数上限
+            cpu_count: 可用核心数，默认自动检测
+            adaptive: 是否根据负载和吞吐量动态调整在途片段数
+            threads_per_process: 固定的每进程线程数，默认按核心数平均分配
+        """
+        self.cpu_count = cpu_count or available_cpus()
+        self.max_workers = max(int(max_workers), 1)
+        self.adaptive = adaptive
+        self._fixed_threads = threads_per_process
+
+        # 默认每个 ffmpeg 进程至少分到 2 个核心，由自适应逻辑再向上试探
+        initial = self.max_workers if not adaptive else max(self.cpu_count // 2, 1)
+        self._limit = min(initial, self.max_workers)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+        self._direction = 1
+        self._best_throughput = 0.0
+        self._window_start = time.monotonic()
+        self._window_units = 0.0
+        self._window_count = 0
+
+    @property
+    def limit(self) -> int:
+        """当前允许的在途片段数。"""
+        return self._limit
+
+    @property
+    def threads_per_process(self) -> int:
+        """当前每个 ffmpeg 进程应使用的线程数。"""
+        if self._fixed_threads:
+            return self._fixed_threads
+        return max(self.cpu_count // self._limit, 1)
+
+    @contextmanager
+    def slot(self) -> Iterator[int]:
+        """占用一个在途槽位，在途数达到上限时阻塞等待。
+
+        Yields:
+            int: 本次 ffmpeg 进程应使用的线程数
+        """
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+            threads = self.threads_per_process
+        try:
+            yield threads
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, work_units: float) -> None:
+        """记录一个片段完成，必要时调整在途片段数。
+
+        Args:
+            work_units: 该片段的工作量（如媒体时长，单位秒）
+        """
+        if not self.adaptive:
+            return
+
+        with self._condition:
+            self._window_units += work_units
+            self._window_count += 1
+            # 每完成一轮（与当前并发数相同的片段数）评估一次
+            if self._window_count < self._limit:
+                return
+
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            throughput = self._window_units / elapsed if elapsed > 0 else 0.0
+            self._window_start = now
+            self._window_units = 0.0
+            self._window_count = 0
+
+            load = _load_average()
+            if load is not None and load > self.cpu_count * self.OVERLOAD_RATIO:
+                self._direction = -1
+            elif throughput < self._best_throughput * (1 - self.TOLERANCE):
+                self._direction = -self._direction
+                self._best_throughput = throughput
+            else:
+                self._best_throughput = max(self._best_throughput, throughput)
+
+            new_limit = min(max(self._limit + self._direction, 1), self.max_workers)
+            if new_limit == self._limit:
+                # 到达边界后下一轮朝相反方向试探
+                self._direction = -self._direction
+            self._limit = new_limit
+            self._condition.notify_all()
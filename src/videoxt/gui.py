@@ -2,17 +2,17 @@
 
 此模块提供了一个简单的图形界面，方便用户调试和使用视频关键帧提取功能。
 """
+
 import os
 import threading
 import tkinter as tk
 from datetime import timedelta
-from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
 from typing import Dict, Optional
 
 from .controllers import ExtractionConfig, VideoExtractor
+from .events import EventBus, LogEvent, ProgressEvent, pump_tk
 from .models import ExtractionResult
-from .ffmpeg import FFmpegWrapper
 
 
 class VideoExtractorGUI:
@@ -28,17 +28,17 @@ class VideoExtractorGUI:
         self.root.title("视频关键帧提取工具")
         self.root.geometry("800x600")
         self.root.minsize(600, 400)
-        
+
         # 设置样式
         self.style = ttk.Style()
         self.style.configure("TButton", padding=5)
         self.style.configure("TLabel", padding=5)
         self.style.configure("TEntry", padding=5)
-        
+
         # 创建主框架
         self.main_frame = ttk.Frame(self.root, padding=10)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
-        
+
         # 创建变量
         self.video_path = tk.StringVar()
         self.output_dir = tk.StringVar()
@@ -48,84 +48,148 @@ class VideoExtractorGUI:
         self.audio_format = tk.StringVar(value="mp3")
         self.quality = tk.IntVar(value=95)
         self.interval_seconds = tk.DoubleVar(value=0.5)  # 添加帧提取间隔参数
-        
+        self.frame_mode = tk.StringVar(value="interval")
+
         # 创建界面元素
         self._create_widgets()
-        
+
         # 提取器实例
         self.extractor: Optional[VideoExtractor] = None
         self.result: Optional[ExtractionResult] = None
-        
+
         # 处理线程
         self.processing_thread: Optional[threading.Thread] = None
         self.is_processing = False
 
+        # 事件总线：处理线程只发布事件，界面在主线程中按固定频率成批刷新
+        self.events = EventBus()
+        self.events.subscribe(self._on_events)
+        pump_tk(self.root, self.events)
+
     def _create_widgets(self):
         """创建界面元素。"""
         # 文件选择区域
         file_frame = ttk.LabelFrame(self.main_frame, text="文件选择", padding=10)
         file_frame.pack(fill=tk.X, pady=5)
-        
+
         ttk.Label(file_frame, text="视频文件:").grid(row=0, column=0, sticky=tk.W)
-        ttk.Entry(file_frame, textvariable=self.video_path, width=50).grid(row=0, column=1, sticky=tk.EW)
-        ttk.Button(file_frame, text="浏览...", command=self._browse_video).grid(row=0, column=2, padx=5)
-        
+        ttk.Entry(file_frame, textvariable=self.video_path, width=50).grid(
+            row=0, column=1, sticky=tk.EW
+        )
+        ttk.Button(file_frame, text="浏览...", command=self._browse_video).grid(
+            row=0, column=2, padx=5
+        )
+
         ttk.Label(file_frame, text="输出目录:").grid(row=1, column=0, sticky=tk.W)
-        ttk.Entry(file_frame, textvariable=self.output_dir, width=50).grid(row=1, column=1, sticky=tk.EW)
-        ttk.Button(file_frame, text="浏览...", command=self._browse_output).grid(row=1, column=2, padx=5)
-        
+        ttk.Entry(file_frame, textvariable=self.output_dir, width=50).grid(
+            row=1, column=1, sticky=tk.EW
+        )
+        ttk.Button(file_frame, text="浏览...", command=self._browse_output).grid(
+            row=1, column=2, padx=5
+        )
+
         file_frame.columnconfigure(1, weight=1)
-        
+
         # 参数设置区域
         param_frame = ttk.LabelFrame(self.main_frame, text="参数设置", padding=10)
         param_frame.pack(fill=tk.X, pady=5)
-        
+
         # 第一行
         ttk.Label(param_frame, text="片段时长(秒):").grid(row=0, column=0, sticky=tk.W)
-        ttk.Entry(param_frame, textvariable=self.segment_duration, width=10).grid(row=0, column=1, sticky=tk.W)
-        
-        ttk.Label(param_frame, text="工作进程数(0=自动):").grid(row=0, column=2, sticky=tk.W, padx=(20, 0))
-        ttk.Entry(param_frame, textvariable=self.n_workers, width=10).grid(row=0, column=3, sticky=tk.W)
-        
+        ttk.Entry(param_frame, textvariable=self.segment_duration, width=10).grid(
+            row=0, column=1, sticky=tk.W
+        )
+
+        ttk.Label(param_frame, text="工作进程数(0=自动):").grid(
+            row=0, column=2, sticky=tk.W, padx=(20, 0)
+        )
+        ttk.Entry(param_frame, textvariable=self.n_workers, width=10).grid(
+            row=0, column=3, sticky=tk.W
+        )
+
         # 第二行
         ttk.Label(param_frame, text="图像格式:").grid(row=1, column=0, sticky=tk.W)
-        ttk.Combobox(param_frame, textvariable=self.output_format, values=["png", "jpg", "bmp"], width=7).grid(row=1, column=1, sticky=tk.W)
-        
-        ttk.Label(param_frame, text="音频格式:").grid(row=1, column=2, sticky=tk.W, padx=(20, 0))
-        ttk.Combobox(param_frame, textvariable=self.audio_format, values=["mp3", "wav", "aac"], width=7).grid(row=1, column=3, sticky=tk.W)
-        
+        ttk.Combobox(
+            param_frame,
+            textvariable=self.output_format,
+            values=["png", "jpg", "webp", "bmp", "npy"],
+            width=7,
+        ).grid(row=1, column=1, sticky=tk.W)
+
+        ttk.Label(param_frame, text="音频格式:").grid(
+            row=1, column=2, sticky=tk.W, padx=(20, 0)
+        )
+        ttk.Combobox(
+            param_frame,
+            textvariable=self.audio_format,
+            values=["mp3", "aac", "wav", "flac", "copy"],
+            width=7,
+        ).grid(row=1, column=3, sticky=tk.W)
+
         # 第三行
-        ttk.Label(param_frame, text="输出质量(1-100):").grid(row=2, column=0, sticky=tk.W)
-        ttk.Scale(param_frame, from_=1, to=100, variable=self.quality, orient=tk.HORIZONTAL, length=200).grid(row=2, column=1, columnspan=3, sticky=tk.W)
-        
+        ttk.Label(param_frame, text="输出质量(1-100):").grid(
+            row=2, column=0, sticky=tk.W
+        )
+        ttk.Scale(
+            param_frame,
+            from_=1,
+            to=100,
+            variable=self.quality,
+            orient=tk.HORIZONTAL,
+            length=200,
+        ).grid(row=2, column=1, columnspan=3, sticky=tk.W)
+
         # 第四行 - 添加帧提取间隔控件
-        ttk.Label(param_frame, text="帧提取间隔(秒):").grid(row=3, column=0, sticky=tk.W)
-        ttk.Entry(param_frame, textvariable=self.interval_seconds, width=10).grid(row=3, column=1, sticky=tk.W)
-        
+        ttk.Label(param_frame, text="帧提取间隔(秒):").grid(
+            row=3, column=0, sticky=tk.W
+        )
+        ttk.Entry(param_frame, textvariable=self.interval_seconds, width=10).grid(
+            row=3, column=1, sticky=tk.W
+        )
+
+        ttk.Label(param_frame, text="抽帧模式:").grid(
+            row=3, column=2, sticky=tk.W, padx=(20, 0)
+        )
+        ttk.Combobox(
+            param_frame,
+            textvariable=self.frame_mode,
+            values=["interval", "keyframe", "scene"],
+            width=9,
+            state="readonly",
+        ).grid(row=3, column=3, sticky=tk.W)
+
         # 操作区域
         action_frame = ttk.Frame(self.main_frame)
         action_frame.pack(fill=tk.X, pady=10)
-        
-        self.start_button = ttk.Button(action_frame, text="开始提取", command=self._start_extraction)
+
+        self.start_button = ttk.Button(
+            action_frame, text="开始提取", command=self._start_extraction
+        )
         self.start_button.pack(side=tk.LEFT, padx=5)
-        
-        ttk.Button(action_frame, text="打开输出目录", command=self._open_output_dir).pack(side=tk.LEFT, padx=5)
-        
+
+        ttk.Button(
+            action_frame, text="打开输出目录", command=self._open_output_dir
+        ).pack(side=tk.LEFT, padx=5)
+
         # 日志区域
         log_frame = ttk.LabelFrame(self.main_frame, text="处理日志", padding=10)
         log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        
+
         self.log_text = tk.Text(log_frame, wrap=tk.WORD, height=10)
         self.log_text.pack(fill=tk.BOTH, expand=True)
-        
+
         # 进度条
         self.progress_var = tk.DoubleVar()
-        self.progress = ttk.Progressbar(self.main_frame, variable=self.progress_var, maximum=100)
+        self.progress = ttk.Progressbar(
+            self.main_frame, variable=self.progress_var, maximum=100
+        )
         self.progress.pack(fill=tk.X, pady=5)
-        
+
         # 状态栏
         self.status_var = tk.StringVar(value="就绪")
-        status_bar = ttk.Label(self.main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar = ttk.Label(
+            self.main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W
+        )
         status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=5)
 
     def _browse_video(self):
@@ -134,8 +198,8 @@ class VideoExtractorGUI:
             title="选择视频文件",
             filetypes=[
                 ("视频文件", "*.mp4 *.avi *.mov *.mkv *.flv *.wmv"),
-                ("所有文件", "*.*")
-            ]
+                ("所有文件", "*.*"),
+            ],
         )
         if file_path:
             self.video_path.set(file_path)
@@ -153,7 +217,11 @@ class VideoExtractorGUI:
         """打开输出目录。"""
         output_dir = self.output_dir.get()
         if output_dir and os.path.exists(output_dir):
-            os.startfile(output_dir) if os.name == 'nt' else os.system(f'xdg-open "{output_dir}"')
+            (
+                os.startfile(output_dir)
+                if os.name == "nt"
+                else os.system(f'xdg-open "{output_dir}"')
+            )
         else:
             messagebox.showwarning("警告", "输出目录不存在")
 
@@ -167,6 +235,21 @@ class VideoExtractorGUI:
         self.log_text.see(tk.END)
         self.root.update_idletasks()
 
+    def _on_events(self, events):
+        """在主线程中处理一批事件：日志一次插入，进度只取最新值。
+
+        Args:
+            events: 事件列表
+        """
+        lines = [event.message for event in events if isinstance(event, LogEvent)]
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_text.see(tk.END)
+        progress = [event for event in events if isinstance(event, ProgressEvent)]
+        if progress and self.is_processing:
+            self.progress_var.set(progress[-1].percent)
+            self.status_var.set(f"正在处理... {progress[-1].message}")
+
     def _update_progress(self, value):
         """更新进度条。
 
@@ -187,7 +270,7 @@ class VideoExtractorGUI:
         try:
             # 执行提取
             self.result = self.extractor.extract(video_path, output_dir)
-            
+
             # 更新UI（在主线程中）
             self.root.after(0, self._process_complete)
         except Exception as e:
@@ -201,18 +284,24 @@ class VideoExtractorGUI:
         self.start_button.config(state=tk.NORMAL)
         self.status_var.set("处理完成")
         self.progress_var.set(100)
-        
+
         # 显示结果
         self._log("\n处理完成!")
         self._log(f"总处理时间: {self.result.processing_time}")
         self._log(f"提取关键帧数: {len(self.result.keyframes)}")
         self._log(f"提取音频片段数: {len(self.result.audio_segments)}")
-        
+        if self.result.encode_stats:
+            stats = self.result.encode_stats
+            self._log(
+                f"帧编码: {stats.image_format}, {stats.frames_per_second:.1f} 帧/秒, "
+                f"平均 {stats.bytes_per_frame / 1024:.1f} KB/帧"
+            )
+
         if self.result.error_log:
             self._log(f"错误数: {len(self.result.error_log)}")
             for task_id, error in self.result.error_log.items():
                 self._log(f"  - {task_id}: {error}")
-        
+
         messagebox.showinfo("完成", "视频处理完成!")
 
     def _process_error(self, error_message):
@@ -232,19 +321,19 @@ class VideoExtractorGUI:
         # 检查输入
         video_path = self.video_path.get()
         output_dir = self.output_dir.get()
-        
+
         if not video_path:
             messagebox.showerror("错误", "请选择视频文件")
             return
-        
+
         if not output_dir:
             messagebox.showerror("错误", "请选择输出目录")
             return
-        
+
         if not os.path.exists(video_path):
             messagebox.showerror("错误", "视频文件不存在")
             return
-        
+
         # 创建配置
         config = ExtractionConfig(
             segment_duration=self.segment_duration.get(),
@@ -252,56 +341,33 @@ class VideoExtractorGUI:
             output_format=self.output_format.get(),
             audio_format=self.audio_format.get(),
             quality=self.quality.get(),
-            interval_seconds=self.interval_seconds.get()  # 添加帧提取间隔参数
+            interval_seconds=self.interval_seconds.get(),  # 添加帧提取间隔参数
+            frame_mode=self.frame_mode.get(),
         )
-        
+
         # 创建提取器
-        self.extractor = VideoExtractor(config)
-        
+        self.extractor = VideoExtractor(config, events=self.events)
+
         # 更新状态
         self.status_var.set("正在处理...")
         self.progress_var.set(0)
         self._log(f"开始处理视频: {video_path}")
         self._log(f"输出目录: {output_dir}")
         self._log(f"配置: {config.__dict__}")
-        
+
         # 禁用开始按钮
         self.start_button.config(state=tk.DISABLED)
         self.is_processing = True
-        
-        # 在后台线程中处理视频
+
+        # 在后台线程中处理视频，进度经事件总线回到界面
         def process_thread():
             try:
-                # 获取视频总时长
-                ffmpeg = FFmpegWrapper(Path(video_path))
-                metadata = ffmpeg.get_metadata()
-                total_duration = metadata.duration  # 修改这里，使用属性访问
-                
-                # 计算总任务数
-                segment_duration = config.segment_duration
-                total_segments = int(total_duration / segment_duration) + (1 if total_duration % segment_duration > 0 else 0)
-                processed_segments = 0
-                
-                def update_progress():
-                    nonlocal processed_segments
-                    if self.is_processing:
-                        progress = (processed_segments / total_segments) * 100
-                        self.progress_var.set(min(progress, 100))
-                        self.root.after(100, update_progress)
-                
-                # 启动进度更新
-                self.root.after(0, update_progress)
-                
-                # 执行提取
                 self.result = self.extractor.extract(video_path, output_dir)
-                
-                # 处理完成
-                self.progress_var.set(100)
                 self.root.after(0, self._process_complete)
             except Exception as e:
                 error_message = str(e)
                 self.root.after(0, lambda: self._process_error(error_message))
-        
+
         # 创建并启动处理线程
         self.processing_thread = threading.Thread(target=process_thread)
         self.processing_thread.daemon = True
@@ -316,4 +382,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -2,7 +2,8 @@
 
 此模块定义了视频提取过程中使用的所有核心数据结构。
 """
-from dataclasses import dataclass
+
+from dataclasses import dataclass, field
 from datetime import timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, TypedDict, Union
@@ -13,6 +14,7 @@ import numpy as np
 @dataclass
 class VideoMetadata:
     """视频元数据信息。"""
+
     duration: float  # 视频时长（秒）
     width: int  # 视频宽度
     height: int  # 视频高度
@@ -25,38 +27,151 @@ class VideoMetadata:
 @dataclass
 class ExtractionTask:
     """视频提取任务定义。"""
+
     video_path: Path  # 视频文件路径
     start_time: float  # 开始时间（秒）
     end_time: float  # 结束时间（秒）
     output_dir: Path  # 输出目录
     task_id: str  # 任务ID
     interval_seconds: float  # 帧提取间隔（秒）
+    single_pass: bool = True  # 是否用一次 ffmpeg 调用同时提取帧和音频
+    frame_mode: str = "interval"  # 抽帧模式（interval/keyframe/scene）
+    scene_threshold: float = 0.3  # scene 模式的场景切换分数阈值（0-1）
+    scene_min_interval: float = 0.5  # scene 模式相邻两帧的最小间隔（秒）
+    scene_max_interval: float = 10.0  # scene 模式的最大抽帧间隔（秒），0 表示不限制
+    # 抽帧时的去重算法（hash/pixel/hybrid），为 None 时不去重
+    dedup_algorithm: Optional[str] = None
+    dedup_threshold: float = 5.0  # 去重阈值（允许的差异百分比）
+    image_format: str = "png"  # 帧输出格式
+    quality: int = 95  # 有损格式的输出质量（1-100）
+    png_compression: int = 6  # PNG 压缩级别（0-9）
+    metadata: Optional[VideoMetadata] = None  # 视频元数据，提供时任务中不再重复 probe
+    ffmpeg_threads: Optional[int] = None  # ffmpeg 进程的线程数，由调度器按核心预算分配
+    audio_format: str = "mp3"  # 音频输出格式，copy 表示直接复制源音频流
+    audio_mode: str = "segment"  # 音频模式（segment/whole/none）
+    # whole 模式下整个视频的音频，片段从中按偏移切分
+    full_audio: Optional["AudioSegment"] = None
 
 
 @dataclass
 class KeyframeInfo:
     """关键帧信息。"""
+
     pts: float  # 显示时间戳
     frame_type: str  # 帧类型（I/P/B）
     file_path: Path  # 保存路径
-    quality: float  # 图像质量分数
+    quality: float  # 图像质量分数（scene 模式下为场景切换分数）
+
+
+@dataclass
+class DroppedFrame:
+    """抽帧时作为重复帧丢弃的帧。"""
+
+    pts: float  # 显示时间戳
+    frame_type: str  # 帧类型
+    kept_pts: float  # 与之重复的保留帧的时间戳
 
 
 @dataclass
 class AudioSegment:
     """音频片段信息。"""
+
     start_time: float  # 开始时间
     end_time: float  # 结束时间
     file_path: Path  # 音频文件路径
     sample_rate: int  # 采样率
     channels: int  # 声道数
+    sample_offset: int = 0  # 片段在音频文件中的起始采样位置
+    sample_count: Optional[int] = None  # 片段的采样数，为 None 时即整个文件
+    byte_offset: Optional[int] = None  # 片段采样数据的起始字节（仅 PCM WAV）
+    byte_length: Optional[int] = None  # 片段采样数据的字节数（仅 PCM WAV）
+
+
+@dataclass
+class EncodeStats:
+    """帧编码统计。"""
+
+    image_format: str  # 帧输出格式
+    frame_count: int = 0  # 写出的帧数
+    total_bytes: int = 0  # 帧文件总字节数
+    seconds: float = 0.0  # 各片段抽帧耗时之和（秒）
+
+    @property
+    def frames_per_second(self) -> float:
+        """每秒编码帧数。"""
+        return self.frame_count / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_frame(self) -> float:
+        """平均每帧字节数。"""
+        return self.total_bytes / self.frame_count if self.frame_count else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """每秒写出的数据量（MB）。"""
+        return (
+            self.total_bytes / 1024 / 1024 / self.seconds if self.seconds > 0 else 0.0
+        )
+
+    def to_dict(self) -> Dict[str, Union[str, int, float]]:
+        """转换为可写入报告的字典。"""
+        return {
+            "image_format": self.image_format,
+            "frame_count": self.frame_count,
+            "total_bytes": self.total_bytes,
+            "seconds": round(self.seconds, 3),
+            "frames_per_second": round(self.frames_per_second, 2),
+            "bytes_per_frame": round(self.bytes_per_frame, 1),
+            "megabytes_per_second": round(self.megabytes_per_second, 2),
+        }
+
+
+@dataclass
+class Span:
+    """一个处理阶段的耗时记录。"""
+
+    stage: str  # 阶段名称（见 tracing.STAGES）
+    start: float  # 开始时间（Unix 时间戳，秒）
+    duration: float  # 耗时（秒）
+    task_id: str = ""  # 所属片段，视频级操作为空
+    calls: int = 1  # 合并的次数，逐帧累计的阶段大于 1
+
+
+@dataclass
+class TaskResult:
+    """任务处理结果。"""
+
+    task_id: str
+    keyframes: List[KeyframeInfo]
+    audio_segment: Optional[AudioSegment]
+    error: Optional[str] = None
+    frame_bytes: int = 0  # 写出的帧文件总字节数
+    extract_seconds: float = 0.0  # 抽帧（单次提取模式下含音频）耗时
+    resumed: bool = False  # 是否从断点清单恢复而非本次处理
+    dropped_frames: List[DroppedFrame] = field(default_factory=list)  # 去重丢弃的帧
+    spans: List[Span] = field(default_factory=list)  # 各阶段耗时
 
 
 @dataclass
 class ExtractionResult:
     """提取结果。"""
+
     keyframes: List[KeyframeInfo]  # 关键帧列表
     audio_segments: List[AudioSegment]  # 音频片段列表
     metadata: VideoMetadata  # 视频元数据
     processing_time: timedelta  # 处理耗时
-    error_log: Optional[Dict[str, str]] = None  # 错误日志 
\ No newline at end of file
+    error_log: Optional[Dict[str, str]] = None  # 错误日志
+    encode_stats: Optional[EncodeStats] = None  # 帧编码统计
+    resumed_segments: int = 0  # 从断点清单恢复、未重新处理的片段数
+    dropped_frames: List[DroppedFrame] = field(default_factory=list)  # 去重丢弃的帧
+    spans: List[Span] = field(default_factory=list)  # 视频级操作和各片段的阶段耗时
+
+
+@dataclass
+class BatchResult:
+    """批量提取结果。"""
+
+    results: Dict[Path, ExtractionResult]  # 每个视频的提取结果
+    output_dirs: Dict[Path, Path]  # 每个视频的输出目录
+    processing_time: timedelta  # 总处理耗时
+    errors: Optional[Dict[Path, str]] = None  # 无法处理的视频及原因
@@ -2,26 +2,45 @@
 
 此模块负责管理和调度视频处理任务，实现高效的并行处理。
 """
+
+import bisect
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from dataclasses import dataclass
-from datetime import timedelta
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import datetime, timedelta
+from itertools import chain, zip_longest
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from tqdm import tqdm
 
-from .ffmpeg import FFmpegWrapper
-from .models import AudioSegment, ExtractionResult, ExtractionTask, KeyframeInfo
-
-
-@dataclass
-class TaskResult:
-    """任务处理结果。"""
-    task_id: str
-    keyframes: List[KeyframeInfo]
-    audio_segment: AudioSegment
-    error: Optional[str] = None
+from .audio import (
+    read_audio_index,
+    slice_audio,
+    validate_audio_options,
+    write_audio_index,
+)
+from .batch import assign_output_dirs
+from .checkpoint import SegmentCheckpoint
+from .dedup import DEDUP_ALGORITHMS, FrameDeduplicator
+from .encoders import get_encoder
+from .events import EventBus
+from .ffmpeg import FFmpegError, FFmpegWrapper
+from .governor import ConcurrencyGovernor
+from .models import (
+    AudioSegment,
+    BatchResult,
+    DroppedFrame,
+    EncodeStats,
+    ExtractionResult,
+    ExtractionTask,
+    KeyframeInfo,
+    Span,
+    TaskResult,
+    VideoMetadata,
+)
+from .tracing import SpanRecorder
 
 
 def process_segment(task: ExtractionTask) -> TaskResult:
@@ -31,136 +50,698 @@ def process_segment(task: ExtractionTask) -> TaskResult:
         task: 处理任务
 
     Returns:
-        TaskResult: 处理结果
+        TaskResult: 处理结果，``spans`` 中记录了各阶段的耗时
     """
+    tracer = SpanRecorder(task.task_id)
+    with tracer.span("task"):
+        result = _process_segment(task, tracer)
+    result.spans = tracer.spans
+    return result
+
+
+def _process_segment(task: ExtractionTask, tracer: SpanRecorder) -> TaskResult:
+    """处理视频片段，各阶段的耗时记录到 tracer。"""
     try:
-        ffmpeg = FFmpegWrapper(task.video_path)
+        ffmpeg = FFmpegWrapper(
+            task.video_path,
+            metadata=task.metadata,
+            threads=task.ffmpeg_threads,
+            scene_threshold=task.scene_threshold,
+            scene_min_interval=task.scene_min_interval,
+            scene_max_interval=task.scene_max_interval,
+            tracer=tracer,
+        )
         output_dir = task.output_dir / f"segment_{task.task_id}"
-        
-        # 并行提取关键帧和音频
-        keyframes = ffmpeg.extract_keyframes(
-            output_dir,
-            task.start_time,
-            task.end_time,
-            interval_seconds=task.interval_seconds
+        encoder = get_encoder(
+            task.image_format,
+            quality=task.quality,
+            compression_level=task.png_compression,
         )
-        
-        audio_segment = ffmpeg.extract_audio(
-            output_dir,
-            task.start_time,
-            task.end_time
+        dedup = (
+            FrameDeduplicator(task.dedup_algorithm, task.dedup_threshold)
+            if task.dedup_algorithm
+            else None
         )
-        
+        # 只有 segment 模式在片段内提取音频
+        audio_format = task.audio_format if task.audio_mode == "segment" else None
+        started = time.perf_counter()
+
+        if task.single_pass:
+            # 一次 ffmpeg 调用同时提取关键帧和音频
+            keyframes, audio_segment = ffmpeg.extract_segment(
+                output_dir,
+                task.start_time,
+                task.end_time,
+                interval_seconds=task.interval_seconds,
+                frame_mode=task.frame_mode,
+                encoder=encoder,
+                audio_format=audio_format,
+                dedup=dedup,
+            )
+            extract_seconds = time.perf_counter() - started
+        else:
+            keyframes = ffmpeg.extract_keyframes(
+                output_dir,
+                task.start_time,
+                task.end_time,
+                interval_seconds=task.interval_seconds,
+                frame_mode=task.frame_mode,
+                encoder=encoder,
+                dedup=dedup,
+            )
+            extract_seconds = time.perf_counter() - started
+
+            audio_segment = None
+            if audio_format is not None:
+                audio_segment = ffmpeg.extract_audio(
+                    output_dir,
+                    task.start_time,
+                    task.end_time,
+                    audio_format=audio_format,
+                )
+
+        if task.full_audio is not None:
+            # whole 模式：引用整体音频中的对应区间
+            audio_segment = slice_audio(task.full_audio, task.start_time, task.end_time)
+
+        with tracer.span("glob"):
+            frame_bytes = sum(k.file_path.stat().st_size for k in keyframes)
+
         return TaskResult(
             task_id=task.task_id,
             keyframes=keyframes,
-            audio_segment=audio_segment
+            audio_segment=audio_segment,
+            frame_bytes=frame_bytes,
+            extract_seconds=extract_seconds,
+            dropped_frames=dedup.dropped if dedup is not None else [],
         )
     except Exception as e:
         return TaskResult(
-            task_id=task.task_id,
-            keyframes=[],
-            audio_segment=None,
-            error=str(e)
+            task_id=task.task_id, keyframes=[], audio_segment=None, error=str(e)
+        )
+
+
+def _validate_options(options: Dict) -> None:
+    """提前校验输出格式和音频选项，避免每个片段都失败。"""
+    get_encoder(options.get("image_format", "png"))
+    validate_audio_options(
+        options.get("audio_format", "mp3"), options.get("audio_mode", "segment")
+    )
+    dedup_algorithm = options.get("dedup_algorithm")
+    if dedup_algorithm and dedup_algorithm not in DEDUP_ALGORITHMS:
+        raise ValueError(
+            f"不支持的去重算法: {dedup_algorithm}，可选值: {', '.join(DEDUP_ALGORITHMS)}"
+        )
+
+
+def _publish(
+    events: Optional[EventBus], source: str, result: TaskResult, done: int, total: int
+) -> None:
+    """把片段完成发布为进度事件，失败的片段另发布一条错误日志。"""
+    if events is None:
+        return
+    if result.error:
+        events.log(
+            f"片段 {result.task_id} 处理失败: {result.error}",
+            level="error",
+            source=source,
+        )
+    events.progress(source, done, total, f"已完成 {done}/{total} 个片段")
+
+
+def _report_unknown_dirs(
+    events: Optional[EventBus],
+    source: str,
+    checkpoint: SegmentCheckpoint,
+    tasks: List[ExtractionTask],
+) -> None:
+    """对完成清单中没有记录的已有片段目录发布警告，这些目录不会被清空。"""
+    if events is None:
+        return
+    for segment_dir in checkpoint.unknown_dirs(tasks):
+        events.log(
+            f"片段目录 {segment_dir.name} 不在完成清单中，已保留其中的文件，旧文件可能混入结果",
+            level="warning",
+            source=source,
         )
 
 
+def _interleave(task_lists: List[List[ExtractionTask]]) -> List[ExtractionTask]:
+    """按轮转顺序合并多个任务列表：先取每个视频的第一个片段，再取第二个，依此类推。"""
+    interleaved: List[ExtractionTask] = []
+    for round_tasks in zip_longest(*task_lists):
+        interleaved.extend(task for task in round_tasks if task is not None)
+    return interleaved
+
+
+def _segment_boundaries(
+    duration: float,
+    segment_duration: float,
+    keyframe_times: Optional[List[float]] = None,
+) -> List[Tuple[float, float]]:
+    """计算片段边界。
+
+    提供关键帧时间戳时，每个边界吸附到离目标时长最近的关键帧上，
+    使每个片段都从关键帧开始，ffmpeg 定位后无需先解码前一个 GOP。
+
+    Args:
+        duration: 视频时长（秒）
+        segment_duration: 目标片段时长（秒）
+        keyframe_times: 升序排列的关键帧时间戳，为空时按固定时长切分
+
+    Returns:
+        List[Tuple[float, float]]: (开始时间, 结束时间) 列表
+    """
+    keyframe_times = [t for t in keyframe_times or [] if 0.0 < t < duration]
+
+    boundaries = []
+    current_time = 0.0
+    while current_time < duration:
+        end_time = min(current_time + segment_duration, duration)
+
+        if keyframe_times and end_time < duration:
+            # 在当前起点之后的关键帧中找离目标边界最近的一个
+            lo = bisect.bisect_right(keyframe_times, current_time)
+            pos = bisect.bisect_left(keyframe_times, end_time, lo)
+            candidates = keyframe_times[max(pos - 1, lo) : pos + 1]
+            if candidates:
+                end_time = min(candidates, key=lambda t: abs(t - end_time))
+            else:
+                end_time = duration  # 之后再没有关键帧
+
+        boundaries.append((current_time, end_time))
+        current_time = end_time
+
+    return boundaries
+
+
+def _format_time(seconds: float) -> str:
+    """把片段边界格式化为任务 ID 中的时间。
+
+    保留到微秒（与 ffprobe 输出的时间戳精度相同），吸附到关键帧后相距很近的
+    边界也不会得到相同的 ID；末尾的 0 去掉，整秒边界仍写作 ``90.0``。
+    """
+    text = f"{seconds:.6f}".rstrip("0")
+    return text + "0" if text.endswith(".") else text
+
+
 class TaskScheduler:
     """任务调度器。"""
 
-    def __init__(self, n_workers: Optional[int] = None):
+    def __init__(
+        self,
+        n_workers: Optional[int] = None,
+        adaptive: bool = True,
+        ffmpeg_threads: Optional[int] = None,
+    ):
         """初始化调度器。
 
         Args:
-            n_workers: 工作进程数，默认为CPU核心数
+            n_workers: 同时处理的片段数上限，默认为CPU核心数
+            adaptive: 是否根据系统负载和吞吐量动态调整实际并发数
+            ffmpeg_threads: 每个 ffmpeg 进程的线程数，默认按核心数在并发进程间平均分配
         """
         self.n_workers = n_workers or mp.cpu_count()
+        self.adaptive = adaptive
+        self.ffmpeg_threads = ffmpeg_threads
+
+    def _create_governor(self) -> ConcurrencyGovernor:
+        """为一次处理创建并发调控器。"""
+        return ConcurrencyGovernor(
+            self.n_workers,
+            adaptive=self.adaptive,
+            threads_per_process=self.ffmpeg_threads,
+        )
 
-    def _split_tasks(self, video_path: Path, segment_duration: float = 30.0, interval_seconds: float = 0.5) -> List[ExtractionTask]:
+    @staticmethod
+    def _run_task(
+        governor: ConcurrencyGovernor,
+        task: ExtractionTask,
+        checkpoint: Optional[SegmentCheckpoint] = None,
+    ) -> TaskResult:
+        """在调控器分配的槽位和线程预算内处理一个片段，开始和完成时都记入完成清单。"""
+        queued = time.time()
+        started = time.perf_counter()
+        with governor.slot() as threads:
+            waited = time.perf_counter() - started
+            if checkpoint is not None:
+                checkpoint.start(task)
+            result = process_segment(replace(task, ffmpeg_threads=threads))
+        result.spans.insert(0, Span("queue", queued, waited, task.task_id))
+        governor.record(task.end_time - task.start_time)
+        if checkpoint is not None:
+            checkpoint.record(task, result)
+        return result
+
+    def _execute(
+        self,
+        tasks: List[ExtractionTask],
+        checkpoint: SegmentCheckpoint,
+        resume: bool = True,
+        ordered: bool = False,
+    ) -> Iterator[TaskResult]:
+        """并行处理一个视频的所有片段，逐个产出结果。
+
+        Args:
+            tasks: 按时间顺序排列的任务列表
+            checkpoint: 该视频的完成清单
+            resume: 是否先从完成清单恢复已完成的片段
+            ordered: 为 True 时按片段时间顺序产出，否则按完成顺序产出
+
+        Yields:
+            TaskResult: 片段处理结果，恢复的片段最先产出
+        """
+        # 恢复上次运行已完成的片段，只处理缺失或失败的部分
+        if resume:
+            restored, pending = checkpoint.partition(tasks)
+        else:
+            restored, pending = [], tasks
+
+        # 使用线程池并行处理，实际在途片段数和线程预算由调控器决定
+        governor = self._create_governor()
+        executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        futures = [
+            executor.submit(self._run_task, governor, task, checkpoint)
+            for task in pending
+        ]
+        try:
+            if not ordered:
+                yield from restored
+                for future in as_completed(futures):
+                    yield future.result()
+                return
+
+            # 按时间顺序产出：只缓存先于当前空缺完成的片段，前缀一齐就立即放出
+            position = {task.task_id: i for i, task in enumerate(tasks)}
+            waiting: Dict[int, TaskResult] = {}
+            next_index = 0
+            for result in chain(
+                restored, (future.result() for future in as_completed(futures))
+            ):
+                waiting[position[result.task_id]] = result
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的片段
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _split_tasks(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        segment_duration: float = 30.0,
+        align_to_keyframes: bool = True,
+        metadata: Optional[VideoMetadata] = None,
+        tracer: Optional[SpanRecorder] = None,
+        **task_options,
+    ) -> List[ExtractionTask]:
         """将视频分割成多个处理任务。
 
         Args:
             video_path: 视频文件路径
+            output_dir: 输出目录
             segment_duration: 每个片段的时长（秒）
-            interval_seconds: 帧提取间隔（秒）
+            align_to_keyframes: 是否将片段边界对齐到关键帧
+            metadata: 已知的视频元数据，会传给每个任务以免重复 probe
+            tracer: 阶段耗时记录器，记录 probe 和关键帧扫描的耗时
+            **task_options: 原样写入每个 ``ExtractionTask`` 的其他字段
+                （如 ``interval_seconds``、``frame_mode``、``image_format``）
 
         Returns:
             List[ExtractionTask]: 任务列表
         """
-        ffmpeg = FFmpegWrapper(video_path)
+        ffmpeg = FFmpegWrapper(video_path, metadata=metadata, tracer=tracer)
         metadata = ffmpeg.get_metadata()
         duration = metadata.duration
-        
+
+        keyframe_times = None
+        if align_to_keyframes:
+            try:
+                keyframe_times = ffmpeg.get_keyframe_times()
+            except FFmpegError:
+                keyframe_times = None  # 无法获取索引时退回固定时长切分
+
         tasks = []
-        current_time = 0.0
-        
-        while current_time < duration:
-            end_time = min(current_time + segment_duration, duration)
-            task_id = f"{current_time:.1f}_{end_time:.1f}"
-            
-            tasks.append(ExtractionTask(
-                video_path=video_path,
-                start_time=current_time,
-                end_time=end_time,
-                output_dir=video_path.parent / "output",
-                task_id=task_id,
-                interval_seconds=interval_seconds
-            ))
-            
-            current_time = end_time
-            
+
+        for current_time, end_time in _segment_boundaries(
+            duration, segment_duration, keyframe_times
+        ):
+            task_id = f"{_format_time(current_time)}_{_format_time(end_time)}"
+
+            tasks.append(
+                ExtractionTask(
+                    video_path=video_path,
+                    start_time=current_time,
+                    end_time=end_time,
+                    output_dir=output_dir,
+                    task_id=task_id,
+                    metadata=metadata,
+                    **task_options,
+                )
+            )
+
         return tasks
 
-    def process_video(self, video_path: Path, output_dir: Path, interval_seconds: float = 0.5) -> ExtractionResult:
+    def process_video(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        interval_seconds: float = 0.5,
+        single_pass: bool = True,
+        frame_mode: str = "interval",
+        scene_threshold: float = 0.3,
+        scene_min_interval: float = 0.5,
+        scene_max_interval: float = 10.0,
+        dedup_algorithm: Optional[str] = None,
+        dedup_threshold: float = 5.0,
+        segment_duration: float = 30.0,
+        align_to_keyframes: bool = True,
+        image_format: str = "png",
+        quality: int = 95,
+        png_compression: int = 6,
+        audio_format: str = "mp3",
+        audio_mode: str = "segment",
+        resume: bool = True,
+        on_result: Optional[Callable[[TaskResult], None]] = None,
+        events: Optional[EventBus] = None,
+    ) -> ExtractionResult:
         """处理整个视频。
 
         Args:
             video_path: 视频文件路径
             output_dir: 输出目录
             interval_seconds: 帧提取间隔（秒），默认0.5秒
+            single_pass: 是否用一次 ffmpeg 调用同时提取帧和音频，默认开启
+            frame_mode: 抽帧模式，interval 按间隔抽帧，keyframe 只提取 I 帧，scene 按画面变化抽帧
+            scene_threshold: scene 模式的场景切换分数阈值（0-1），默认0.3
+            scene_min_interval: scene 模式相邻两帧的最小间隔（秒），默认0.5秒
+            scene_max_interval: scene 模式的最大抽帧间隔（秒），0 表示不限制，默认10秒
+            dedup_algorithm: 抽帧时的去重算法（hash/pixel/hybrid），重复帧不编码也不写盘，默认不去重
+            dedup_threshold: 去重阈值（允许的差异百分比），与 SeqPurge 含义相同，默认5.0
+            segment_duration: 每个片段的目标时长（秒），默认30秒
+            align_to_keyframes: 是否将片段边界对齐到关键帧，默认开启
+            image_format: 帧输出格式（png/jpg/webp/bmp/npy），默认png
+            quality: 有损格式的输出质量（1-100），默认95
+            png_compression: PNG 压缩级别（0-9），默认6
+            audio_format: 音频格式（mp3/aac/wav/flac/opus/ogg），copy 直接复制源音频流，默认mp3
+            audio_mode: 音频模式，segment 每个片段单独输出，whole 整个视频输出一个文件
+                并按偏移索引引用，none 不提取音频，默认segment
+            resume: 是否跳过输出目录完成清单中已完成的片段，默认开启
+            on_result: 每个片段完成时调用的回调，按完成顺序在调用线程中执行
+            events: 可选的事件总线，每个片段完成时发布进度，失败时发布错误日志
 
         Returns:
             ExtractionResult: 处理结果
+
+        Raises:
+            ValueError: 当输出格式或音频选项不受支持时抛出
         """
-        from datetime import datetime
         start_time = datetime.now()
-        
+
+        options = dict(
+            segment_duration=segment_duration,
+            align_to_keyframes=align_to_keyframes,
+            interval_seconds=interval_seconds,
+            single_pass=single_pass,
+            frame_mode=frame_mode,
+            scene_threshold=scene_threshold,
+            scene_min_interval=scene_min_interval,
+            scene_max_interval=scene_max_interval,
+            dedup_algorithm=dedup_algorithm,
+            dedup_threshold=dedup_threshold,
+            image_format=image_format,
+            quality=quality,
+            png_compression=png_compression,
+            audio_format=audio_format,
+            audio_mode=audio_mode,
+        )
+
+        # 提前校验输出格式，避免每个片段都失败
+        _validate_options(options)
+
         # 创建输出目录
         output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 分割任务
-        tasks = self._split_tasks(video_path, interval_seconds=interval_seconds)
-        
-        # 使用线程池并行处理
+
+        # 获取元数据（只获取一次，随任务传递）并分割任务
+        metadata, tasks, spans = self._plan(video_path, output_dir, **options)
+
+        # 使用tqdm显示进度，结果按完成顺序处理，慢片段不会阻塞进度
         results: List[TaskResult] = []
+        checkpoint = SegmentCheckpoint(output_dir)
+        _report_unknown_dirs(events, video_path.name, checkpoint, tasks)
+        for result in tqdm(
+            self._execute(tasks, checkpoint, resume),
+            total=len(tasks),
+            desc="处理视频片段",
+        ):
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+            _publish(events, video_path.name, result, len(results), len(tasks))
+
+        return self._merge_results(
+            results, metadata, datetime.now() - start_time, image_format, spans
+        )
+
+    def iter_results(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        ordered: bool = False,
+        resume: bool = True,
+        **options,
+    ) -> Iterator[TaskResult]:
+        """流式处理视频，片段一完成就产出其结果。
+
+        与 ``process_video`` 不同，结果不在内存中累积，下游（如去重、建索引）
+        可以在整段视频处理完之前开始工作。提前停止迭代时尚未开始的片段会被取消。
+
+        Args:
+            video_path: 视频文件路径
+            output_dir: 输出目录
+            ordered: 为 True 时按片段时间顺序产出，先完成的后续片段会等待前面的片段
+            resume: 是否跳过输出目录完成清单中已完成的片段，默认开启
+            **options: 与 ``process_video`` 相同的处理参数
+
+        Yields:
+            TaskResult: 片段处理结果
+
+        Raises:
+            ValueError: 当输出格式或音频选项不受支持时抛出
+        """
+        _validate_options(options)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        _, tasks, _ = self._plan(video_path, output_dir, **options)
+        yield from self._execute(
+            tasks, SegmentCheckpoint(output_dir), resume, ordered=ordered
+        )
+
+    def iter_keyframes(
+        self, video_path: Path, output_dir: Path, resume: bool = True, **options
+    ) -> Iterator[KeyframeInfo]:
+        """流式处理视频，按时间戳顺序产出提取的帧。
+
+        每当开头连续的若干片段全部完成，其中的帧就立即产出。失败的片段被跳过，
+        需要错误信息时请使用 ``iter_results``。
+
+        Args:
+            video_path: 视频文件路径
+            output_dir: 输出目录
+            resume: 是否跳过输出目录完成清单中已完成的片段，默认开启
+            **options: 与 ``process_video`` 相同的处理参数
+
+        Yields:
+            KeyframeInfo: 按时间戳升序排列的帧信息
+        """
+        for result in self.iter_results(
+            video_path, output_dir, ordered=True, resume=resume, **options
+        ):
+            yield from result.keyframes
+
+    def process_batch(
+        self,
+        video_paths: Sequence[Path],
+        output_dir: Path,
+        resume: bool = True,
+        events: Optional[EventBus] = None,
+        **options,
+    ) -> BatchResult:
+        """在同一个工作池中批量处理多个视频。
+
+        所有视频的元数据获取和任务分割并行进行，之后各视频的片段按轮转顺序
+        交错提交到同一个线程池，由同一个并发调控器管理，既能在短视频较多时
+        填满所有核心，也不会让某个长视频独占工作池。每个视频的输出写入
+        ``<output_dir>/<视频文件名>`` 下的独立目录。
+
+        Args:
+            video_paths: 视频文件路径列表
+            output_dir: 输出根目录
+            resume: 是否跳过各视频完成清单中已完成的片段，默认开启
+            events: 可选的事件总线，按视频发布进度，片段失败时发布错误日志
+            **options: 与 ``process_video`` 相同的处理参数
+
+        Returns:
+            BatchResult: 批量处理结果，无法读取的视频记录在 ``errors`` 中
+
+        Raises:
+            ValueError: 当输出格式或音频选项不受支持时抛出
+        """
+        start_time = datetime.now()
+        _validate_options(options)
+        output_dirs = assign_output_dirs(video_paths, output_dir)
+
+        governor = self._create_governor()
+        plans: Dict[Path, Tuple[VideoMetadata, List[ExtractionTask], List[Span]]] = {}
+        errors: Dict[Path, str] = {}
+        results: Dict[Path, List[TaskResult]] = {video: [] for video in video_paths}
+        checkpoints: Dict[Path, SegmentCheckpoint] = {}
+        finished_at: Dict[Path, datetime] = {}
+
         with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
-            futures = [executor.submit(process_segment, task) for task in tasks]
-            
-            # 使用tqdm显示进度
-            for future in tqdm(futures, total=len(tasks), desc="处理视频片段"):
-                results.append(future.result())
-        
-        # 合并结果
+            # 并行获取元数据并分割任务
+            plan_futures = {
+                executor.submit(self._plan, video, output_dirs[video], **options): video
+                for video in video_paths
+            }
+            for future in as_completed(plan_futures):
+                video = plan_futures[future]
+                try:
+                    plans[video] = future.result()
+                except Exception as e:
+                    errors[video] = str(e)
+
+            # 恢复各视频已完成的片段
+            pending: Dict[Path, List[ExtractionTask]] = {}
+            for video in video_paths:
+                if video not in plans:
+                    continue
+                checkpoints[video] = SegmentCheckpoint(output_dirs[video])
+                _report_unknown_dirs(
+                    events, video.name, checkpoints[video], plans[video][1]
+                )
+                if resume:
+                    results[video], pending[video] = checkpoints[video].partition(
+                        plans[video][1]
+                    )
+                else:
+                    pending[video] = plans[video][1]
+
+            # 各视频的片段轮转交错，保证公平调度
+            tasks = _interleave(list(pending.values()))
+            task_futures = {
+                executor.submit(
+                    self._run_task, governor, task, checkpoints[task.video_path]
+                ): task.video_path
+                for task in tasks
+            }
+            for future in tqdm(
+                as_completed(task_futures), total=len(task_futures), desc="处理视频片段"
+            ):
+                video = task_futures[future]
+                results[video].append(future.result())
+                finished_at[video] = datetime.now()
+                _publish(
+                    events,
+                    video.name,
+                    results[video][-1],
+                    len(results[video]),
+                    len(plans[video][1]),
+                )
+
+        image_format = options.get("image_format", "png")
+        return BatchResult(
+            results={
+                video: self._merge_results(
+                    results[video],
+                    plans[video][0],
+                    finished_at.get(video, datetime.now()) - start_time,
+                    image_format,
+                    plans[video][2],
+                )
+                for video in video_paths
+                if video in plans
+            },
+            output_dirs=output_dirs,
+            processing_time=datetime.now() - start_time,
+            errors=errors if errors else None,
+        )
+
+    def _plan(
+        self, video_path: Path, output_dir: Path, **options
+    ) -> Tuple[VideoMetadata, List[ExtractionTask], List[Span]]:
+        """获取视频元数据并分割任务。
+
+        whole 音频模式下同时提取整个视频的音频（输出目录中已有匹配的
+        索引时直接复用），并写出各片段的偏移索引。返回的耗时记录包含
+        probe、关键帧扫描和整体音频提取等视频级操作。
+        """
+        options.setdefault("interval_seconds", 0.5)
+        tracer = SpanRecorder()
+        metadata = FFmpegWrapper(video_path, tracer=tracer).get_metadata()
+        tasks = self._split_tasks(
+            video_path, output_dir, metadata=metadata, tracer=tracer, **options
+        )
+
+        if options.get("audio_mode") == "whole":
+            audio_format = options.get("audio_format", "mp3")
+            full_audio = read_audio_index(output_dir, video_path, audio_format)
+            if full_audio is None:
+                full_audio = FFmpegWrapper(
+                    video_path, metadata=metadata, tracer=tracer
+                ).extract_full_audio(output_dir, audio_format)
+            if full_audio is not None:
+                write_audio_index(
+                    output_dir, video_path, audio_format, full_audio, tasks
+                )
+                tasks = [replace(task, full_audio=full_audio) for task in tasks]
+
+        return metadata, tasks, tracer.spans
+
+    @staticmethod
+    def _merge_results(
+        results: List[TaskResult],
+        metadata: VideoMetadata,
+        processing_time: timedelta,
+        image_format: str,
+        spans: Optional[List[Span]] = None,
+    ) -> ExtractionResult:
+        """合并一个视频所有片段的处理结果，spans 为视频级操作的耗时记录。"""
         all_keyframes: List[KeyframeInfo] = []
         all_audio_segments: List[AudioSegment] = []
+        dropped_frames: List[DroppedFrame] = []
         error_log = {}
-        
+        encode_stats = EncodeStats(image_format=image_format)
+        all_spans: List[Span] = list(spans or [])
+
         for result in results:
+            all_spans.extend(result.spans)
             if result.error:
                 error_log[result.task_id] = result.error
             else:
                 all_keyframes.extend(result.keyframes)
+                dropped_frames.extend(result.dropped_frames)
                 if result.audio_segment:
                     all_audio_segments.append(result.audio_segment)
-        
+                encode_stats.frame_count += len(result.keyframes)
+                encode_stats.total_bytes += result.frame_bytes
+                encode_stats.seconds += result.extract_seconds
+
         # 按时间戳排序
         all_keyframes.sort(key=lambda x: x.pts)
         all_audio_segments.sort(key=lambda x: x.start_time)
-        
+        dropped_frames.sort(key=lambda x: x.pts)
+
         return ExtractionResult(
             keyframes=all_keyframes,
             audio_segments=all_audio_segments,
-            metadata=FFmpegWrapper(video_path).get_metadata(),
-            processing_time=datetime.now() - start_time,
-            error_log=error_log if error_log else None
-        ) 
\ No newline at end of file
+            metadata=metadata,
+            processing_time=processing_time,
+            error_log=error_log if error_log else None,
+            encode_stats=encode_stats,
+            resumed_segments=sum(1 for result in results if result.resumed),
+            dropped_frames=dropped_frames,
+            spans=all_spans,
+        )
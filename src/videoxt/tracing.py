@@ -0,0 +1,210 @@
+"""阶段耗时记录模块。
+
+处理过程中按片段和阶段记录耗时区间（span），汇总后写入 ``report.json``，
+也可以导出为 Chrome trace（``chrome://tracing`` 或 Perfetto 打开），
+用来判断一次慢的运行是卡在 ffmpeg 的解码编码、磁盘读写还是调度排队上。
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from .models import Span
+
+# 记录的阶段：
+#   queue         片段等待调控器分配槽位（调度排队）
+#   task          片段处理的全过程
+#   probe         ffprobe 获取元数据或扫描关键帧索引
+#   spawn         启动 ffmpeg 进程
+#   transcode     直接写图像文件时单个 ffmpeg 进程内的解码、滤镜、编码和写盘，无法再细分
+#   decode        管道模式下等待 ffmpeg 解码、滤镜输出原始帧
+#   dedup         管道模式下内存去重的比较
+#   encode        管道模式下把原始帧送入编码进程并等待其写完（npy 为直接写盘）
+#   glob          扫描输出目录、解析 ffmpeg 日志、统计帧文件大小
+#   audio_encode  单独启动 ffmpeg 提取音频
+#   audio_probe   从输出日志解析不到音频参数时重新 probe 音频文件
+STAGES = (
+    "queue",
+    "task",
+    "probe",
+    "spawn",
+    "transcode",
+    "decode",
+    "dedup",
+    "encode",
+    "glob",
+    "audio_encode",
+    "audio_probe",
+)
+
+# 逐帧累计的阶段，多次进入合并为一条记录，在 trace 中单独占一行
+ACCUMULATED_STAGES = ("decode", "dedup", "encode")
+
+
+class StageTimer:
+    """逐帧反复进入的阶段计时器，累计耗时，关闭时合并为一条记录。"""
+
+    def __init__(self, recorder: "SpanRecorder", stage: str):
+        self._recorder = recorder
+        self._stage = stage
+        self._start: Optional[float] = None
+        self._entered = 0.0
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __enter__(self) -> "StageTimer":
+        if self._start is None:
+            self._start = time.time()
+        self._entered = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds += time.perf_counter() - self._entered
+        self.calls += 1
+
+    def close(self) -> None:
+        """把累计的耗时写入记录器，只写一次。"""
+        if self.calls:
+            self._recorder.add(self._stage, self._start, self.seconds, self.calls)
+            self.calls = 0
+
+
+class SpanRecorder:
+    """收集一个片段（或视频级操作）的阶段耗时，可在多个线程中使用。"""
+
+    def __init__(self, task_id: str = ""):
+        """初始化记录器。
+
+        Args:
+            task_id: 所属片段的任务 ID，视频级操作为空
+        """
+        self.task_id = task_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, start: float, duration: float, calls: int = 1) -> None:
+        """写入一条已测得的记录。
+
+        Args:
+            stage: 阶段名称，见 ``STAGES``
+            start: 开始时间（Unix 时间戳，秒）
+            duration: 耗时（秒）
+            calls: 合并的次数
+        """
+        with self._lock:
+            self.spans.append(Span(stage, start, duration, self.task_id, calls))
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """记录 with 语句块的耗时，块中抛出异常时同样记录。"""
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, start, time.perf_counter() - started)
+
+    def timer(self, stage: str) -> StageTimer:
+        """创建逐帧累计的计时器，用完后需调用 ``close``。"""
+        return StageTimer(self, stage)
+
+
+def summarize_spans(spans: List[Span], wall_seconds: float) -> Dict:
+    """按阶段汇总耗时，用于写入报告。
+
+    ``parallelism`` 是各片段处理耗时之和与总耗时之比，明显低于并发数时
+    说明时间花在了排队或片段之外（如 probe、整体音频提取）。
+
+    Args:
+        spans: 所有耗时记录
+        wall_seconds: 整个视频的处理耗时（秒）
+
+    Returns:
+        Dict: 各阶段的次数、总耗时、最大耗时和占片段总耗时的比例
+    """
+    task_seconds = sum(span.duration for span in spans if span.stage == "task")
+    stages: Dict[str, Dict[str, Union[int, float]]] = {}
+    for stage in STAGES:
+        matched = [span for span in spans if span.stage == stage]
+        if not matched:
+            continue
+        seconds = sum(span.duration for span in matched)
+        stages[stage] = {
+            "count": len(matched),
+            "calls": sum(span.calls for span in matched),
+            "seconds": round(seconds, 3),
+            "max_seconds": round(max(span.duration for span in matched), 3),
+            "share": round(seconds / task_seconds, 3) if task_seconds > 0 else 0.0,
+        }
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "task_seconds": round(task_seconds, 3),
+        "parallelism": (
+            round(task_seconds / wall_seconds, 2) if wall_seconds > 0 else 0.0
+        ),
+        "stages": stages,
+    }
+
+
+def chrome_trace(spans: List[Span], process_name: str = "videoxt") -> Dict:
+    """把耗时记录转换为 Chrome trace 格式（Trace Event Format）。
+
+    每个片段一行，逐帧累计的阶段在片段下方各占一行；视频级操作在单独的一行。
+
+    Args:
+        spans: 耗时记录
+        process_name: trace 中显示的进程名，通常为视频文件名
+
+    Returns:
+        Dict: 可直接写为 JSON 的 trace
+    """
+    origin = min((span.start for span in spans), default=0.0)
+    lanes: Dict[str, int] = {}
+    events: List[Dict] = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": 1,
+            "tid": 0,
+            "args": {"name": process_name},
+        }
+    ]
+    for span in sorted(spans, key=lambda s: (s.task_id, s.start)):
+        lane = span.task_id or "video"
+        if span.stage in ACCUMULATED_STAGES:
+            lane = f"{lane} {span.stage}"
+        if lane not in lanes:
+            lanes[lane] = len(lanes) + 1
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": lanes[lane],
+                    "args": {"name": lane},
+                }
+            )
+        events.append(
+            {
+                "name": span.stage,
+                "cat": "accumulated" if span.stage in ACCUMULATED_STAGES else "stage",
+                "ph": "X",
+                "ts": round((span.start - origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": 1,
+                "tid": lanes[lane],
+                "args": {"task_id": span.task_id, "calls": span.calls},
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(
+    path: Union[str, Path], spans: List[Span], process_name: str = "videoxt"
+) -> None:
+    """把耗时记录写为 Chrome trace 文件。"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(spans, process_name), f, ensure_ascii=False)
@@ -0,0 +1,99 @@
+import struct
+import wave
+
+import pytest
+
+from videoxt.audio import slice_audio, wav_layout
+from videoxt.models import AudioSegment
+
+
+def _write_wav(path, seconds, sample_rate=8000, channels=2):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0" * int(seconds * sample_rate) * channels * 2)
+    return path
+
+
+def _full_audio(path, seconds, sample_rate=8000, channels=2):
+    return AudioSegment(
+        start_time=0.0,
+        end_time=seconds,
+        file_path=path,
+        sample_rate=sample_rate,
+        channels=channels,
+        sample_count=int(seconds * sample_rate),
+    )
+
+
+def test_wav_layout_of_plain_wav(tmp_path):
+    path = _write_wav(tmp_path / "audio.wav", 1.0)
+    assert wav_layout(path) == (44, 4)
+
+
+def test_wav_layout_skips_extra_chunks(tmp_path):
+    # fmt 与 data 之间插入一个奇数长度的 LIST 块（按 RIFF 规则补齐到偶数）
+    fmt = struct.pack("<HHIIHH", 1, 1, 8000, 16000, 2, 16)
+    extra = b"LIST" + struct.pack("<I", 3) + b"abc\0"
+    data = b"data" + struct.pack("<I", 4) + b"\0" * 4
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra + data
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    assert wav_layout(path) == (12 + 8 + len(fmt) + len(extra) + 8, 2)
+
+
+@pytest.mark.parametrize("content", [b"", b"RIFF\0\0\0\0AVI ", b"RIFF\0\0\0\0WAVE"])
+def test_wav_layout_rejects_non_wav(tmp_path, content):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(content)
+    assert wav_layout(path) is None
+
+
+def test_wav_layout_missing_file(tmp_path):
+    assert wav_layout(tmp_path / "missing.wav") is None
+
+
+def test_slice_audio_byte_offsets(tmp_path):
+    path = _write_wav(tmp_path / "audio.wav", 10.0)
+    segment = slice_audio(_full_audio(path, 10.0), 2.5, 4.0)
+    assert segment.sample_offset == 20000
+    assert segment.sample_count == 12000
+    assert segment.byte_offset == 44 + 20000 * 4
+    assert segment.byte_length == 12000 * 4
+    assert segment.file_path == path
+
+
+def test_slice_audio_clamps_to_sample_count(tmp_path):
+    path = _write_wav(tmp_path / "audio.wav", 10.0)
+    full_audio = _full_audio(path, 10.0)
+
+    tail = slice_audio(full_audio, 9.0, 12.0)
+    assert tail.sample_offset == 72000
+    assert tail.sample_count == 8000
+
+    beyond = slice_audio(full_audio, 11.0, 12.0)
+    assert beyond.sample_offset == 80000
+    assert beyond.sample_count == 0
+    assert beyond.byte_length == 0
+
+
+def test_slice_audio_segments_are_contiguous(tmp_path):
+    path = _write_wav(tmp_path / "audio.wav", 10.0, sample_rate=44100)
+    full_audio = _full_audio(path, 10.0, sample_rate=44100)
+    bounds = [0.0, 1 / 3, 2 / 3, 5.0, 10.0]
+    segments = [slice_audio(full_audio, a, b) for a, b in zip(bounds, bounds[1:])]
+    for prev, cur in zip(segments, segments[1:]):
+        assert prev.sample_offset + prev.sample_count == cur.sample_offset
+        assert prev.byte_offset + prev.byte_length == cur.byte_offset
+    assert sum(s.sample_count for s in segments) == full_audio.sample_count
+
+
+def test_slice_audio_without_byte_offsets_for_compressed_audio(tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"\xff\xfb")
+    segment = slice_audio(_full_audio(path, 10.0), 1.0, 2.0)
+    assert segment.sample_offset == 8000
+    assert segment.sample_count == 8000
+    assert segment.byte_offset is None
+    assert segment.byte_length is None
@@ -0,0 +1,127 @@
+import argparse
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from videoxt.batch import assign_output_dirs, collect_videos
+from videoxt.cli import _run_batch
+from videoxt.models import BatchResult, ExtractionResult, VideoMetadata
+
+
+@pytest.fixture
+def library(tmp_path):
+    """videos/{b.mp4, a.MKV, notes.txt, sub/c.mov, sub/deep/d.ts}"""
+    root = tmp_path / "videos"
+    for name in ["b.mp4", "a.MKV", "notes.txt", "sub/c.mov", "sub/deep/d.ts"]:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    return root
+
+
+def _names(videos):
+    return [video.name for video in videos]
+
+
+def test_directory_expansion_is_sorted_and_filtered(library):
+    assert _names(collect_videos([library])) == ["a.MKV", "b.mp4"]
+
+
+def test_recursive_directory_expansion(library):
+    assert _names(collect_videos([library], recursive=True)) == [
+        "a.MKV",
+        "b.mp4",
+        "c.mov",
+        "d.ts",
+    ]
+
+
+def test_glob_expansion(library):
+    assert _names(collect_videos([str(library / "*.mp4")])) == ["b.mp4"]
+    pattern = str(library / "**" / "*.mov")
+    assert _names(collect_videos([pattern])) == ["c.mov"]
+
+
+def test_inputs_keep_order_and_are_deduplicated(library):
+    videos = collect_videos([library / "b.mp4", library, str(library / "*.mp4")])
+    assert _names(videos) == ["b.mp4", "a.MKV"]
+
+
+def test_missing_input_is_reported(library):
+    with pytest.raises(FileNotFoundError):
+        collect_videos([library / "missing.mp4"])
+    with pytest.raises(FileNotFoundError):
+        collect_videos([str(library / "*.avi")])
+
+
+def test_text_manifest(library, tmp_path):
+    manifest = tmp_path / "list.txt"
+    manifest.write_text(
+        "# 注释\n\nvideos/sub/c.mov\n" f"{library / 'b.mp4'}\n  videos  \n",
+        encoding="utf-8",
+    )
+    assert _names(collect_videos([], manifest=manifest)) == [
+        "c.mov",
+        "b.mp4",
+        "a.MKV",
+    ]
+
+
+def test_json_manifest(library, tmp_path):
+    manifest = tmp_path / "list.json"
+    manifest.write_text(json.dumps(["videos/sub/deep/d.ts"]), encoding="utf-8")
+    videos = collect_videos([library / "b.mp4"], manifest=manifest)
+    assert _names(videos) == ["b.mp4", "d.ts"]
+
+
+def test_output_name_collisions(tmp_path):
+    videos = [
+        Path("x/clip.mp4"),
+        Path("y/clip.mkv"),
+        Path("z/CLIP.mov"),
+        Path("x/clip_2.mp4"),
+        Path("x/other.mp4"),
+    ]
+    output_dirs = assign_output_dirs(videos, tmp_path)
+    assert [output_dirs[v].name for v in videos] == [
+        "clip",
+        "clip_2",
+        "CLIP_3",
+        "clip_2_2",
+        "other",
+    ]
+    assert len({d.name.lower() for d in output_dirs.values()}) == len(videos)
+    assert assign_output_dirs(videos, tmp_path) == output_dirs
+
+
+class StubExtractor:
+    def __init__(self, batch):
+        self.batch = batch
+
+    def extract_batch(self, *args, **kwargs):
+        return self.batch
+
+
+def _result(error_log=None):
+    metadata = VideoMetadata(10.0, 64, 48, 10.0, "none", "h264", 100)
+    return ExtractionResult([], [], metadata, timedelta(seconds=1), error_log)
+
+
+def _run(batch):
+    args = argparse.Namespace(
+        video_path=["videos"], output_dir=None, manifest=None, recursive=False
+    )
+    return _run_batch(StubExtractor(batch), args)
+
+
+def test_batch_exit_code(capsys):
+    ok = {Path("a.mp4"): _result()}
+    assert _run(BatchResult(ok, {}, timedelta(seconds=1))) == 0
+
+    failed_segment = {Path("a.mp4"): _result({"0.0_30.0": "boom"})}
+    assert _run(BatchResult(failed_segment, {}, timedelta(seconds=1))) == 1
+
+    errors = {Path("b.mp4"): "无法读取"}
+    assert _run(BatchResult(ok, {}, timedelta(seconds=1), errors)) == 1
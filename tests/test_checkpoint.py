@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from videoxt.checkpoint import CHECKPOINT_FILE, SegmentCheckpoint
+from videoxt.models import AudioSegment, ExtractionTask, KeyframeInfo, TaskResult
+
+
+@pytest.fixture
+def video(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 64)
+    return video
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return tmp_path / "output"
+
+
+def _task(video, output_dir, start, end, **kwargs):
+    return ExtractionTask(
+        video_path=video,
+        start_time=start,
+        end_time=end,
+        output_dir=output_dir,
+        task_id=f"{start}_{end}",
+        interval_seconds=1.0,
+        **kwargs,
+    )
+
+
+def _complete(task, frames=2):
+    """写出片段的帧文件和音频，返回对应的处理结果。"""
+    segment_dir = task.output_dir / f"segment_{task.task_id}"
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    keyframes = []
+    for i in range(frames):
+        path = segment_dir / f"frame_{i}.png"
+        path.write_bytes(b"x" * (10 + i))
+        keyframes.append(KeyframeInfo(task.start_time + i, "I", path, 1.0))
+    audio_path = segment_dir / "audio.mp3"
+    audio_path.write_bytes(b"a")
+    audio = AudioSegment(task.start_time, task.end_time, audio_path, 22050, 1)
+    frame_bytes = sum(k.file_path.stat().st_size for k in keyframes)
+    return TaskResult(task.task_id, keyframes, audio, frame_bytes=frame_bytes)
+
+
+def test_record_and_restore_round_trip(video, output_dir):
+    task = _task(video, output_dir, 0.0, 30.0)
+    result = _complete(task)
+    SegmentCheckpoint(output_dir).record(task, result)
+
+    restored = SegmentCheckpoint(output_dir).restore(task)
+    assert restored is not None
+    assert restored.resumed
+    assert restored.keyframes == result.keyframes
+    assert restored.audio_segment == result.audio_segment
+    assert restored.frame_bytes == result.frame_bytes
+
+
+def test_restore_rejects_changed_parameters(video, output_dir):
+    task = _task(video, output_dir, 0.0, 30.0)
+    SegmentCheckpoint(output_dir).record(task, _complete(task))
+
+    changed = _task(video, output_dir, 0.0, 30.0, quality=80)
+    assert SegmentCheckpoint(output_dir).restore(changed) is None
+
+    video.write_bytes(b"\0" * 128)
+    assert SegmentCheckpoint(output_dir).restore(task) is None
+
+
+def test_restore_rejects_missing_or_modified_files(video, output_dir):
+    task = _task(video, output_dir, 0.0, 30.0)
+    result = _complete(task)
+    SegmentCheckpoint(output_dir).record(task, result)
+
+    result.keyframes[0].file_path.write_bytes(b"truncated")
+    assert SegmentCheckpoint(output_dir).restore(task) is None
+
+    result.keyframes[0].file_path.unlink()
+    assert SegmentCheckpoint(output_dir).restore(task) is None
+
+
+def test_failed_and_started_segments_are_not_restored(video, output_dir):
+    failed = _task(video, output_dir, 0.0, 30.0)
+    started = _task(video, output_dir, 30.0, 60.0)
+    checkpoint = SegmentCheckpoint(output_dir)
+    checkpoint.record(failed, TaskResult(failed.task_id, [], None, error="boom"))
+    checkpoint.start(started)
+
+    stored = json.loads((output_dir / CHECKPOINT_FILE).read_text(encoding="utf-8"))
+    assert stored["segments"][failed.task_id]["status"] == "failed"
+    assert stored["segments"][started.task_id]["status"] == "started"
+
+    reloaded = SegmentCheckpoint(output_dir)
+    assert reloaded.restore(failed) is None
+    assert reloaded.restore(started) is None
+
+
+def test_corrupt_checkpoint_is_ignored(video, output_dir):
+    output_dir.mkdir()
+    (output_dir / CHECKPOINT_FILE).write_text("{not json", encoding="utf-8")
+    task = _task(video, output_dir, 0.0, 30.0)
+    assert SegmentCheckpoint(output_dir).restore(task) is None
+
+
+def test_partition_only_clears_recorded_dirs(video, output_dir):
+    done = _task(video, output_dir, 0.0, 30.0)
+    started = _task(video, output_dir, 30.0, 60.0)
+    failed = _task(video, output_dir, 60.0, 90.0)
+    unknown = _task(video, output_dir, 90.0, 120.0)
+    tasks = [done, started, failed, unknown]
+
+    checkpoint = SegmentCheckpoint(output_dir)
+    checkpoint.record(done, _complete(done))
+    checkpoint.start(started)
+    _complete(started)
+    checkpoint.record(failed, TaskResult(failed.task_id, [], None, error="boom"))
+    _complete(failed)
+    _complete(unknown)
+
+    checkpoint = SegmentCheckpoint(output_dir)
+    assert checkpoint.unknown_dirs(tasks) == [output_dir / f"segment_{unknown.task_id}"]
+
+    restored, pending = checkpoint.partition(tasks)
+    assert [r.task_id for r in restored] == [done.task_id]
+    assert pending == [started, failed, unknown]
+    assert (output_dir / f"segment_{done.task_id}").is_dir()
+    assert not (output_dir / f"segment_{started.task_id}").exists()
+    assert not (output_dir / f"segment_{failed.task_id}").exists()
+    # 清单中没有记录的目录原样保留
+    assert (output_dir / f"segment_{unknown.task_id}" / "frame_0.png").is_file()
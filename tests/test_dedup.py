@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+import pytest
+
+from SeqPurge.core.image_utils import ImageComparator
+from videoxt.dedup import FrameDeduplicator
+
+
+@pytest.fixture(scope="module")
+def frames():
+    """一组 RGB 帧：几个平滑的场景，每个场景带若干加噪或平移的近似重复帧"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:240, 0:320].astype(np.float32)
+    frames = []
+    for scene in range(4):
+        base = np.stack(
+            [
+                128
+                + 100
+                * np.sin(x / (12 + 9 * scene) + c + scene)
+                * np.cos(y / (17 + 5 * scene) - c)
+                for c in range(3)
+            ],
+            axis=-1,
+        )
+        for variant in range(4):
+            frame = np.roll(base, 2 * variant, axis=1)
+            frame = frame + rng.normal(0, 4 * variant, base.shape)
+            frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames
+
+
+@pytest.fixture(scope="module")
+def frame_files(frames, tmp_path_factory):
+    """与 frames 相同的 PNG 文件（无损），供 ImageComparator 读取"""
+    directory = tmp_path_factory.mktemp("frames")
+    paths = []
+    for i, frame in enumerate(frames):
+        path = str(directory / f"frame_{i + 1}.png")
+        cv2.imwrite(path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        paths.append(path)
+    return paths
+
+
+def _comparator_keeps(comparator, paths):
+    """按 SeqPurge 的方式逐帧与上一保留帧比较"""
+    keeps = []
+    kept = None
+    for path in paths:
+        keep = kept is None or not comparator.is_similar(path, kept)
+        if keep:
+            kept = path
+        keeps.append(keep)
+    return keeps
+
+
+@pytest.mark.parametrize("algorithm", ["hash", "pixel", "hybrid"])
+@pytest.mark.parametrize("threshold", [5.0, 20.0, 50.0])
+def test_keep_matches_image_comparator(frames, frame_files, algorithm, threshold):
+    dedup = FrameDeduplicator(algorithm, threshold)
+    keeps = [dedup.keep(i * 0.5, "F", frame) for i, frame in enumerate(frames)]
+
+    comparator = ImageComparator(algorithm, threshold)
+    assert keeps == _comparator_keeps(comparator, frame_files)
+    assert [d.pts for d in dedup.dropped] == [
+        i * 0.5 for i, keep in enumerate(keeps) if not keep
+    ]
+
+
+def test_keep_records_the_reference_frame(frames):
+    dedup = FrameDeduplicator("pixel", 50.0)
+    for i, frame in enumerate(frames[:4]):
+        dedup.keep(float(i), "I", frame)
+    assert dedup.dropped
+    assert all(d.kept_pts == 0.0 for d in dedup.dropped)
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        FrameDeduplicator("dhash")
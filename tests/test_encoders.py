@@ -0,0 +1,65 @@
+import pytest
+
+from videoxt import encoders
+from videoxt.encoders import (
+    FrameEncoder,
+    JpegEncoder,
+    PngEncoder,
+    available_formats,
+    get_encoder,
+    register_encoder,
+)
+
+
+@pytest.mark.parametrize(
+    "quality, qscale", [(100, "2"), (95, "3"), (50, "17"), (1, "31"), (0, "31")]
+)
+def test_jpeg_quality_maps_to_qscale(quality, qscale):
+    kwargs = get_encoder("jpg", quality=quality).output_kwargs()
+    assert kwargs == {"pix_fmt": "yuvj420p", "qscale:v": qscale}
+
+
+def test_jpeg_qscale_decreases_with_quality():
+    qscales = [
+        int(JpegEncoder(quality=q).output_kwargs()["qscale:v"]) for q in range(1, 101)
+    ]
+    assert qscales == sorted(qscales, reverse=True)
+    assert JpegEncoder(quality=80).quality_score == 0.8
+
+
+@pytest.mark.parametrize("level, expected", [(0, "0"), (6, "6"), (9, "9"), (12, "9")])
+def test_png_compression_level(level, expected):
+    encoder = get_encoder("png", compression_level=level)
+    assert isinstance(encoder, PngEncoder)
+    assert encoder.output_kwargs()["compression_level"] == expected
+    assert encoder.quality_score == 1.0
+
+
+def test_webp_quality_is_clamped():
+    assert get_encoder("webp", quality=150).output_kwargs()["quality"] == "100"
+    assert get_encoder("WEBP", quality=40).output_kwargs()["quality"] == "40"
+
+
+def test_format_names_are_case_insensitive_aliases():
+    assert isinstance(get_encoder("JPEG"), JpegEncoder)
+    assert get_encoder("npy").raw
+    assert get_encoder("npy").output_kwargs() == {}
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="tiff"):
+        get_encoder("tiff")
+
+
+def test_register_encoder(monkeypatch):
+    monkeypatch.setattr(encoders, "_ENCODERS", dict(encoders._ENCODERS))
+
+    class TiffEncoder(FrameEncoder):
+        name = "tiff"
+        extension = "tiff"
+
+    register_encoder("TIFF", TiffEncoder)
+    assert "tiff" in available_formats()
+    encoder = get_encoder("tiff", quality=70)
+    assert isinstance(encoder, TiffEncoder)
+    assert encoder.quality == 70
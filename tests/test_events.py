@@ -0,0 +1,129 @@
+import json
+
+import videoxt.events
+from SeqPurge.utils import events as seqpurge_events
+from videoxt.events import EventBus, FileSink, LogEvent, ProgressEvent, pump_tk
+
+
+def test_videoxt_reuses_the_seqpurge_event_bus():
+    assert videoxt.events.EventBus is seqpurge_events.EventBus
+    assert videoxt.events.FileSink is seqpurge_events.FileSink
+
+
+def test_progress_keeps_latest_per_source():
+    bus = EventBus()
+    bus.progress("a.mp4", 1, 10)
+    bus.progress("b.mp4", 5, 10)
+    bus.progress("a.mp4", 3, 10, "片段 3/10")
+    drained = bus.drain()
+    assert [(e.source, e.done, e.message) for e in drained] == [
+        ("a.mp4", 3, "片段 3/10"),
+        ("b.mp4", 5, ""),
+    ]
+    assert bus.drain() == []
+
+
+def test_logs_keep_order_before_progress():
+    bus = EventBus()
+    bus.log("first")
+    bus.progress("a.mp4", 1, 2)
+    bus.log("second", level="warning")
+    drained = bus.drain()
+    assert [type(e).__name__ for e in drained] == [
+        "LogEvent",
+        "LogEvent",
+        "ProgressEvent",
+    ]
+    assert [e.message for e in drained[:2]] == ["first", "second"]
+    assert drained[1].level == "warning"
+
+
+def test_dropped_logs_are_reported():
+    bus = EventBus(max_logs=3)
+    for i in range(5):
+        bus.log(f"line {i}")
+    drained = bus.drain()
+    assert drained[0].level == "warning"
+    assert "2" in drained[0].message
+    assert [e.message for e in drained[1:]] == ["line 2", "line 3", "line 4"]
+    # 计数在投递后清零
+    bus.log("again")
+    assert [e.message for e in bus.drain()] == ["again"]
+
+
+def test_flush_delivers_one_batch_to_every_sink():
+    bus = EventBus()
+    first, second = [], []
+    bus.subscribe(first.append)
+    bus.subscribe(second.append)
+    bus.flush()
+    assert first == []
+    bus.log("hello")
+    bus.progress("a.mp4", 1, 4)
+    bus.flush()
+    assert len(first) == 1 and first == second
+    assert [type(e) for e in first[0]] == [LogEvent, ProgressEvent]
+
+
+def test_progress_percent():
+    assert ProgressEvent("a", 5, 10).percent == 50.0
+    assert ProgressEvent("a", 12, 10).percent == 100.0
+    assert ProgressEvent("a", 1, 0).percent == 0.0
+
+
+class FakeTk:
+    def __init__(self):
+        self.callbacks = {}
+        self._next = 0
+
+    def after(self, ms, callback):
+        self._next += 1
+        self.callbacks[self._next] = callback
+        return self._next
+
+    def after_cancel(self, handle):
+        del self.callbacks[handle]
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def test_pump_tk_flushes_on_the_tk_loop():
+    bus = EventBus(max_rate=20)
+    batches = []
+    bus.subscribe(batches.append)
+    root = FakeTk()
+    stop = pump_tk(root, bus)
+
+    bus.log("one")
+    root.run_pending()
+    assert len(batches) == 1
+    assert len(root.callbacks) == 1
+
+    bus.log("two")
+    stop()
+    assert len(batches) == 2
+    assert root.callbacks == {}
+
+
+def test_background_thread_flushes_on_close():
+    batches = []
+    with EventBus(max_rate=1000) as bus:
+        bus.subscribe(batches.append)
+        bus.log("done")
+    delivered = [e for batch in batches for e in batch]
+    assert [e.message for e in delivered] == ["done"]
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = FileSink(path)
+    sink([LogEvent("hello"), ProgressEvent("a.mp4", 1, 2)])
+    sink.close()
+    records = [
+        json.loads(line) for line in path.read_text(encoding="utf-8").split("\n")[:-1]
+    ]
+    assert [r["type"] for r in records] == ["log", "progress"]
+    assert records[1]["source"] == "a.mp4"
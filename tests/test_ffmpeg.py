@@ -0,0 +1,170 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from videoxt.ffmpeg import (
+    FFmpegError,
+    FFmpegWrapper,
+    _parse_output_audio_info,
+    _parse_scene_scores,
+    _parse_showinfo,
+)
+from videoxt.models import VideoMetadata
+
+# 单次 ffmpeg 同时输出帧和音频时的 info 级别日志（节选）
+SINGLE_PASS_LOG = """\
+Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'video.mp4':
+  Stream #0:0(und): Video: h264 (High), yuv420p, 1280x720, 25 fps
+  Stream #0:1(und): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, stereo, fltp
+Output #0, image2, to 'segment/frame_%d.png':
+  Stream #0:0(und): Video: png, rgb24, 1280x720, q=2-31, 200 kb/s, 2 fps
+Output #1, mp3, to 'segment/audio.mp3':
+  Stream #1:0(und): Audio: mp3, 22050 Hz, mono, fltp
+"""
+
+
+def test_parse_output_audio_info_reads_the_requested_output():
+    assert _parse_output_audio_info(SINGLE_PASS_LOG, 1) == (22050, 1)
+
+
+def test_parse_output_audio_info_ignores_input_streams():
+    # Output #0 只有视频流，不能误取输入或其他输出的音频参数
+    log = SINGLE_PASS_LOG.replace("Output #1", "Output #2")
+    with pytest.raises(FFmpegError):
+        _parse_output_audio_info(log, 1)
+
+
+@pytest.mark.parametrize(
+    "layout, channels",
+    [("stereo", 2), ("5.1(side)", 6), ("7.1", 8), ("3 channels", 3)],
+)
+def test_parse_output_audio_info_channel_layouts(layout, channels):
+    log = SINGLE_PASS_LOG.replace("22050 Hz, mono", f"48000 Hz, {layout}")
+    assert _parse_output_audio_info(log, 1) == (48000, channels)
+
+
+def test_parse_output_audio_info_unknown_layout():
+    log = SINGLE_PASS_LOG.replace("mono", "hexadecagonal")
+    with pytest.raises(FFmpegError):
+        _parse_output_audio_info(log, 1)
+
+
+def test_parse_output_audio_info_interleaved_log_line():
+    # 多线程日志可能插在 Stream 描述中间，音频参数仍在该输出的信息段内
+    log = SINGLE_PASS_LOG.replace(
+        "  Stream #1:0(und): Audio:",
+        "  Stream #1:0(und): [out#1/mp3 @ 0x5581] Starting thread\nAudio:",
+    )
+    assert _parse_output_audio_info(log, 1) == (22050, 1)
+
+
+def _showinfo_line(n, pts_time, frame_type):
+    return (
+        f"[Parsed_showinfo_2 @ 0x55d5c3a0] n:{n:4d} pts:{int(pts_time * 1000):7d} "
+        f"pts_time:{pts_time:<8g} duration:40 pos:48 fmt:yuv420p sar:1/1 "
+        f"s:320x240 i:P iskey:{int(frame_type == 'I')} type:{frame_type} "
+        f"checksum:2D8E1FB5 plane_checksum:[2D8E1FB5]"
+    )
+
+
+def test_parse_showinfo_orders_frames_by_output_number():
+    log = "\n".join(
+        [
+            "frame=    0 fps=0.0 q=0.0 size=N/A time=00:00:00.00",
+            _showinfo_line(1, 2.0, "I"),
+            _showinfo_line(0, 0.0, "I"),
+            _showinfo_line(2, 4.5, "P"),
+        ]
+    )
+    assert _parse_showinfo(log) == [(0.0, "I"), (2.0, "I"), (4.5, "P")]
+
+
+def test_parse_showinfo_exponent_and_negative_timestamps():
+    log = "\n".join([_showinfo_line(0, -0.04, "I"), _showinfo_line(1, 1e-05, "B")])
+    assert _parse_showinfo(log) == [(-0.04, "I"), (1e-05, "B")]
+
+
+def test_parse_showinfo_without_frames():
+    assert _parse_showinfo("Output #0, image2, to 'frame_%d.png':\n") == []
+
+
+def _scene_lines(n, pts_time, score=None):
+    """scene 模式下一帧的日志：metadata 的时间戳和分数行（可缺失）及 showinfo 行"""
+    lines = []
+    if score is not None:
+        lines += [
+            f"[Parsed_metadata_1 @ 0x55d5c2c0] frame:{n:<4d} "
+            f"pts:{int(pts_time * 1000):<7d} pts_time:{pts_time:g}",
+            f"[Parsed_metadata_1 @ 0x55d5c2c0] lavfi.scene_score={score:.6f}",
+        ]
+    return lines + [_showinfo_line(n, pts_time, "P")]
+
+
+# 第二帧（由最大间隔补出）没有场景分数
+SCENE_LOG = "\n".join(
+    _scene_lines(0, 0.0, 0.0)
+    + _scene_lines(1, 10.0)
+    + _scene_lines(2, 12.5, 0.62)
+    + ["frame=    3 fps=0.0 q=-0.0 Lsize=N/A time=00:00:12.50"]
+)
+
+
+def test_parse_scene_scores_pairs_by_timestamp():
+    assert _parse_scene_scores(SCENE_LOG) == {0.0: 0.0, 12.5: 0.62}
+    assert _parse_scene_scores("") == {}
+
+
+def _wrapper():
+    metadata = VideoMetadata(
+        duration=30.0,
+        width=4,
+        height=2,
+        fps=25.0,
+        audio_codec="none",
+        video_codec="h264",
+        total_frames=750,
+    )
+    return FFmpegWrapper(Path("video.mp4"), metadata=metadata)
+
+
+def test_collect_frames_pairs_scene_scores_with_frames(tmp_path):
+    for n in range(1, 4):
+        (tmp_path / f"frame_{n}.png").write_bytes(b"")
+    frames = _wrapper()._collect_frames(tmp_path, 30.0, 1.0, "scene", SCENE_LOG)
+    assert [(f.pts, f.quality) for f in frames] == [
+        (30.0, 0.0),
+        (40.0, 1.0),  # 没有分数的帧使用编码器的质量分数
+        (42.5, 0.62),
+    ]
+
+
+class FakeProcess:
+    def __init__(self, stdout: bytes, stderr: bytes):
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+        self.returncode = None
+
+    def wait(self):
+        self.returncode = 0
+        return 0
+
+    def poll(self):
+        return self.returncode
+
+
+def test_stream_frames_does_not_reuse_previous_scene_score(monkeypatch):
+    wrapper = _wrapper()
+    pixels = np.zeros((3, 2, 4, 3), dtype=np.uint8).tobytes()
+    monkeypatch.setattr(
+        wrapper,
+        "_spawn",
+        lambda stream, **kwargs: FakeProcess(pixels, SCENE_LOG.encode() + b"\n"),
+    )
+    frames = wrapper._stream_frames(30.0, 60.0, 1.0, frame_mode="scene")
+    assert [(pts, score) for pts, _, score, _ in frames] == [
+        (30.0, 0.0),
+        (40.0, None),
+        (42.5, 0.62),
+    ]
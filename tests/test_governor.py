@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from videoxt import governor as governor_module
+from videoxt.governor import ConcurrencyGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(governor_module.time, "monotonic", clock)
+    monkeypatch.setattr(governor_module, "_load_average", lambda: None)
+    return clock
+
+
+def _finish_window(governor, clock, seconds, units=10.0):
+    """让一轮（当前并发数个）片段在 seconds 秒内完成。"""
+    clock.now += seconds
+    for _ in range(governor.limit):
+        governor.record(units)
+
+
+def test_fixed_concurrency_splits_cores():
+    governor = ConcurrencyGovernor(4, cpu_count=8, adaptive=False)
+    assert governor.limit == 4
+    assert governor.threads_per_process == 2
+
+
+def test_adaptive_starts_at_two_cores_per_process():
+    assert ConcurrencyGovernor(16, cpu_count=8).limit == 4
+    assert ConcurrencyGovernor(2, cpu_count=8).limit == 2
+    assert ConcurrencyGovernor(4, cpu_count=1).limit == 1
+
+
+def test_fixed_threads_per_process():
+    governor = ConcurrencyGovernor(4, cpu_count=8, threads_per_process=3)
+    assert governor.threads_per_process == 3
+
+
+def test_slot_blocks_at_limit():
+    governor = ConcurrencyGovernor(1, cpu_count=4, adaptive=False)
+    entered = threading.Event()
+
+    def worker():
+        with governor.slot():
+            entered.set()
+
+    with governor.slot() as threads:
+        assert threads == 4
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+        assert not entered.is_set()
+    thread.join(timeout=1)
+    assert entered.is_set()
+
+
+def test_non_adaptive_record_keeps_limit(clock):
+    governor = ConcurrencyGovernor(4, cpu_count=8, adaptive=False)
+    _finish_window(governor, clock, 1.0)
+    assert governor.limit == 4
+
+
+def test_hill_climbing_grows_while_throughput_rises(clock):
+    governor = ConcurrencyGovernor(8, cpu_count=4)
+    assert governor.limit == 2
+    _finish_window(governor, clock, 1.0)
+    assert governor.limit == 3
+    assert governor.threads_per_process == 1
+
+
+def test_hill_climbing_reverses_when_throughput_drops(clock):
+    governor = ConcurrencyGovernor(8, cpu_count=4)
+    _finish_window(governor, clock, 1.0)  # 20/s
+    assert governor.limit == 3
+    _finish_window(governor, clock, 3.0)  # 10/s，下降超过容差
+    assert governor.limit == 2
+
+
+def test_overload_reduces_concurrency(clock, monkeypatch):
+    governor = ConcurrencyGovernor(8, cpu_count=4)
+    monkeypatch.setattr(governor_module, "_load_average", lambda: 4 * 2.0)
+    _finish_window(governor, clock, 1.0)
+    assert governor.limit == 1
+
+
+def test_limit_stays_within_bounds(clock):
+    governor = ConcurrencyGovernor(2, cpu_count=4)
+    for _ in range(10):
+        _finish_window(governor, clock, 1.0)
+        assert 1 <= governor.limit <= 2
@@ -0,0 +1,139 @@
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from videoxt.controllers import ExtractionConfig, VideoExtractor
+from videoxt.ffmpeg import FFmpegWrapper
+from videoxt.models import VideoMetadata
+
+WIDTH, HEIGHT = 64, 48
+
+
+class FakeProcess:
+    """代替 ffmpeg 进程：标准输出是预先准备好的原始像素，标准错误为给定日志"""
+
+    def __init__(self, stdout: bytes, stderr: bytes = b""):
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+        self.returncode = None
+
+    def wait(self):
+        self.returncode = 0
+        return 0
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+
+def _metadata():
+    return VideoMetadata(
+        duration=2.0,
+        width=WIDTH,
+        height=HEIGHT,
+        fps=10.0,
+        audio_codec="none",
+        video_codec="ffv1",
+        total_frames=20,
+    )
+
+
+def _fake_wrapper(monkeypatch, frames, stderr=b""):
+    """返回一个把给定帧写入管道的 FFmpegWrapper，以及记录命令行参数的列表"""
+    wrapper = FFmpegWrapper(Path("video.mkv"), metadata=_metadata())
+    data = (
+        frames if isinstance(frames, bytes) else b"".join(f.tobytes() for f in frames)
+    )
+    commands = []
+
+    def spawn(stream, **kwargs):
+        commands.append(stream.get_args())
+        return FakeProcess(data, stderr)
+
+    monkeypatch.setattr(wrapper, "_spawn", spawn)
+    return wrapper, commands
+
+
+@pytest.mark.parametrize("gray, channels", [(False, 3), (True, 1)])
+def test_iter_frames_reuses_one_buffer(monkeypatch, gray, channels):
+    frames = [
+        np.full((HEIGHT, WIDTH, channels), i * 40, dtype=np.uint8) for i in range(4)
+    ]
+    wrapper, commands = _fake_wrapper(monkeypatch, frames)
+
+    seen = []
+    buffers = set()
+    for pts, frame in wrapper.iter_frames(1.0, 3.0, interval_seconds=0.5, gray=gray):
+        assert frame.shape == (HEIGHT, WIDTH, channels)
+        assert frame.dtype == np.uint8
+        buffers.add(id(frame))
+        seen.append((pts, frame.copy()))
+
+    assert [pts for pts, _ in seen] == [1.0, 1.5, 2.0, 2.5]
+    for (_, copied), expected in zip(seen, frames):
+        np.testing.assert_array_equal(copied, expected)
+    # 每次产出的都是同一块缓冲区，内容被下一帧覆盖
+    assert len(buffers) == 1
+    args = commands[0]
+    assert args[args.index("-pix_fmt") + 1] == ("gray" if gray else "rgb24")
+
+
+def test_iter_frames_drops_incomplete_tail(monkeypatch):
+    data = b"\0" * (HEIGHT * WIDTH * 3 * 2 + 10)
+    wrapper, _ = _fake_wrapper(monkeypatch, data)
+    assert len(list(wrapper.iter_frames(0.0, 1.0))) == 2
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        pytest.skip("需要 ffmpeg")
+    path = tmp_path_factory.mktemp("clip") / "clip.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={WIDTH}x{HEIGHT}:rate=10:duration=2",
+            "-c:v",
+            "ffv1",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+@pytest.mark.parametrize("gray, channels", [(False, 3), (True, 1)])
+def test_iter_frames_on_lavfi_clip(clip, gray, channels):
+    extractor = VideoExtractor(ExtractionConfig(interval_seconds=0.5))
+    timestamps = []
+    copies = []
+    buffers = set()
+    for pts, frame in extractor.iter_frames(clip, gray=gray):
+        assert frame.shape == (HEIGHT, WIDTH, channels)
+        assert frame.dtype == np.uint8
+        timestamps.append(pts)
+        copies.append(frame.copy())
+        buffers.add(id(frame))
+
+    assert len(timestamps) >= 4
+    assert timestamps == [i * 0.5 for i in range(len(timestamps))]
+    assert len(buffers) == 1
+    # testsrc2 的画面随时间变化，复制出的各帧内容不同
+    assert not np.array_equal(copies[0], copies[1])
+
+
+def test_iter_frames_on_lavfi_clip_with_range(clip):
+    extractor = VideoExtractor(ExtractionConfig(interval_seconds=0.5))
+    timestamps = [pts for pts, _ in extractor.iter_frames(clip, 1.0, 2.0)]
+    assert timestamps[:2] == [1.0, 1.5]
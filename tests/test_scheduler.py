@@ -0,0 +1,224 @@
+import subprocess
+import threading
+
+import pytest
+
+from videoxt import scheduler
+from videoxt.checkpoint import SegmentCheckpoint
+from videoxt.ffmpeg import FFmpegWrapper, MetadataCache, _parse_keyframe_scan
+from videoxt.models import ExtractionTask, TaskResult
+from videoxt.scheduler import TaskScheduler, _format_time, _segment_boundaries
+
+
+def _assert_contiguous(boundaries, duration):
+    assert boundaries[0][0] == 0.0
+    assert boundaries[-1][1] == duration
+    for (_, end), (start, _) in zip(boundaries, boundaries[1:]):
+        assert end == start
+
+
+def test_fixed_boundaries_without_keyframes():
+    boundaries = _segment_boundaries(70.0, 30.0)
+    assert boundaries == [(0.0, 30.0), (30.0, 60.0), (60.0, 70.0)]
+
+
+def test_boundaries_snap_to_nearest_keyframe():
+    keyframes = [0.0, 8.0, 12.0, 29.0, 33.0, 58.0, 61.0]
+    boundaries = _segment_boundaries(70.0, 30.0, keyframes)
+    assert boundaries == [(0.0, 29.0), (29.0, 58.0), (58.0, 70.0)]
+    _assert_contiguous(boundaries, 70.0)
+
+
+def test_boundaries_end_at_duration_when_no_later_keyframe():
+    boundaries = _segment_boundaries(100.0, 30.0, [0.0, 31.0])
+    assert boundaries == [(0.0, 31.0), (31.0, 100.0)]
+
+
+def test_boundaries_ignore_keyframes_outside_video():
+    # 视频内部没有关键帧时退回固定时长切分
+    boundaries = _segment_boundaries(50.0, 30.0, [-1.0, 0.0, 50.0, 80.0])
+    assert boundaries == [(0.0, 30.0), (30.0, 50.0)]
+
+
+def test_boundaries_are_strictly_increasing_with_dense_keyframes():
+    keyframes = [i * 0.04 for i in range(1, 250)]
+    boundaries = _segment_boundaries(10.0, 0.01, keyframes)
+    assert all(start < end for start, end in boundaries)
+    _assert_contiguous(boundaries, 10.0)
+
+
+@pytest.mark.parametrize(
+    "seconds, text",
+    [(0.0, "0.0"), (90.0, "90.0"), (12.5, "12.5"), (33.3666667, "33.366667")],
+)
+def test_format_time(seconds, text):
+    assert _format_time(seconds) == text
+
+
+def test_task_ids_of_close_boundaries_are_distinct():
+    boundaries = _segment_boundaries(1.0, 0.02, [0.02, 0.04, 0.06])
+    ids = {f"{_format_time(start)}_{_format_time(end)}" for start, end in boundaries}
+    assert len(ids) == len(boundaries)
+
+
+def test_keyframe_index_is_kept_in_metadata_cache(tmp_path, monkeypatch):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 16)
+    cache_file = tmp_path / "cache.json"
+    cache = MetadataCache()
+    cache.attach(cache_file)
+
+    scans = []
+
+    def scan(self):
+        scans.append(self.video_path)
+        return [0.0, 2.0, 4.0]
+
+    monkeypatch.setattr(FFmpegWrapper, "_scan_keyframes", scan)
+    assert FFmpegWrapper(video, cache=cache).get_keyframe_times() == [0.0, 2.0, 4.0]
+    assert FFmpegWrapper(video, cache=cache).get_keyframe_times() == [0.0, 2.0, 4.0]
+    assert len(scans) == 1
+    # 索引不写到视频旁边
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache.json", "video.mp4"]
+
+    # 持久化后新进程直接复用；视频变化后重新扫描
+    reloaded = MetadataCache()
+    reloaded.attach(cache_file)
+    assert reloaded.get_keyframes(video) == [0.0, 2.0, 4.0]
+    video.write_bytes(b"\0" * 32)
+    assert reloaded.get_keyframes(video) is None
+
+
+# ffprobe -show_entries packet=pts_time,flags:format=start_time -of csv 的输出，
+# 容器起始时间为 1.4 秒（常见于 MPEG-TS）
+TS_PROBE_OUTPUT = """\
+packet,1.400000,K__
+packet,1.440000,___
+packet,3.400000,K_D
+packet,N/A,K__
+packet,5.400000,K__
+format,1.400000
+"""
+
+
+def test_keyframe_scan_is_relative_to_container_start():
+    assert _parse_keyframe_scan(TS_PROBE_OUTPUT) == [0.0, 2.0, 4.0]
+
+
+def test_keyframe_scan_with_zero_or_unknown_start():
+    output = TS_PROBE_OUTPUT.replace("format,1.400000", "format,N/A")
+    assert _parse_keyframe_scan(output) == [1.4, 3.4, 5.4]
+    assert _parse_keyframe_scan("packet,0.000000,K__\nformat,0.000000\n") == [0.0]
+
+
+def test_scan_keyframes_snaps_boundaries_to_relative_times(tmp_path, monkeypatch):
+    video = tmp_path / "video.ts"
+    video.write_bytes(b"\0" * 16)
+
+    def run(cmd, **kwargs):
+        assert "packet=pts_time,flags:format=start_time" in cmd
+        return subprocess.CompletedProcess(cmd, 0, TS_PROBE_OUTPUT.encode(), b"")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    keyframes = FFmpegWrapper(video, cache=MetadataCache()).get_keyframe_times()
+    assert keyframes == [0.0, 2.0, 4.0]
+    assert _segment_boundaries(6.0, 2.1, keyframes) == [
+        (0.0, 2.0),
+        (2.0, 4.0),
+        (4.0, 6.0),
+    ]
+
+
+def _tasks(video, output_dir, count):
+    return [
+        ExtractionTask(
+            video_path=video,
+            start_time=i * 10.0,
+            end_time=(i + 1) * 10.0,
+            output_dir=output_dir,
+            task_id=f"{_format_time(i * 10.0)}_{_format_time((i + 1) * 10.0)}",
+            interval_seconds=1.0,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def reversed_completion(monkeypatch):
+    """让片段按时间倒序完成：每个片段等它后面的片段完成后才返回
+
+    返回 (设置参与处理的任务列表的函数, 完成顺序列表)。
+    """
+    done = {}
+    successor = {}
+    completed = []
+    lock = threading.Lock()
+
+    def process_segment(task):
+        later = successor.get(task.task_id)
+        if later is not None:
+            assert done[later].wait(timeout=5)
+        with lock:
+            completed.append(task.task_id)
+        done[task.task_id].set()
+        return TaskResult(task.task_id, [], None)
+
+    def run(tasks):
+        ids = [task.task_id for task in tasks]
+        done.update((task_id, threading.Event()) for task_id in ids)
+        successor.clear()
+        successor.update(zip(ids, ids[1:]))
+
+    monkeypatch.setattr(scheduler, "process_segment", process_segment)
+    return run, completed
+
+
+def test_ordered_results_follow_time_order(tmp_path, reversed_completion):
+    start, completed = reversed_completion
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 16)
+    tasks = _tasks(video, tmp_path / "out", 6)
+    checkpoint = SegmentCheckpoint(tmp_path / "out")
+    # 第 3 个片段上次已完成，从完成清单恢复
+    checkpoint.record(tasks[2], TaskResult(tasks[2].task_id, [], None))
+    start(tasks[:2] + tasks[3:])
+
+    runner = TaskScheduler(n_workers=len(tasks), adaptive=False)
+    results = list(runner._execute(tasks, checkpoint, ordered=True))
+
+    assert [r.task_id for r in results] == [task.task_id for task in tasks]
+    assert [r.resumed for r in results] == [False, False, True, False, False, False]
+    # 片段确实是倒序完成的
+    assert completed == [
+        task.task_id for task in reversed(tasks) if task is not tasks[2]
+    ]
+
+
+def test_unordered_results_are_each_yielded_once(tmp_path, reversed_completion):
+    start, completed = reversed_completion
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 16)
+    tasks = _tasks(video, tmp_path / "out", 4)
+    start(tasks)
+
+    runner = TaskScheduler(n_workers=len(tasks), adaptive=False)
+    results = list(runner._execute(tasks, SegmentCheckpoint(tmp_path / "out")))
+    # 按完成顺序产出，每个片段恰好一次
+    assert sorted(r.task_id for r in results) == sorted(t.task_id for t in tasks)
+    assert len(completed) == len(tasks)
+
+
+def test_iter_results_ordered(tmp_path, monkeypatch, reversed_completion):
+    start, _ = reversed_completion
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 16)
+    output_dir = tmp_path / "out"
+    tasks = _tasks(video, output_dir, 5)
+    start(tasks)
+    monkeypatch.setattr(
+        TaskScheduler, "_plan", lambda self, *args, **kwargs: (None, tasks, [])
+    )
+
+    runner = TaskScheduler(n_workers=len(tasks), adaptive=False)
+    results = list(runner.iter_results(video, output_dir, ordered=True))
+    assert [r.task_id for r in results] == [task.task_id for task in tasks]
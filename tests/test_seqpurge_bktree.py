@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from SeqPurge.core.bktree import BKTree
+from SeqPurge.core.hash_index import hamming_distance
+
+
+def _brute_force(items, value, radius):
+    return sorted(
+        (hamming_distance(value, h), i)
+        for i, h in enumerate(items)
+        if hamming_distance(value, h) <= radius
+    )
+
+
+def _near(rng, value, bits):
+    for bit in rng.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def test_empty_tree():
+    tree = BKTree()
+    assert len(tree) == 0
+    assert tree.find_within(0, 64) == []
+
+
+@pytest.mark.parametrize("radius", [0, 1, 3, 8, 20, 64])
+def test_find_within_matches_brute_force(radius):
+    rng = random.Random(radius)
+    centers = [rng.getrandbits(64) for _ in range(8)]
+    # 在少量中心附近生成哈希，保证各种半径下都有命中
+    items = [_near(rng, rng.choice(centers), rng.randrange(12)) for _ in range(400)]
+    tree = BKTree()
+    for i, value in enumerate(items):
+        tree.add(value, i)
+    assert len(tree) == len(items)
+
+    for _ in range(50):
+        query = _near(rng, rng.choice(centers), rng.randrange(10))
+        found = tree.find_within(query, radius)
+        assert [d for d, _ in found] == sorted(d for d, _ in found)
+        assert sorted(found) == _brute_force(items, query, radius)
+
+
+def test_duplicate_hashes_are_all_returned():
+    tree = BKTree()
+    for i in range(5):
+        tree.add(0xFFFF, i)
+    tree.add(0xFFFE, "near")
+    found = tree.find_within(0xFFFF, 0)
+    assert sorted(item for _, item in found) == [0, 1, 2, 3, 4]
+    assert (1, "near") in tree.find_within(0xFFFF, 1)
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+import pytest
+
+from SeqPurge.core.deduplicator import Deduplicator
+from SeqPurge.core.plan import DROP, load_plan
+
+
+@pytest.fixture
+def segments(tmp_path):
+    """input/segment_*：每个分段若干场景，每个场景由几帧近似重复的 PNG 组成"""
+    rng = np.random.default_rng(0)
+    input_dir = tmp_path / "input"
+    for s in range(4):
+        segment_dir = input_dir / f"segment_{s * 30.0}_{(s + 1) * 30.0}"
+        segment_dir.mkdir(parents=True)
+        n = 1
+        for _ in range(3):
+            base = rng.integers(0, 256, (6, 8), dtype=np.uint8)
+            base = cv2.resize(base, (128, 96), interpolation=cv2.INTER_LINEAR)
+            for _ in range(1 + rng.integers(0, 4)):
+                noise = rng.normal(0, 3, base.shape)
+                frame = np.clip(base + noise, 0, 255).astype(np.uint8)
+                cv2.imwrite(str(segment_dir / f"frame_{n}.png"), frame)
+                n += 1
+    return input_dir
+
+
+def _plan(input_dir, tmp_path, algorithm, workers, progress):
+    deduplicator = Deduplicator(
+        input_dir=str(input_dir),
+        output_dir=str(tmp_path / "output"),
+        mode=2,
+        threshold=10.0,
+        algorithm=algorithm,
+        progress_callback=lambda percent, status: progress.append(percent),
+        log_callback=lambda message: None,
+        workers=workers,
+    )
+    return deduplicator, deduplicator.plan(str(tmp_path / f"plan_{workers}.json"))
+
+
+@pytest.mark.parametrize("algorithm", ["hash", "pixel", "hybrid"])
+def test_parallel_plan_equals_sequential_plan(segments, tmp_path, algorithm):
+    progress = []
+    deduplicator, sequential = _plan(segments, tmp_path, algorithm, 1, progress)
+    assert deduplicator.workers == 1
+
+    progress = []
+    _, parallel = _plan(segments, tmp_path, algorithm, 2, progress)
+    expected = load_plan(sequential)["segments"]
+    assert any(DROP in segment["actions"] for segment in expected)
+    assert load_plan(parallel)["segments"] == expected
+    assert progress == sorted(progress)
+    assert progress[-1] == 100
+
+
+def test_workers_default_to_sequential():
+    deduplicator = Deduplicator("", "", 1, 5.0, "hash", None, None)
+    assert deduplicator.workers == 1
@@ -0,0 +1,132 @@
+import errno
+import os
+
+import pytest
+
+from SeqPurge.core import file_utils
+from SeqPurge.core.file_utils import (
+    get_segment_dirs,
+    get_sorted_frames,
+    materialize_files,
+    remove_files,
+)
+
+
+def _unsupported(*args):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+@pytest.fixture
+def pairs(tmp_path):
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+    result = []
+    for i in range(3):
+        src = src_dir / f"frame_{i}.png"
+        src.write_bytes(bytes([i]) * 8)
+        result.append((str(src), str(dst_dir / src.name)))
+    return result
+
+
+def _contents(paths):
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+@pytest.mark.parametrize("strategy", ["hardlink", "copy"])
+def test_materialize_keeps_sources(pairs, strategy):
+    assert materialize_files(pairs, strategy) == [strategy] * len(pairs)
+    sources, targets = zip(*pairs)
+    assert _contents(targets) == _contents(sources)
+
+
+def test_hardlink_shares_the_file(pairs):
+    materialize_files(pairs, "hardlink")
+    src, dst = pairs[0]
+    assert os.path.samefile(src, dst)
+
+
+def test_copy_is_independent(pairs):
+    materialize_files(pairs, "copy")
+    src, dst = pairs[0]
+    assert not os.path.samefile(src, dst)
+
+
+def test_move_removes_sources(pairs):
+    expected = _contents(src for src, _ in pairs)
+    assert materialize_files(pairs, "move") == ["move"] * len(pairs)
+    assert not any(os.path.exists(src) for src, _ in pairs)
+    assert _contents(dst for _, dst in pairs) == expected
+
+
+def test_existing_targets_are_replaced(pairs):
+    for _, dst in pairs:
+        with open(dst, "wb") as f:
+            f.write(b"old")
+    materialize_files(pairs, "hardlink")
+    assert _contents(dst for _, dst in pairs) == _contents(src for src, _ in pairs)
+
+
+@pytest.mark.parametrize("strategy", ["hardlink", "reflink"])
+def test_unsupported_strategy_falls_back_to_copy(pairs, monkeypatch, strategy):
+    calls = []
+
+    def fail(src, dst):
+        calls.append(src)
+        _unsupported()
+
+    monkeypatch.setitem(file_utils._OPERATIONS, strategy, fail)
+    assert materialize_files(pairs, strategy) == ["copy"] * len(pairs)
+    # 失败一次后本批剩余文件直接复制，不再逐个尝试
+    assert len(calls) == 1
+    assert all(os.path.exists(src) for src, _ in pairs)
+    assert _contents(dst for _, dst in pairs) == _contents(src for src, _ in pairs)
+
+
+def test_cross_device_move_copies_then_removes_source(pairs, monkeypatch):
+    expected = _contents(src for src, _ in pairs)
+    monkeypatch.setitem(file_utils._OPERATIONS, "move", _unsupported)
+    assert materialize_files(pairs, "move") == ["copy"] * len(pairs)
+    assert not any(os.path.exists(src) for src, _ in pairs)
+    assert _contents(dst for _, dst in pairs) == expected
+
+
+def test_other_errors_are_raised(pairs, monkeypatch):
+    def denied(src, dst):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setitem(file_utils._OPERATIONS, "hardlink", denied)
+    with pytest.raises(OSError):
+        materialize_files(pairs, "hardlink")
+
+
+def test_unknown_strategy(pairs):
+    with pytest.raises(ValueError):
+        materialize_files(pairs, "symlink")
+
+
+def test_remove_files_skips_missing(pairs):
+    sources = [src for src, _ in pairs]
+    assert remove_files(sources + [sources[0]]) == len(sources)
+
+
+def test_segment_dirs_and_frames_are_sorted(tmp_path):
+    for name in ["segment_30.0_60.0", "segment_0.0_30.0", "segment_bad", "other"]:
+        (tmp_path / name).mkdir()
+    frames_dir = tmp_path / "segment_0.0_30.0"
+    for name in ["frame_10.png", "frame_2.jpg", "frame_1.webp", "audio.mp3", "x.png"]:
+        (frames_dir / name).write_bytes(b"")
+    assert [os.path.basename(d) for d in get_segment_dirs(str(tmp_path))] == [
+        "segment_0.0_30.0",
+        "segment_30.0_60.0",
+    ]
+    assert get_sorted_frames(str(frames_dir)) == [
+        "frame_1.webp",
+        "frame_2.jpg",
+        "frame_10.png",
+    ]
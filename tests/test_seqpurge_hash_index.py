@@ -0,0 +1,66 @@
+import os
+
+from SeqPurge.core.hash_index import INDEX_FILENAME, HashIndex
+
+
+def _frame(directory, name, content=b"frame"):
+    path = directory / name
+    path.write_bytes(content)
+    return path
+
+
+def test_save_and_load_round_trip(tmp_path):
+    _frame(tmp_path, "frame_1.png")
+    _frame(tmp_path, "frame_2.png")
+    index = HashIndex(str(tmp_path))
+    index.put("frame_1.png", 0xFFFF_FFFF_FFFF_FFFF)
+    index.put("frame_2.png", 42)
+    index.save()
+    assert (tmp_path / INDEX_FILENAME).exists()
+
+    loaded = HashIndex(str(tmp_path))
+    assert loaded.lookup("frame_1.png") == 0xFFFF_FFFF_FFFF_FFFF
+    assert loaded.lookup("frame_2.png") == 42
+
+
+def test_changed_files_are_invalidated(tmp_path):
+    resized = _frame(tmp_path, "frame_1.png")
+    touched = _frame(tmp_path, "frame_2.png")
+    _frame(tmp_path, "frame_3.png")
+    index = HashIndex(str(tmp_path))
+    for name in ["frame_1.png", "frame_2.png", "frame_3.png"]:
+        index.put(name, 7)
+    index.save()
+
+    resized.write_bytes(b"a longer frame")
+    stat = touched.stat()
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    loaded = HashIndex(str(tmp_path))
+    assert loaded.lookup("frame_1.png") is None  # 大小变化
+    assert loaded.lookup("frame_2.png") is None  # 修改时间变化
+    assert loaded.lookup("frame_3.png") == 7
+
+
+def test_save_drops_deleted_files(tmp_path):
+    _frame(tmp_path, "frame_1.png")
+    deleted = _frame(tmp_path, "frame_2.png")
+    index = HashIndex(str(tmp_path))
+    index.put("frame_1.png", 1)
+    index.put("frame_2.png", 2)
+    deleted.unlink()
+    index.save()
+
+    loaded = HashIndex(str(tmp_path))
+    assert set(loaded._entries) == {"frame_1.png"}
+
+
+def test_other_hash_type_or_corrupt_index_starts_empty(tmp_path):
+    _frame(tmp_path, "frame_1.png")
+    index = HashIndex(str(tmp_path), "ahash")
+    index.put("frame_1.png", 1)
+    index.save()
+    assert HashIndex(str(tmp_path), "dhash").lookup("frame_1.png") is None
+
+    (tmp_path / INDEX_FILENAME).write_bytes(b"not an npz file")
+    assert HashIndex(str(tmp_path), "ahash").lookup("frame_1.png") is None
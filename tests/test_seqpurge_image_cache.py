@@ -0,0 +1,145 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from SeqPurge.core import image_cache
+from SeqPurge.core.image_cache import HASH_DECODE_SIDE, ImageCache, decode_gray
+from SeqPurge.core.perceptual_hash import image_hash
+
+
+@pytest.fixture
+def images(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"frame_{i + 1}.png")
+        cv2.imwrite(path, rng.integers(0, 256, (64, 64), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def _entry_bytes(path):
+    return ImageCache(0).get(path).nbytes
+
+
+def test_least_recently_used_entry_is_evicted(images):
+    cache = ImageCache(0, max_bytes=_entry_bytes(images[0]) * 2.5)
+    first = cache.get(images[0])
+    cache.get(images[1])
+    assert cache.get(images[0]) is first  # 命中后移到最近使用的一端
+    cache.get(images[2])
+
+    assert list(cache._entries) == [images[0], images[2]]
+    assert cache.get(images[0]) is first
+    assert cache.get(images[1]) is not None  # 被淘汰的图像重新解码
+
+
+def test_byte_budget_is_enforced(images):
+    size = _entry_bytes(images[0])
+    cache = ImageCache(0, max_bytes=size * 3)
+    for path in images:
+        cache.get(path)
+        assert cache._bytes == sum(e.nbytes for e in cache._entries.values())
+        assert cache._bytes <= cache.max_bytes
+    assert list(cache._entries) == images[1:]
+
+
+def test_reference_statistics_count_towards_the_budget(images):
+    size = _entry_bytes(images[0])
+    cache = ImageCache(0, max_bytes=size * 6)
+    for path in images:
+        cache.get(path)
+    assert len(cache._entries) == 4
+
+    # 参考图的均值和方差等统计量计入占用，超出预算时淘汰最久未使用的条目
+    reference = cache.reference(images[3])
+    assert cache.reference(images[3]) is reference
+    assert cache._bytes == sum(e.nbytes for e in cache._entries.values())
+    assert cache._bytes <= cache.max_bytes
+    assert list(cache._entries) == images[1:]
+
+
+def test_single_entry_over_budget_is_kept(images):
+    cache = ImageCache(0, max_bytes=1)
+    entry = cache.get(images[0])
+    assert cache.get(images[0]) is entry
+    cache.get(images[1])
+    assert list(cache._entries) == [images[1]]
+
+
+def test_changed_file_is_decoded_again(images):
+    cache = ImageCache(0)
+    entry = cache.get(images[0])
+    cv2.imwrite(images[0], np.zeros((32, 32), dtype=np.uint8))
+    stat = os.stat(images[0])
+    os.utime(images[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    changed = cache.get(images[0])
+    assert changed is not entry
+    assert changed.gray.shape == (32, 32)
+    assert cache._bytes == changed.nbytes
+
+
+@pytest.fixture
+def record_imread(monkeypatch):
+    """记录 decode_gray 调用 cv2.imread 时使用的读取模式"""
+    flags = []
+    imread = cv2.imread
+
+    def recording_imread(path, flag):
+        flags.append(flag)
+        return imread(path, flag)
+
+    monkeypatch.setattr(image_cache.cv2, "imread", recording_imread)
+    return flags
+
+
+def _scene(height, width):
+    """平滑的彩色画面，缩小解码和完整解码后的缩略图基本一致"""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = [
+        127 + 120 * np.sin(x / (width / (3 + c)) + c) * np.cos(y / (height / 2))
+        for c in range(3)
+    ]
+    return np.clip(np.dstack(channels), 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("size", [(720, 1280), (1080, 1920), (480, 640)])
+def test_jpeg_reduced_decode_hashes_like_full_decode(tmp_path, record_imread, size):
+    path = str(tmp_path / "frame_1.jpg")
+    cv2.imwrite(path, _scene(*size), [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+    reduced = decode_gray(path, HASH_DECODE_SIDE)
+    full = decode_gray(path)
+    assert record_imread[0] in (
+        cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    )
+    assert record_imread[1] == cv2.IMREAD_GRAYSCALE
+    assert full.shape == size
+    assert HASH_DECODE_SIDE <= max(reduced.shape) < max(size)
+    assert image_hash(reduced) == image_hash(full)
+
+
+@pytest.mark.parametrize("extension", ["png", "webp"])
+def test_other_formats_are_decoded_by_imread(tmp_path, record_imread, extension):
+    rgb = _scene(720, 1280)
+    path = str(tmp_path / f"frame_1.{extension}")
+    params = [cv2.IMWRITE_WEBP_QUALITY, 101] if extension == "webp" else []
+    cv2.imwrite(path, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), params)
+
+    gray = decode_gray(path, HASH_DECODE_SIDE)
+    assert record_imread == [cv2.IMREAD_UNCHANGED]
+    # 无法在解码器中缩小，按原始分辨率解码后转为灰度
+    assert gray.shape == (720, 1280)
+    np.testing.assert_array_equal(gray, cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+
+
+def test_unreadable_image_is_reported(tmp_path):
+    path = tmp_path / "frame_1.png"
+    path.write_bytes(b"not an image")
+    with pytest.raises(OSError):
+        decode_gray(str(path))
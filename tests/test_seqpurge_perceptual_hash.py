@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+import pytest
+
+from SeqPurge.core.hash_index import hamming_distance
+from SeqPurge.core.image_utils import ImageComparator
+from SeqPurge.core.perceptual_hash import (
+    THUMB_SIZE,
+    hamming_distances,
+    hash_batch,
+    image_hash,
+    popcount,
+    sequential_keep,
+    thumbnail,
+)
+from videoxt.dedup import average_hash
+
+
+def _pack(bits):
+    """按行优先、高位在前把 64 个布尔值打包为整数"""
+    value = 0
+    for bit in np.asarray(bits).ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _blocks(image, height, width):
+    """逐块求平均的区域缩放（尺寸能整除时）"""
+    h, w = image.shape
+    return image.reshape(height, h // height, width, w // width).mean(axis=(1, 3))
+
+
+def _naive_phash(image):
+    n = THUMB_SIZE
+    k = np.arange(n)
+    dct = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    dct[0] *= np.sqrt(1 / n)
+    dct[1:] *= np.sqrt(2 / n)
+    low = (dct @ image.astype(np.float64) @ dct.T)[:8, :8]
+    return _pack(low > np.median(low))
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, (6, THUMB_SIZE, THUMB_SIZE)).astype(np.float32)
+
+
+def test_average_hash_matches_naive(stack):
+    expected = []
+    for image in stack:
+        pixels = _blocks(image, 8, 8)
+        expected.append(_pack(pixels > pixels.mean()))
+    assert [int(h) for h in hash_batch(stack, "ahash")] == expected
+
+
+def test_difference_hash_of_gradients():
+    ramp = np.tile(np.arange(36, dtype=np.float32) * 7, (32, 1))
+    stack = np.stack([ramp, ramp[:, ::-1]])
+    hashes = hash_batch(stack, "dhash")
+    assert int(hashes[0]) == (1 << 64) - 1
+    assert int(hashes[1]) == 0
+
+
+def test_perceptual_hash_matches_naive(stack):
+    expected = [_naive_phash(image) for image in stack]
+    assert [int(h) for h in hash_batch(stack, "phash")] == expected
+
+
+@pytest.mark.parametrize("hash_type", ["ahash", "dhash", "phash"])
+def test_batch_and_single_hashes_agree(stack, hash_type):
+    hashes = hash_batch(stack, hash_type)
+    assert hashes.dtype == np.uint64
+    assert [int(h) for h in hashes] == [
+        int(hash_batch(image[None], hash_type)[0]) for image in stack
+    ]
+
+
+def test_hash_batch_rejects_unknown_type(stack):
+    with pytest.raises(ValueError):
+        hash_batch(stack, "whash")
+
+
+def test_popcount_and_hamming_distances():
+    values = np.array([0, 1, 0xFF, (1 << 64) - 1], dtype=np.uint64)
+    assert popcount(values).tolist() == [0, 1, 8, 64]
+    distances = hamming_distances(0xF0, values)
+    assert distances.tolist() == [hamming_distance(0xF0, int(v)) for v in values]
+
+
+def _naive_keep(hashes, radius):
+    keep = [0]
+    for i in range(1, len(hashes)):
+        if hamming_distance(int(hashes[keep[-1]]), int(hashes[i])) > radius:
+            keep.append(i)
+    return keep
+
+
+@pytest.mark.parametrize("window", [1, 3, 64])
+@pytest.mark.parametrize("radius", [0, 4, 12])
+def test_sequential_keep_matches_naive_loop(radius, window):
+    rng = np.random.default_rng(radius * 100 + window)
+    hashes = []
+    value = int(rng.integers(0, 1 << 63))
+    for _ in range(300):
+        if rng.random() < 0.1:
+            value = int(rng.integers(0, 1 << 63))
+        # 在当前画面附近随机翻转少量位
+        bits = rng.choice(64, size=int(rng.integers(0, 8)), replace=False)
+        hashes.append(value ^ sum(1 << int(b) for b in bits))
+    hashes = np.array(hashes, dtype=np.uint64)
+    kept = sequential_keep(hashes, radius, window=window)
+    assert kept.tolist() == _naive_keep(hashes, radius)
+
+
+def test_sequential_keep_empty():
+    assert sequential_keep(np.empty(0, dtype=np.uint64), 5).tolist() == []
+
+
+def test_videoxt_and_seqpurge_hash_the_same_frame_alike(tmp_path):
+    rng = np.random.default_rng(2)
+    comparator = ImageComparator("hash", 5.0)
+    for i, (h, w) in enumerate([(90, 160), (360, 640), (720, 1280)]):
+        rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        path = str(tmp_path / f"frame_{i}.png")
+        cv2.imwrite(path, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        # SeqPurge 的哈希来自解码缓存中的缩略图
+        assert average_hash(rgb) == comparator.get_hash(path)
+        assert average_hash(gray) == image_hash(gray, "ahash")
+
+
+def test_image_hash_uses_thumbnail():
+    gray = np.zeros((64, 64), dtype=np.uint8)
+    gray[:, 32:] = 255
+    assert thumbnail(gray).shape == (THUMB_SIZE, THUMB_SIZE)
+    # 右半边亮：每行低 4 位为 1
+    assert image_hash(gray, "ahash") == _pack(np.tile([0] * 4 + [1] * 4, 8))
@@ -0,0 +1,183 @@
+import json
+import os
+
+import pytest
+
+from SeqPurge.core.plan import (
+    DROP,
+    DROP_CROSS,
+    KEEP,
+    PlanJournal,
+    apply_plan,
+    load_plan,
+    new_plan,
+    plan_operations,
+    save_plan,
+    summarize_plan,
+)
+
+
+def _make_plan(tmp_path, mode, strategy="copy"):
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    plan = new_plan(
+        input_dir=str(input_dir),
+        output_dir=str(output_dir),
+        mode=mode,
+        algorithm="hash",
+        threshold=5.0,
+        hash_type="ahash",
+        global_search=False,
+        output_strategy=strategy,
+    )
+    for name, actions in [
+        ("segment_0.0_30.0", [KEEP, DROP, KEEP, DROP]),
+        ("segment_30.0_60.0", [DROP_CROSS, KEEP, DROP]),
+    ]:
+        segment_dir = input_dir / name
+        segment_dir.mkdir(parents=True)
+        frames = [f"frame_{i}.png" for i in range(len(actions))]
+        for frame in frames:
+            (segment_dir / frame).write_bytes(f"{name}/{frame}".encode())
+        outputs = [
+            f"{name}_{frame}" if action == KEEP else None
+            for frame, action in zip(frames, actions)
+        ]
+        plan["segments"].append(
+            {
+                "dir": name,
+                "frames": frames,
+                "actions": actions,
+                "references": [None] * len(actions),
+                "scores": [None] * len(actions),
+                "outputs": outputs,
+            }
+        )
+    path = str(tmp_path / "plan.json")
+    save_plan(plan, path)
+    return plan, path
+
+
+def test_plan_operations_per_mode(tmp_path):
+    plan, _ = _make_plan(tmp_path, mode=1)
+    operations = plan_operations(plan)
+    assert [(os.path.basename(src), dst) for src, dst, _ in operations] == [
+        ("frame_1.png", None),
+        ("frame_3.png", None),
+        ("frame_0.png", None),
+        ("frame_2.png", None),
+    ]
+
+    plan["mode"] = 2
+    targets = [os.path.basename(dst) for _, dst, _ in plan_operations(plan)]
+    assert targets == [
+        "segment_0.0_30.0_frame_0.png",
+        "segment_0.0_30.0_frame_2.png",
+        "segment_30.0_60.0_frame_1.png",
+    ]
+
+
+def test_summarize_plan(tmp_path):
+    plan, _ = _make_plan(tmp_path, mode=1)
+    assert summarize_plan(plan) == {
+        "segments": 2,
+        "frames": 7,
+        KEEP: 3,
+        DROP: 3,
+        DROP_CROSS: 1,
+        "operations": 4,
+    }
+
+
+def test_save_and_load_round_trip(tmp_path):
+    plan, path = _make_plan(tmp_path, mode=2)
+    assert load_plan(path) == plan
+
+    with open(PlanJournal.journal_path(path), "w", encoding="utf-8") as f:
+        f.write(plan["id"] + "\n2\n")
+    save_plan(plan, path)
+    assert not os.path.exists(PlanJournal.journal_path(path))
+
+
+def test_load_rejects_other_versions(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"version": 99, "segments": []}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_plan(str(path))
+
+
+def test_journal_resumes_from_last_complete_line(tmp_path):
+    path = str(tmp_path / "plan.json")
+    journal = PlanJournal(path, "plan-a")
+    assert journal.applied == 0
+    journal.record(256)
+    journal.record(512)
+    with open(PlanJournal.journal_path(path), "a", encoding="utf-8") as f:
+        f.write("76")  # 崩溃时写了一半的行
+
+    assert PlanJournal(path, "plan-a").applied == 512
+
+
+def test_journal_of_another_plan_is_ignored(tmp_path):
+    path = str(tmp_path / "plan.json")
+    PlanJournal(path, "plan-a").record(10)
+
+    journal = PlanJournal(path, "plan-b")
+    assert journal.applied == 0
+    journal.record(3)
+    with open(PlanJournal.journal_path(path), "r", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["plan-b", "3"]
+
+
+def test_apply_plan_resumes_and_is_idempotent(tmp_path):
+    plan, path = _make_plan(tmp_path, mode=1)
+    logs = []
+    batches = []
+
+    def stop_after_first_batch():
+        return len(batches) >= 1
+
+    def progress(percent, status):
+        batches.append(percent)
+
+    applied = apply_plan(path, logs.append, progress, stop_after_first_batch, 2)
+    assert applied == 2
+    assert PlanJournal(path, plan["id"]).applied == 2
+
+    applied = apply_plan(path, logs.append, batch_size=2)
+    assert applied == 2
+    assert any("继续执行" in line for line in logs)
+    remaining = sorted(
+        os.path.relpath(os.path.join(root, name), plan["input_dir"])
+        for root, _, names in os.walk(plan["input_dir"])
+        for name in names
+        if name.startswith("frame_")
+    )
+    assert remaining == [
+        os.path.join("segment_0.0_30.0", "frame_0.png"),
+        os.path.join("segment_0.0_30.0", "frame_2.png"),
+        os.path.join("segment_30.0_60.0", "frame_1.png"),
+    ]
+
+    assert apply_plan(path, logs.append) == 0
+    assert "执行完毕" in logs[-1]
+
+
+def test_apply_plan_reruns_unrecorded_move_batch(tmp_path):
+    plan, path = _make_plan(tmp_path, mode=2, strategy="move")
+    operations = plan_operations(plan)
+    expected = {}
+    for src, dst, _ in operations:
+        with open(src, "rb") as f:
+            expected[dst] = f.read()
+    # 模拟第一批已经移动完成、但崩溃前没来得及写入日志
+    os.makedirs(plan["output_dir"])
+    for src, dst, _ in operations[:2]:
+        os.replace(src, dst)
+
+    logs = []
+    assert apply_plan(path, logs.append, batch_size=2) == len(operations)
+    assert not any("跳过" in line for line in logs)
+    for dst, content in expected.items():
+        with open(dst, "rb") as f:
+            assert f.read() == content
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from SeqPurge.core.ssim import C1, C2, SSIMReference, downscale
+
+
+def _gaussian_filter(image, size=11, sigma=1.5):
+    """float64 的可分离高斯滤波，边界按 OpenCV 默认的 reflect-101 处理"""
+    x = np.arange(size) - size // 2
+    kernel = np.exp(-(x**2) / (2 * sigma**2))
+    kernel /= kernel.sum()
+    pad = size // 2
+    padded = np.pad(image, pad, mode="reflect")
+    rows = sum(k * padded[i : i + image.shape[0], :] for i, k in enumerate(kernel))
+    return sum(k * rows[:, i : i + image.shape[1]] for i, k in enumerate(kernel))
+
+
+def _reference_ssim(a, b):
+    """按 Wang 等人的定义逐像素计算 SSIM 后取平均"""
+    a = a.astype(np.float64)
+    b = b.astype(np.float64)
+    mu_a, mu_b = _gaussian_filter(a), _gaussian_filter(b)
+    var_a = _gaussian_filter(a * a) - mu_a**2
+    var_b = _gaussian_filter(b * b) - mu_b**2
+    cov = _gaussian_filter(a * b) - mu_a * mu_b
+    ssim_map = ((2 * mu_a * mu_b + C1) * (2 * cov + C2)) / (
+        (mu_a**2 + mu_b**2 + C1) * (var_a + var_b + C2)
+    )
+    return ssim_map.mean()
+
+
+@pytest.fixture
+def images():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (48, 64)).astype(np.float32)
+    noisy = np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.float32)
+    shifted = np.roll(base, 3, axis=1)
+    other = rng.integers(0, 256, base.shape).astype(np.float32)
+    flat = np.full(base.shape, 128, dtype=np.float32)
+    return base, [base, noisy, shifted, other, flat]
+
+
+def test_score_batch_matches_reference_ssim(images):
+    base, candidates = images
+    scores = SSIMReference(base).score_batch(candidates)
+    expected = [_reference_ssim(base, c) for c in candidates]
+    np.testing.assert_allclose(scores, expected, atol=1e-4)
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_score_matches_score_batch(images):
+    base, candidates = images
+    reference = SSIMReference(base)
+    scores = reference.score_batch(candidates)
+    for candidate, score in zip(candidates, scores):
+        assert reference.score(candidate) == pytest.approx(score, abs=1e-6)
+
+
+def test_score_batch_spans_several_chunks(images, monkeypatch):
+    base, candidates = images
+    monkeypatch.setattr("SeqPurge.core.ssim._MAX_CHANNELS", 2)
+    chunked = SSIMReference(base).score_batch(candidates)
+    monkeypatch.undo()
+    whole = SSIMReference(base).score_batch(candidates)
+    np.testing.assert_allclose(chunked, whole, atol=1e-6)
+
+
+def test_score_batch_resizes_candidates(images):
+    base, _ = images
+    reference = SSIMReference(base)
+    larger = np.kron(base, np.ones((2, 2), dtype=np.float32))
+    assert reference.score(larger) == pytest.approx(1.0, abs=1e-4)
+
+
+def test_score_batch_empty(images):
+    base, _ = images
+    assert SSIMReference(base).score_batch([]).shape == (0,)
+
+
+def test_downscale_limits_long_side():
+    gray = np.zeros((300, 600), dtype=np.uint8)
+    assert downscale(gray, 200).shape == (100, 200)
+    assert downscale(gray).dtype == np.float32
+    assert downscale(gray).shape == (300, 600)
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from videoxt.models import Span
+from videoxt.tracing import SpanRecorder, summarize_spans, write_chrome_trace
+
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture
+def spans():
+    return [
+        Span("probe", T0, 0.5),
+        Span("queue", T0 + 0.5, 0.25, "0.0_30.0"),
+        Span("task", T0 + 0.75, 4.0, "0.0_30.0"),
+        Span("decode", T0 + 1.0, 2.5, "0.0_30.0", calls=300),
+        Span("encode", T0 + 1.0, 1.0, "0.0_30.0", calls=120),
+        Span("task", T0 + 1.0, 2.0, "30.0_60.0"),
+        Span("decode", T0 + 1.25, 1.5, "30.0_60.0", calls=200),
+    ]
+
+
+def test_summarize_spans_totals(spans):
+    summary = summarize_spans(spans, wall_seconds=4.0)
+    assert summary["wall_seconds"] == 4.0
+    assert summary["task_seconds"] == 6.0
+    assert summary["parallelism"] == 1.5
+    assert list(summary["stages"]) == ["queue", "task", "probe", "decode", "encode"]
+    assert summary["stages"]["task"] == {
+        "count": 2,
+        "calls": 2,
+        "seconds": 6.0,
+        "max_seconds": 4.0,
+        "share": 1.0,
+    }
+    assert summary["stages"]["decode"] == {
+        "count": 2,
+        "calls": 500,
+        "seconds": 4.0,
+        "max_seconds": 2.5,
+        "share": 0.667,
+    }
+
+
+def test_summarize_spans_without_tasks():
+    summary = summarize_spans([Span("probe", T0, 0.5)], wall_seconds=0.0)
+    assert summary["parallelism"] == 0.0
+    assert summary["stages"]["probe"]["share"] == 0.0
+    assert summarize_spans([], 1.0)["stages"] == {}
+
+
+def test_write_chrome_trace(spans, tmp_path):
+    path = tmp_path / "trace.json"
+    write_chrome_trace(path, spans, "clip.mp4")
+    trace = json.loads(path.read_text(encoding="utf-8"))
+
+    events = trace["traceEvents"]
+    metadata = [e for e in events if e["ph"] == "M"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert metadata[0]["args"] == {"name": "clip.mp4"}
+    lanes = {e["args"]["name"]: e["tid"] for e in metadata[1:]}
+    assert set(lanes) == {
+        "video",
+        "0.0_30.0",
+        "0.0_30.0 decode",
+        "0.0_30.0 encode",
+        "30.0_60.0",
+        "30.0_60.0 decode",
+    }
+    assert len(set(lanes.values())) == len(lanes)
+
+    assert len(complete) == len(spans)
+    by_name = {(e["args"]["task_id"], e["name"]): e for e in complete}
+    # 时间以微秒为单位，相对于最早的记录
+    assert by_name[("", "probe")]["ts"] == 0.0
+    assert by_name[("", "probe")]["tid"] == lanes["video"]
+    task = by_name[("0.0_30.0", "task")]
+    assert (task["ts"], task["dur"], task["tid"]) == (750000.0, 4e6, lanes["0.0_30.0"])
+    decode = by_name[("30.0_60.0", "decode")]
+    assert (decode["ts"], decode["dur"]) == (1250000.0, 1.5e6)
+    assert decode["tid"] == lanes["30.0_60.0 decode"]
+    assert decode["cat"] == "accumulated"
+    assert decode["args"]["calls"] == 200
+
+
+def test_recorder_collects_spans_and_accumulated_timers():
+    recorder = SpanRecorder("0.0_30.0")
+    with pytest.raises(RuntimeError):
+        with recorder.span("spawn"):
+            raise RuntimeError
+    timer = recorder.timer("decode")
+    for _ in range(3):
+        with timer:
+            pass
+    timer.close()
+    timer.close()
+    recorder.timer("encode").close()  # 没有进入过的计时器不写入记录
+
+    assert [(s.stage, s.task_id, s.calls) for s in recorder.spans] == [
+        ("spawn", "0.0_30.0", 1),
+        ("decode", "0.0_30.0", 3),
+    ]